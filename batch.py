@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+from stage1 import ConfigError
+from stage3 import DependencyGraph
+
+
+def load_roots(batch_file: str) -> List[Tuple[str, str]]:
+    roots = []
+    try:
+        with open(batch_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                name, _, version = line.rpartition('@')
+                if not name or not version:
+                    raise ConfigError(f"Строка {line_number}: ожидается формат пакет@версия, получено '{line}'")
+                roots.append((name, version))
+    except OSError as e:
+        raise ConfigError(f"Ошибка чтения файла корневых пакетов: {e}")
+    return roots
+
+
+def analyze_root(config: Dict[str, Any], package_name: str, version: str) -> Dict[str, Any]:
+    root_config = {**config, 'package_name': package_name, 'package_version': version}
+    started = time.perf_counter()
+    summary: Dict[str, Any] = {'package': package_name, 'version': version}
+
+    graph_builder = None
+    try:
+        graph_builder = DependencyGraph(root_config)
+        graph_builder.build_graph(package_name, version)
+        graph = graph_builder.graph
+        root_key = f"{package_name}@{version}"
+
+        summary['nodes'] = len(graph)
+        summary['edges'] = graph.edge_count()
+        summary['cycle_groups'] = graph_builder.find_cycle_groups()
+        summary['direct_dependencies'] = graph[root_key] if root_key in graph else []
+    except Exception as e:
+        summary['error'] = str(e)
+    finally:
+        if graph_builder is not None:
+            graph_builder.close()
+
+    summary['seconds'] = round(time.perf_counter() - started, 4)
+    return summary
+
+
+class BatchAnalyzer:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.workers = config['workers'] or os.cpu_count() or 1
+
+    def run(self, roots: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        if self.workers == 1 or len(roots) <= 1:
+            return [analyze_root(self.config, name, version) for name, version in roots]
+
+        chunksize = max(1, len(roots) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(
+                analyze_root,
+                [self.config] * len(roots),
+                [name for name, _ in roots],
+                [version for _, version in roots],
+                chunksize=chunksize
+            ))
+
+    def write_summary(self, results: List[Dict[str, Any]], output_file: str, seconds: float) -> None:
+        summary = {
+            'roots': len(results),
+            'workers': self.workers,
+            'seconds': round(seconds, 4),
+            'failed': sum(1 for result in results if 'error' in result),
+            'total_nodes': sum(result.get('nodes', 0) for result in results),
+            'total_edges': sum(result.get('edges', 0) for result in results),
+            'results': results
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    def run_batch(self, batch_file: str, output_file: str) -> List[Dict[str, Any]]:
+        roots = load_roots(batch_file)
+        print(f"Пакетный анализ: {len(roots)} корневых пакетов, процессов: {self.workers}")
+
+        started = time.perf_counter()
+        results = self.run(roots)
+        seconds = time.perf_counter() - started
+
+        for result in results:
+            root = f"{result['package']}@{result['version']}"
+            if 'error' in result:
+                print(f"  {root}: ошибка - {result['error']}")
+            else:
+                print(f"  {root}: узлов {result['nodes']}, рёбер {result['edges']}, "
+                      f"циклов {len(result['cycle_groups'])}, прямых зависимостей "
+                      f"{len(result['direct_dependencies'])}")
+
+        self.write_summary(results, output_file, seconds)
+        print(f"Сводка сохранена в {output_file} ({seconds:.2f} с)")
+        return results
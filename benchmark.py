@@ -0,0 +1,249 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from stage1 import ConfigError, Stage1Config
+from stage3 import DependencyGraph
+from graph_store import CompactGraph
+from stage4 import ReverseDependencyAnalyzer
+from stage5 import GraphVisualizer
+from synthetic_repository import FANOUT_DISTRIBUTIONS
+from profiler import peak_rss_kb
+
+DEFAULT_SIZES = "1000,10000,100000"
+REVERSE_QUERY_TARGETS = 8
+
+
+def measure(step: Callable[[], Any], trace_memory: bool) -> Dict[str, Any]:
+    gc.collect()
+    started = time.perf_counter()
+    result = step()
+    measurement: Dict[str, Any] = {'seconds': round(time.perf_counter() - started, 6), 'result': result}
+
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            step()
+            measurement['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return measurement
+
+
+def traced_bytes(create: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        created = create()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del created
+    return size
+
+
+def storage_breakdown(graph: CompactGraph) -> Dict[str, int]:
+    keys = graph.keys_by_id
+    return {
+        'adjacency_bytes': graph.memory_usage(),
+        'key_table_bytes': (sys.getsizeof(keys) + sum(sys.getsizeof(key) for key in keys)
+                            + sys.getsizeof(graph.ids) + sys.getsizeof(graph.mask_table)),
+        'dict_of_lists_bytes': traced_bytes(lambda: {
+            key.encode('utf-8').decode('utf-8'): [dep.encode('utf-8').decode('utf-8') for dep in dependencies]
+            for key, dependencies in graph.items()})
+    }
+
+
+class BenchmarkSuite:
+    def __init__(self, config: Dict[str, Any], trace_memory: bool = True):
+        self.config = config
+        self.trace_memory = trace_memory
+        self.results: List[Dict[str, Any]] = []
+
+    def _record(self, nodes: int, edges: int, step: str, measurement: Dict[str, Any]) -> None:
+        record = {'nodes': nodes, 'edges': edges, 'step': step, 'seconds': measurement['seconds']}
+        if 'peak_bytes' in measurement:
+            record['peak_bytes'] = measurement['peak_bytes']
+        self.results.append(record)
+
+        memory = f", пик памяти {record['peak_bytes'] / 1048576:.1f} МБ" if 'peak_bytes' in record else ""
+        print(f"  {step:<28} {record['seconds']:>10.4f} с{memory}")
+
+    def _record_storage(self, nodes: int, edges: int, storage: Dict[str, int]) -> None:
+        self.results.append({'nodes': nodes, 'edges': edges, 'step': 'graph_storage', 'seconds': 0.0, **storage})
+        compact = storage['adjacency_bytes'] + storage['key_table_bytes']
+        per_edge = max(edges, 1)
+        print(f"  {'graph_storage':<28} CompactGraph {compact / per_edge:.1f} Б/ребро "
+              f"(рёбра {storage['adjacency_bytes'] / per_edge:.1f}, ключи {storage['key_table_bytes'] / per_edge:.1f}), "
+              f"словарь списков {storage['dict_of_lists_bytes'] / per_edge:.1f} Б/ребро")
+
+    def run_size(self, nodes: int) -> None:
+        config = {**self.config, 'synthetic_nodes': nodes}
+        package_name = config['package_name']
+        version = config['package_version']
+        root_key = f"{package_name}@{version}"
+
+        def build() -> DependencyGraph:
+            graph_builder = DependencyGraph(config)
+            graph_builder.dfs_build_graph(package_name, version)
+            return graph_builder
+
+        built = measure(build, self.trace_memory)
+        graph_builder = built['result']
+        graph = graph_builder.graph
+        edges = graph.edge_count()
+        print(f"\nСинтетический граф: {len(graph)} узлов, {edges} рёбер")
+        self._record(nodes, edges, 'dfs_build_graph', built)
+        if self.trace_memory:
+            self._record_storage(nodes, edges, storage_breakdown(graph))
+
+        def build_reverse() -> ReverseDependencyAnalyzer:
+            reverse_analyzer = ReverseDependencyAnalyzer(graph)
+            reverse_analyzer.build_reverse_graph()
+            return reverse_analyzer
+
+        reversed_graph = measure(build_reverse, self.trace_memory)
+        self._record(nodes, edges, 'build_reverse_graph', reversed_graph)
+
+        analyzer = reversed_graph['result']
+        keys = list(graph)
+        targets = keys[::max(1, len(keys) // REVERSE_QUERY_TARGETS)][:REVERSE_QUERY_TARGETS]
+        self._record(nodes, edges, 'find_reverse_dependencies', measure(
+            lambda: [analyzer.find_reverse_dependencies(target, config['max_depth']) for target in targets],
+            self.trace_memory))
+
+        visualizer = GraphVisualizer(config, graph_builder)
+        self._record(nodes, edges, 'generate_graphviz_dot', measure(
+            lambda: len(visualizer.generate_graphviz_dot(graph)), self.trace_memory))
+        self._record(nodes, edges, 'generate_ascii_tree', measure(
+            lambda: len(visualizer.generate_ascii_tree(graph, root_key)), self.trace_memory))
+
+    def run(self, sizes: List[int]) -> List[Dict[str, Any]]:
+        for nodes in sizes:
+            self.run_size(nodes)
+        return self.results
+
+    def report(self, sizes: List[int]) -> Dict[str, Any]:
+        parameters = {key: value for key, value in self.config.items() if key.startswith('synthetic_')}
+        parameters.update({'sizes': sizes, 'max_depth': self.config['max_depth'], 'trace_memory': self.trace_memory})
+        report: Dict[str, Any] = {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': parameters
+        }
+        rss_kb = peak_rss_kb()
+        if rss_kb is not None:
+            report['max_rss_kb'] = rss_kb
+        report['results'] = self.results
+        return report
+
+
+def compare_with_baseline(results: List[Dict[str, Any]], baseline_file: str, threshold: float) -> int:
+    try:
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ConfigError(f"Ошибка чтения базовых результатов {baseline_file}: {e}")
+
+    previous = {(record['nodes'], record['step']): record for record in baseline.get('results', [])}
+    regressions = 0
+
+    print(f"\nСравнение с {baseline_file} (порог {threshold:.2f}x):")
+    for record in results:
+        old = previous.get((record['nodes'], record['step']))
+        if old is None or not old['seconds']:
+            continue
+
+        ratio = record['seconds'] / old['seconds']
+        marks = []
+        if ratio > threshold:
+            marks.append("регрессия времени")
+        if 'peak_bytes' in record and old.get('peak_bytes') and record['peak_bytes'] / old['peak_bytes'] > threshold:
+            marks.append("регрессия памяти")
+        regressions += bool(marks)
+
+        print(f"  {record['nodes']:>8} {record['step']:<28} {ratio:>6.2f}x {'; '.join(marks)}")
+    return regressions
+
+
+def parse_sizes(text: str) -> List[int]:
+    try:
+        sizes = [int(float(size)) for size in text.split(',') if size.strip()]
+    except ValueError:
+        raise ConfigError(f"Некорректный список размеров: '{text}'")
+    if not sizes or any(size < 1 for size in sizes):
+        raise ConfigError("Размеры графа должны быть положительными числами")
+    return sizes
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Нагрузочное тестирование этапов 3-5 на синтетическом репозитории пакетов'
+    )
+    parser.add_argument('--sizes', type=str, default=DEFAULT_SIZES,
+                        help=f'Число пакетов через запятую, например 1e3,1e6 (по умолчанию: {DEFAULT_SIZES})')
+    parser.add_argument('--seed', type=int, default=1, help='Начальное значение генератора')
+    parser.add_argument('--fanout', type=float, default=2.0,
+                        help='Среднее число дополнительных зависимостей пакета')
+    parser.add_argument('--distribution', choices=FANOUT_DISTRIBUTIONS, default='poisson',
+                        help='Распределение числа дополнительных зависимостей')
+    parser.add_argument('--levels', type=int, default=8, help='Число уровней (глубина) графа')
+    parser.add_argument('--diamond-rate', type=float, default=0.2,
+                        help='Доля зависимостей через уровень, образующих ромбы')
+    parser.add_argument('--cycle-rate', type=float, default=0.01,
+                        help='Доля зависимостей на предков, образующих циклы')
+    parser.add_argument('--output', type=str, default='benchmark_results.json',
+                        help='Файл результатов в формате JSON (по умолчанию: benchmark_results.json)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Не измерять пиковую память (tracemalloc удваивает время прогона)')
+    parser.add_argument('--baseline', type=str, help='Файл прошлых результатов для поиска регрессий')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Допустимое замедление относительно базовых результатов (по умолчанию: 1.2)')
+    return parser
+
+
+def main_benchmark(argv: Optional[List[str]] = None) -> int:
+    args = create_parser().parse_args(argv)
+
+    try:
+        sizes = parse_sizes(args.sizes)
+        config_manager = Stage1Config()
+        config_manager.config.update({
+            'synthetic_seed': args.seed,
+            'synthetic_fanout': args.fanout,
+            'synthetic_distribution': args.distribution,
+            'synthetic_levels': args.levels,
+            'synthetic_diamond_rate': args.diamond_rate,
+            'synthetic_cycle_rate': args.cycle_rate,
+            'max_depth': args.levels + 1,
+            'memo_max_edges': 0,
+            'traversal': 'dfs'
+        })
+        config_manager._validate_config()
+        config = config_manager.config
+
+        suite = BenchmarkSuite(config, not args.no_memory)
+        suite.run(sizes)
+
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(suite.report(sizes), f, indent=2, ensure_ascii=False)
+        print(f"\nРезультаты сохранены в {args.output}")
+
+        if args.baseline:
+            return 1 if compare_with_baseline(suite.results, args.baseline, args.threshold) else 0
+        return 0
+
+    except Exception as e:
+        print(f"Ошибка нагрузочного тестирования: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
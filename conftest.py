@@ -0,0 +1,62 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from stage1 import Stage1Config
+
+FEED_PACKAGES = {
+    'root': {'1.0.0': [('A', '[1.0.0, )', 'net6.0'), ('B', '1.0.0', 'net6.0')]},
+    'a': {'1.0.0': [('Broken', '1.0.0', 'netstandard2.0')]},
+    'b': {'1.0.0': [('C', '1.0.0', 'net6.0')]},
+    'c': {'1.0.0': []}
+}
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload=None) -> None:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        if self.path == '/v3/index.json':
+            self._send(200, {'resources': [{'@id': f"{base}/reg/", '@type': 'RegistrationsBaseUrl/3.6.0'}]})
+            return
+
+        package_id = self.path.split('/')[2]
+        if package_id == 'broken':
+            self._send(500)
+            return
+        if package_id not in FEED_PACKAGES:
+            self._send(404)
+            return
+
+        items = [{'catalogEntry': {'version': version, 'dependencyGroups': [
+                     {'targetFramework': framework, 'dependencies': [{'id': name, 'range': version_range}]}
+                     for name, version_range, framework in dependencies]}}
+                 for version, dependencies in FEED_PACKAGES[package_id].items()]
+        self._send(200, {'items': [{'@id': f"{base}{self.path}#page", 'items': items}]})
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Stage1Config(str(tmp_path / "config.json")).default_config.copy()
+
+
+@pytest.fixture
+def feed_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v3/index.json"
+    server.shutdown()
+    server.server_close()
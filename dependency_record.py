@@ -0,0 +1,54 @@
+import sys
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+DEPENDENCY_FIELDS = ('name', 'version', 'target_framework')
+
+
+class Dependency:
+    __slots__ = DEPENDENCY_FIELDS
+
+    def __init__(self, name: str, version: str, target_framework: str = ""):
+        self.name = sys.intern(name)
+        self.version = sys.intern(version)
+        self.target_framework = sys.intern(target_framework)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, str]) -> "Dependency":
+        return cls(data['name'], data.get('version') or '', data.get('target_framework') or '')
+
+    def __getitem__(self, field: str) -> str:
+        if field not in DEPENDENCY_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field: str, default: Optional[str] = None) -> Optional[str]:
+        return getattr(self, field) if field in DEPENDENCY_FIELDS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return DEPENDENCY_FIELDS
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        return zip(DEPENDENCY_FIELDS, (self.name, self.version, self.target_framework))
+
+    def __contains__(self, field: object) -> bool:
+        return field in DEPENDENCY_FIELDS
+
+    def __len__(self) -> int:
+        return len(DEPENDENCY_FIELDS)
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"name": self.name, "version": self.version, "target_framework": self.target_framework}
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Dependency):
+            return (self.name, self.version, self.target_framework) == \
+                (other.name, other.version, other.target_framework)
+        if isinstance(other, Mapping):
+            return self.as_dict() == dict(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.version, self.target_framework))
+
+    def __repr__(self) -> str:
+        return f"Dependency({self.name!r}, {self.version!r}, {self.target_framework!r})"
@@ -0,0 +1,58 @@
+from typing import Dict, List, Optional
+
+ANY_FRAMEWORK = ""
+FRAMEWORK_ALIASES = (
+    (".netframework", "net", True),
+    (".netstandard", "netstandard", False),
+    (".netcoreapp", "netcoreapp", False)
+)
+
+
+def normalize_framework(label: str) -> str:
+    label = label.strip().lower()
+    for prefix, short_name, compact_version in FRAMEWORK_ALIASES:
+        if label.startswith(prefix):
+            version = label[len(prefix):]
+            return short_name + (version.replace('.', '') if compact_version else version)
+    return label
+
+
+class FrameworkTable:
+    def __init__(self):
+        self.labels: List[str] = []
+        self._indexes: Dict[str, int] = {}
+        self._bits: Dict[str, int] = {}
+
+    def bit(self, label: str) -> int:
+        bit = self._bits.get(label)
+        if bit is None:
+            key = normalize_framework(label)
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = len(self.labels)
+                self.labels.append(label)
+            bit = self._bits[label] = 1 << index
+        return bit
+
+    def find(self, label: str) -> Optional[int]:
+        index = self._indexes.get(normalize_framework(label))
+        return None if index is None else 1 << index
+
+    def selector(self, label: str) -> Optional[int]:
+        bit = self.find(label)
+        if bit is None:
+            return None
+        return bit | self.bit(ANY_FRAMEWORK)
+
+    def labels_of(self, mask: int) -> List[str]:
+        return [label for index, label in enumerate(self.labels) if mask >> index & 1 and label]
+
+    def remap(self, mask: int, labels: List[str]) -> int:
+        remapped = 0
+        for index, label in enumerate(labels):
+            if mask >> index & 1:
+                remapped |= self.bit(label)
+        return remapped
+
+
+FRAMEWORKS = FrameworkTable()
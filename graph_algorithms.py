@@ -0,0 +1,139 @@
+from typing import Dict, List, Mapping, Iterable, Set, Tuple
+from graph_store import CompactGraph
+from profiler import PROFILER
+
+
+def strongly_connected_components(adjacency: List[List[int]]) -> List[List[int]]:
+    node_count = len(adjacency)
+    index = [-1] * node_count
+    low = [0] * node_count
+    on_stack = [False] * node_count
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for start in range(node_count):
+        if index[start] != -1:
+            continue
+
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack[start] = True
+        work = [(start, 0)]
+
+        while work:
+            node, position = work[-1]
+            neighbours = adjacency[node]
+
+            if position < len(neighbours):
+                work[-1] = (node, position + 1)
+                neighbour = neighbours[position]
+
+                if index[neighbour] == -1:
+                    index[neighbour] = low[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack[neighbour] = True
+                    work.append((neighbour, 0))
+                elif on_stack[neighbour] and index[neighbour] < low[node]:
+                    low[node] = index[neighbour]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+class CondensedGraph:
+    @PROFILER.timed('graph.condense')
+    def __init__(self, graph: Mapping[str, Iterable[str]]):
+        if isinstance(graph, CompactGraph):
+            self.nodes: List[str] = graph.keys_by_id
+            adjacency = graph.adjacency_lists()
+        else:
+            self.nodes, adjacency = self._index_graph(graph)
+
+        self.adjacency = adjacency
+        self.components: List[List[str]] = []
+        self.component_members: List[List[int]] = []
+        self.component_of: Dict[str, int] = {}
+        self.cycle_groups: List[List[str]] = []
+
+        node_component = self.node_component = [0] * len(self.nodes)
+        for component_index, members in enumerate(strongly_connected_components(adjacency)):
+            for member in members:
+                node_component[member] = component_index
+                self.component_of[self.nodes[member]] = component_index
+            members.reverse()
+            self.component_members.append(members)
+            self.components.append([self.nodes[member] for member in members])
+
+        self.dag: List[List[int]] = [[] for _ in self.components]
+        self._cyclic_components: Set[int] = set()
+        seen_edges = set()
+        for source, neighbours in enumerate(adjacency):
+            source_component = node_component[source]
+            for target in neighbours:
+                target_component = node_component[target]
+                if target_component == source_component:
+                    if target == source:
+                        self._cyclic_components.add(source_component)
+                    continue
+                edge = (source_component, target_component)
+                if edge not in seen_edges:
+                    seen_edges.add(edge)
+                    self.dag[source_component].append(target_component)
+
+        for component_index, members in enumerate(self.components):
+            if len(members) > 1:
+                self._cyclic_components.add(component_index)
+            if component_index in self._cyclic_components:
+                self.cycle_groups.append(members)
+
+    @staticmethod
+    def _index_graph(graph: Mapping[str, Iterable[str]]) -> Tuple[List[str], List[List[int]]]:
+        nodes: List[str] = []
+        node_ids: Dict[str, int] = {}
+        adjacency: List[List[int]] = []
+
+        def node_id(package: str) -> int:
+            existing = node_ids.get(package)
+            if existing is None:
+                existing = node_ids[package] = len(nodes)
+                nodes.append(package)
+                adjacency.append([])
+            return existing
+
+        for package, dependencies in graph.items():
+            source = node_id(package)
+            for dep in dependencies:
+                adjacency[source].append(node_id(dep))
+
+        return nodes, adjacency
+
+    def topological_order(self) -> List[int]:
+        return list(range(len(self.components) - 1, -1, -1))
+
+    def is_cyclic(self, component_index: int) -> bool:
+        return component_index in self._cyclic_components
+
+    def group_of(self, package: str) -> List[str]:
+        component_index = self.component_of.get(package)
+        if component_index is None or component_index not in self._cyclic_components:
+            return []
+        return self.components[component_index]
@@ -0,0 +1,255 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from stage1 import ConfigError
+from graph_algorithms import CondensedGraph
+from graph_store import CompactGraph
+from profiler import PROFILER
+
+FINGERPRINT_SIZE = 16
+EXPANDED_MARK = b"\1"
+LEAF_MARK = b"\0"
+
+
+def split_key(package_key: str) -> Tuple[str, str]:
+    name, _, version = package_key.rpartition('@')
+    return (name, version) if name else (package_key, "")
+
+
+class SubtreeFingerprints:
+    @PROFILER.timed('diff.fingerprints')
+    def __init__(self, graph: Mapping[str, Iterable[str]], condensed: Optional[CondensedGraph] = None):
+        self.condensed = condensed if condensed is not None else CondensedGraph(graph)
+        self.nodes = self.condensed.nodes
+        self.fingerprints: List[bytes] = [b""] * len(self.nodes)
+        if isinstance(graph, CompactGraph):
+            self.expanded = [graph.is_expanded(node_id) for node_id in range(len(self.nodes))]
+        else:
+            self.expanded = [node in graph for node in self.nodes]
+
+        for component_index, members in enumerate(self.condensed.component_members):
+            if self.condensed.is_cyclic(component_index):
+                self._hash_cycle(members)
+            else:
+                self._hash_node(members[0])
+
+        self.known: Set[bytes] = set(self.fingerprints)
+
+    def _hash_node(self, node_id: int) -> None:
+        fingerprints = self.fingerprints
+        digest = hashlib.blake2b(self.nodes[node_id].encode('utf-8'), digest_size=FINGERPRINT_SIZE)
+        digest.update(EXPANDED_MARK if self.expanded[node_id] else LEAF_MARK)
+        for child in sorted(fingerprints[target] for target in self.condensed.adjacency[node_id]):
+            digest.update(child)
+        fingerprints[node_id] = digest.digest()
+
+    def _hash_cycle(self, members: List[int]) -> None:
+        nodes = self.nodes
+        node_component = self.condensed.node_component
+        component_index = node_component[members[0]]
+        fingerprints = self.fingerprints
+
+        group = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+        for node_id in sorted(members, key=nodes.__getitem__):
+            group.update(hashlib.blake2b(nodes[node_id].encode('utf-8'), digest_size=FINGERPRINT_SIZE).digest())
+            group.update(EXPANDED_MARK if self.expanded[node_id] else LEAF_MARK)
+            children = []
+            for target in self.condensed.adjacency[node_id]:
+                if node_component[target] == component_index:
+                    children.append(EXPANDED_MARK + hashlib.blake2b(nodes[target].encode('utf-8'),
+                                                                    digest_size=FINGERPRINT_SIZE).digest())
+                else:
+                    children.append(LEAF_MARK + fingerprints[target])
+            for child in sorted(children):
+                group.update(child)
+        group_digest = group.digest()
+
+        for node_id in members:
+            digest = hashlib.blake2b(group_digest, digest_size=FINGERPRINT_SIZE)
+            digest.update(nodes[node_id].encode('utf-8'))
+            fingerprints[node_id] = digest.digest()
+
+    def __contains__(self, fingerprint: object) -> bool:
+        return fingerprint in self.known
+
+    def node_id(self, package_key: str) -> Optional[int]:
+        component_index = self.condensed.component_of.get(package_key)
+        if component_index is None:
+            return None
+        for node_id in self.condensed.component_members[component_index]:
+            if self.nodes[node_id] == package_key:
+                return node_id
+        return None
+
+
+class GraphDiff:
+    def __init__(self, old_graph: Mapping[str, Iterable[str]], old_root: str,
+                 new_graph: Mapping[str, Iterable[str]], new_root: str):
+        self.old_graph = old_graph
+        self.new_graph = new_graph
+        self.old_root = old_root
+        self.new_root = new_root
+        self.skipped_subtrees = 0
+        self.compared_packages = 0
+        self.added_packages: List[str] = []
+        self.removed_packages: List[str] = []
+        self.reversioned_packages: List[Dict[str, Any]] = []
+        self.added_edges: List[Dict[str, str]] = []
+        self.removed_edges: List[Dict[str, str]] = []
+        self.changed_edges: List[Dict[str, str]] = []
+
+    @PROFILER.timed('diff.compare')
+    def compare(self) -> None:
+        old_prints = SubtreeFingerprints(self.old_graph)
+        new_prints = SubtreeFingerprints(self.new_graph)
+
+        old_changed, self.skipped_subtrees = self._changed_packages(old_prints, new_prints, self.old_root)
+        new_changed, _ = self._changed_packages(new_prints, old_prints, self.new_root)
+        self.compared_packages = len(old_changed) + len(new_changed)
+
+        removed = [key for key in old_changed if key not in new_prints.condensed.component_of]
+        added = [key for key in new_changed if key not in old_prints.condensed.component_of]
+        removed_by_name = self._group_versions(removed)
+        added_by_name = self._group_versions(added)
+
+        sources: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for key in old_changed:
+            if key in new_changed:
+                sources[key] = (key, key)
+        for name in sorted(removed_by_name.keys() | added_by_name.keys()):
+            old_versions = removed_by_name.get(name, [])
+            new_versions = added_by_name.get(name, [])
+            if old_versions and new_versions:
+                self.reversioned_packages.append({'name': name, 'old_versions': old_versions,
+                                                  'new_versions': new_versions})
+                if len(old_versions) == 1 and len(new_versions) == 1:
+                    sources[f"{name}@{new_versions[0]}"] = (f"{name}@{old_versions[0]}",
+                                                            f"{name}@{new_versions[0]}")
+                    continue
+            else:
+                self.removed_packages.extend(f"{name}@{version}" for version in old_versions)
+                self.added_packages.extend(f"{name}@{version}" for version in new_versions)
+            for version in old_versions:
+                sources.setdefault(f"{name}@{version}", (f"{name}@{version}", None))
+            for version in new_versions:
+                sources.setdefault(f"{name}@{version}", (None, f"{name}@{version}"))
+
+        for old_key, new_key in sorted(sources.values(), key=lambda pair: pair[1] or pair[0]):
+            self._compare_edges(old_key, new_key)
+
+    @staticmethod
+    def _changed_packages(prints: SubtreeFingerprints, other: SubtreeFingerprints,
+                          root: str) -> Tuple[Set[str], int]:
+        root_id = prints.node_id(root)
+        if root_id is None:
+            return set(), 0
+
+        adjacency = prints.condensed.adjacency
+        fingerprints = prints.fingerprints
+        changed = {root_id}
+        stack = [root_id]
+        skipped = set()
+        while stack:
+            node_id = stack.pop()
+            if fingerprints[node_id] in other:
+                skipped.add(node_id)
+                continue
+            for target in adjacency[node_id]:
+                if target not in changed:
+                    changed.add(target)
+                    stack.append(target)
+
+        return {prints.nodes[node_id] for node_id in changed - skipped}, len(skipped)
+
+    @staticmethod
+    def _group_versions(keys: Iterable[str]) -> Dict[str, List[str]]:
+        versions: Dict[str, List[str]] = {}
+        for key in keys:
+            name, version = split_key(key)
+            versions.setdefault(name, []).append(version)
+        for name in versions:
+            versions[name].sort()
+        return versions
+
+    def _dependencies(self, graph: Mapping[str, Iterable[str]], key: Optional[str]) -> Dict[str, List[str]]:
+        dependencies: Dict[str, List[str]] = {}
+        if key is not None and key in graph:
+            for dep in graph[key]:
+                name, version = split_key(dep)
+                dependencies.setdefault(name, []).append(version)
+        return dependencies
+
+    def _compare_edges(self, old_key: Optional[str], new_key: Optional[str]) -> None:
+        old_dependencies = self._dependencies(self.old_graph, old_key)
+        new_dependencies = self._dependencies(self.new_graph, new_key)
+
+        for name in sorted(old_dependencies.keys() | new_dependencies.keys()):
+            old_versions = sorted(old_dependencies.get(name, []))
+            new_versions = sorted(new_dependencies.get(name, []))
+            if old_versions == new_versions:
+                continue
+            if len(old_versions) == 1 and len(new_versions) == 1:
+                self.changed_edges.append({'source': new_key, 'dependency': name,
+                                           'old_version': old_versions[0], 'new_version': new_versions[0]})
+                continue
+            for version in old_versions:
+                if version not in new_versions:
+                    self.removed_edges.append({'source': old_key, 'target': f"{name}@{version}"})
+            for version in new_versions:
+                if version not in old_versions:
+                    self.added_edges.append({'source': new_key, 'target': f"{name}@{version}"})
+
+    def is_empty(self) -> bool:
+        return not (self.added_packages or self.removed_packages or self.reversioned_packages or
+                    self.added_edges or self.removed_edges or self.changed_edges)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'old_root': self.old_root,
+            'new_root': self.new_root,
+            'skipped_subtrees': self.skipped_subtrees,
+            'compared_packages': self.compared_packages,
+            'added_packages': self.added_packages,
+            'removed_packages': self.removed_packages,
+            'reversioned_packages': self.reversioned_packages,
+            'added_edges': self.added_edges,
+            'removed_edges': self.removed_edges,
+            'changed_edges': self.changed_edges
+        }
+
+    def save(self, filename: str) -> None:
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.as_dict(), f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            raise ConfigError(f"Ошибка записи результата сравнения {filename}: {e}")
+
+    def display(self) -> None:
+        print(f"\nСравнение графов {self.old_root} -> {self.new_root}:")
+        print("-" * 60)
+        print(f"Совпадающих поддеревьев пропущено: {self.skipped_subtrees}, "
+              f"пакетов сравнено: {self.compared_packages}")
+
+        if self.is_empty():
+            print("Различий нет")
+            return
+
+        sections = (
+            ("Добавленные пакеты", [f"  + {key}" for key in self.added_packages]),
+            ("Удаленные пакеты", [f"  - {key}" for key in self.removed_packages]),
+            ("Пакеты со сменой версии",
+             [f"  ~ {item['name']}: {', '.join(item['old_versions'])} -> {', '.join(item['new_versions'])}"
+              for item in self.reversioned_packages]),
+            ("Добавленные зависимости",
+             [f"  + {edge['source']} -> {edge['target']}" for edge in self.added_edges]),
+            ("Удаленные зависимости",
+             [f"  - {edge['source']} -> {edge['target']}" for edge in self.removed_edges]),
+            ("Измененные зависимости",
+             [f"  ~ {edge['source']} -> {edge['dependency']}: {edge['old_version']} -> {edge['new_version']}"
+              for edge in self.changed_edges])
+        )
+        for title, lines in sections:
+            if lines:
+                print(f"\n{title} ({len(lines)}):")
+                for line in lines:
+                    print(line)
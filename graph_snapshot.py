@@ -0,0 +1,213 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Tuple
+from stage1 import ConfigError
+from graph_store import CompactGraph
+from framework_masks import FRAMEWORKS
+
+SNAPSHOT_MAGIC = b"NGSNAP\0\0"
+SNAPSHOT_VERSION = 2
+SECTIONS = ("parameters", "strings", "string_offsets", "sorted_ids", "starts", "counts", "targets", "order",
+            "edge_masks")
+HEADER = struct.Struct("<8sIIQQQ" + "QQ" * len(SECTIONS))
+ALIGNMENT = 8
+
+
+def _little_endian(buffer: array) -> array:
+    if sys.byteorder != 'little':
+        buffer = array(buffer.typecode, buffer)
+        buffer.byteswap()
+    return buffer
+
+
+def write_snapshot(graph: CompactGraph, filename: str, parameters: Dict[str, Any]) -> int:
+    keys_by_id = graph.keys_by_id
+    node_count = len(keys_by_id)
+
+    encoded = [key.encode('utf-8') for key in keys_by_id]
+    string_offsets = array('q', [0])
+    position = 0
+    for key in encoded:
+        position += len(key)
+        string_offsets.append(position)
+
+    sorted_ids = array('i', sorted(range(node_count), key=keys_by_id.__getitem__))
+    starts = array('q', bytes(8 * node_count))
+    counts = array('i', [-1]) * node_count
+    targets = array('i')
+    edge_masks = array('i')
+    order = array('i', graph.expanded_ids())
+    for node_id in order:
+        neighbours = graph.neighbours(node_id)
+        starts[node_id] = len(targets)
+        counts[node_id] = len(neighbours)
+        targets.extend(neighbours)
+        edge_masks.extend(graph.edge_mask_ids(node_id))
+
+    parameters = {**parameters, 'frameworks': FRAMEWORKS.labels, 'mask_table': graph.mask_table}
+    sections = [
+        json.dumps(parameters, ensure_ascii=False).encode('utf-8'),
+        b"".join(encoded),
+        _little_endian(string_offsets),
+        _little_endian(sorted_ids),
+        _little_endian(starts),
+        _little_endian(counts),
+        _little_endian(targets),
+        _little_endian(order),
+        _little_endian(edge_masks)
+    ]
+
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_filename, 'wb') as f:
+            f.write(bytes(HEADER.size))
+            layout: List[int] = []
+            for section in sections:
+                padding = -f.tell() % ALIGNMENT
+                f.write(bytes(padding))
+                offset = f.tell()
+                if isinstance(section, array):
+                    section.tofile(f)
+                else:
+                    f.write(section)
+                layout.extend((offset, f.tell() - offset))
+
+            size = f.tell()
+            f.seek(0)
+            f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, node_count, len(order), len(targets), *layout))
+        os.replace(temp_filename, filename)
+    except OSError as e:
+        raise ConfigError(f"Ошибка записи снимка графа {filename}: {e}")
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+    return size
+
+
+class SnapshotStrings(Sequence):
+    def __init__(self, strings: memoryview, offsets: memoryview):
+        self._strings = strings
+        self._offsets = offsets
+        self._decoded: List[Optional[str]] = [None] * (len(offsets) - 1)
+
+    def __getitem__(self, node_id: int) -> str:
+        key = self._decoded[node_id]
+        if key is None:
+            if node_id < 0:
+                node_id += len(self)
+            key = self._decoded[node_id] = str(
+                self._strings[self._offsets[node_id]:self._offsets[node_id + 1]], 'utf-8')
+        return key
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+class SnapshotIds:
+    def __init__(self, keys_by_id: SnapshotStrings, sorted_ids: memoryview):
+        self._keys_by_id = keys_by_id
+        self._sorted_ids = sorted_ids
+
+    def get(self, package_key: str, default: Optional[int] = None) -> Optional[int]:
+        if not isinstance(package_key, str):
+            return default
+        position = bisect_left(self._sorted_ids, package_key, key=self._keys_by_id.__getitem__)
+        if position < len(self._sorted_ids):
+            node_id = self._sorted_ids[position]
+            if self._keys_by_id[node_id] == package_key:
+                return node_id
+        return default
+
+    def __contains__(self, package_key: object) -> bool:
+        return self.get(package_key) is not None
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids)
+
+
+class GraphSnapshot(CompactGraph):
+    def __init__(self, filename: str):
+        self.filename = filename
+        try:
+            with open(filename, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Ошибка открытия снимка графа {filename}: {e}")
+
+        if len(self._mmap) < HEADER.size:
+            raise ConfigError(f"Файл {filename} не является снимком графа")
+
+        magic, version, _, node_count, order_count, edge_count, *layout = HEADER.unpack_from(self._mmap)
+        if magic != SNAPSHOT_MAGIC:
+            raise ConfigError(f"Файл {filename} не является снимком графа")
+        if version != SNAPSHOT_VERSION:
+            raise ConfigError(f"Неподдерживаемая версия снимка графа {version} (ожидается {SNAPSHOT_VERSION})")
+
+        view = memoryview(self._mmap)
+        sections: Dict[str, memoryview] = {}
+        for index, name in enumerate(SECTIONS):
+            offset, length = layout[2 * index], layout[2 * index + 1]
+            if offset + length > len(self._mmap):
+                raise ConfigError(f"Снимок графа {filename} поврежден: раздел {name} выходит за конец файла")
+            sections[name] = view[offset:offset + length]
+
+        def numbers(name: str, typecode: str, expected: int) -> Any:
+            section = sections[name]
+            if sys.byteorder != 'little':
+                section = array(typecode, section.tobytes())
+                section.byteswap()
+            else:
+                section = section.cast(typecode)
+            if len(section) != expected:
+                raise ConfigError(f"Снимок графа {filename} поврежден: неверный размер раздела {name}")
+            return section
+
+        self.parameters: Dict[str, Any] = json.loads(str(sections['parameters'], 'utf-8'))
+        self.keys_by_id = SnapshotStrings(sections['strings'], numbers('string_offsets', 'q', node_count + 1))
+        self.ids = SnapshotIds(self.keys_by_id, numbers('sorted_ids', 'i', node_count))
+        self._starts = numbers('starts', 'q', node_count)
+        self._counts = numbers('counts', 'i', node_count)
+        self._targets = numbers('targets', 'i', edge_count)
+        self._order = numbers('order', 'i', order_count)
+        self._edge_masks = numbers('edge_masks', 'i', edge_count)
+        frameworks = self.parameters.get('frameworks', [])
+        self.mask_table = [FRAMEWORKS.remap(mask, frameworks) for mask in self.parameters.get('mask_table', [0])]
+        self._mask_ids = {}
+        for mask_id, mask in enumerate(self.mask_table):
+            self._mask_ids.setdefault(mask, mask_id)
+        self._edge_total = edge_count
+        self.writable = False
+
+    @property
+    def root(self) -> Tuple[str, str]:
+        return self.parameters['package_name'], self.parameters['package_version']
+
+    def _make_writable(self) -> None:
+        if self.writable:
+            return
+        self.keys_by_id = list(self.keys_by_id)
+        self.ids = {key: node_id for node_id, key in enumerate(self.keys_by_id)}
+        self._starts = array('q', bytes(self._starts))
+        self._counts = array('i', bytes(self._counts))
+        self._targets = array('i', bytes(self._targets))
+        self._order = array('i', bytes(self._order))
+        self._edge_masks = array('i', bytes(self._edge_masks))
+        self.writable = True
+
+    def intern(self, package_key: str) -> int:
+        node_id = self.ids.get(package_key)
+        if node_id is not None:
+            return node_id
+        self._make_writable()
+        return super().intern(package_key)
+
+    def set_dependencies(self, package_key: str, dependencies: List[str],
+                         masks: Optional[List[int]] = None) -> int:
+        self._make_writable()
+        return super().set_dependencies(package_key, dependencies, masks)
@@ -0,0 +1,132 @@
+from array import array
+from collections.abc import ItemsView, Mapping
+from typing import Dict, Iterator, List, Optional
+
+
+class CompactItemsView(ItemsView):
+    def __iter__(self):
+        graph = self._mapping
+        keys_by_id = graph.keys_by_id
+        for node_id in graph.expanded_ids():
+            yield keys_by_id[node_id], [keys_by_id[target] for target in graph.neighbours(node_id)]
+
+
+class CompactGraph(Mapping):
+    def __init__(self):
+        self.keys_by_id: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._starts = array('q')
+        self._counts = array('i')
+        self._targets = array('i')
+        self._order = array('i')
+        self._edge_masks = array('i')
+        self.mask_table: List[int] = [0]
+        self._mask_ids: Dict[int, int] = {0: 0}
+        self._edge_total = 0
+
+    def intern(self, package_key: str) -> int:
+        node_id = self.ids.get(package_key)
+        if node_id is None:
+            node_id = len(self.keys_by_id)
+            self.ids[package_key] = node_id
+            self.keys_by_id.append(package_key)
+            self._starts.append(0)
+            self._counts.append(-1)
+        return node_id
+
+    def node_id(self, package_key: str) -> Optional[int]:
+        return self.ids.get(package_key)
+
+    def key(self, node_id: int) -> str:
+        return self.keys_by_id[node_id]
+
+    def _mask_id(self, mask: int) -> int:
+        mask_id = self._mask_ids.get(mask)
+        if mask_id is None:
+            mask_id = self._mask_ids[mask] = len(self.mask_table)
+            self.mask_table.append(mask)
+        return mask_id
+
+    def set_dependencies(self, package_key: str, dependencies: List[str],
+                         masks: Optional[List[int]] = None) -> int:
+        source = self.intern(package_key)
+        if self._counts[source] < 0:
+            self._order.append(source)
+        else:
+            self._edge_total -= self._counts[source]
+
+        self._starts[source] = len(self._targets)
+        self._counts[source] = len(dependencies)
+        self._edge_total += len(dependencies)
+        for dep in dependencies:
+            self._targets.append(self.intern(dep))
+        if masks is None:
+            self._edge_masks.frombytes(bytes(self._edge_masks.itemsize * len(dependencies)))
+        else:
+            mask_id = self._mask_id
+            self._edge_masks.extend([mask_id(mask) for mask in masks])
+        return source
+
+    def is_expanded(self, node_id: int) -> bool:
+        return self._counts[node_id] >= 0
+
+    def neighbours(self, node_id: int) -> array:
+        count = self._counts[node_id]
+        if count <= 0:
+            return array('i')
+        start = self._starts[node_id]
+        return self._targets[start:start + count]
+
+    def edge_mask_ids(self, node_id: int) -> array:
+        count = self._counts[node_id]
+        if count <= 0:
+            return array('i')
+        start = self._starts[node_id]
+        return self._edge_masks[start:start + count]
+
+    def edge_masks(self, node_id: int) -> List[int]:
+        mask_table = self.mask_table
+        return [mask_table[mask_id] for mask_id in self.edge_mask_ids(node_id)]
+
+    def framework_mask(self) -> int:
+        mask = 0
+        for edge_mask in self.mask_table:
+            mask |= edge_mask
+        return mask
+
+    def expanded_ids(self) -> array:
+        return self._order
+
+    def node_count(self) -> int:
+        return len(self.keys_by_id)
+
+    def edge_count(self) -> int:
+        return self._edge_total
+
+    def adjacency_lists(self) -> List[List[int]]:
+        return [self.neighbours(node_id).tolist() for node_id in range(len(self.keys_by_id))]
+
+    def memory_usage(self) -> int:
+        return sum(buffer.itemsize * len(buffer)
+                   for buffer in (self._starts, self._counts, self._targets, self._order, self._edge_masks))
+
+    def __getitem__(self, package_key: str) -> List[str]:
+        node_id = self.ids.get(package_key)
+        if node_id is None or self._counts[node_id] < 0:
+            raise KeyError(package_key)
+        keys_by_id = self.keys_by_id
+        return [keys_by_id[target] for target in self.neighbours(node_id)]
+
+    def __contains__(self, package_key: object) -> bool:
+        node_id = self.ids.get(package_key)
+        return node_id is not None and self._counts[node_id] >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        keys_by_id = self.keys_by_id
+        return (keys_by_id[node_id] for node_id in self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def items(self) -> CompactItemsView:
+        return CompactItemsView(self)
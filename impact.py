@@ -0,0 +1,172 @@
+import heapq
+import random
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+from graph_algorithms import CondensedGraph
+from profiler import PROFILER
+
+IMPACT_METRICS = ("dependents", "impact", "pagerank")
+DEFAULT_DAMPING = 0.85
+DEFAULT_DECAY = 0.5
+DEFAULT_SAMPLE_SIZE = 16384
+CYCLE_ITERATIONS = 1000
+CYCLE_TOLERANCE = 1e-12
+SAMPLE_SEED = 1
+
+
+class ImpactAnalyzer:
+    def __init__(self, graph: Mapping[str, Iterable[str]], condensed: Optional[CondensedGraph] = None,
+                 damping: float = DEFAULT_DAMPING, decay: float = DEFAULT_DECAY,
+                 sample_size: int = DEFAULT_SAMPLE_SIZE):
+        self.condensed = condensed if condensed is not None else CondensedGraph(graph)
+        self.nodes = self.condensed.nodes
+        self.damping = damping
+        self.decay = decay
+        self.sample_size = min(sample_size, len(self.nodes))
+        self.dependents: List[int] = []
+        self.impact: List[float] = []
+        self.pagerank: List[float] = []
+
+    @property
+    def exact_dependents(self) -> bool:
+        return self.sample_size == len(self.nodes)
+
+    @PROFILER.timed('impact.analyze')
+    def analyze(self) -> None:
+        self._count_dependents()
+        self._propagate_scores()
+
+    def _count_dependents(self) -> None:
+        condensed = self.condensed
+        node_count = len(self.nodes)
+        component_count = len(condensed.components)
+
+        if self.exact_dependents:
+            probes: Iterable[int] = range(node_count)
+        else:
+            probes = random.Random(SAMPLE_SEED).sample(range(node_count), self.sample_size)
+
+        probe_bits = [0] * component_count
+        node_component = condensed.node_component
+        for bit, node_id in enumerate(probes):
+            probe_bits[node_component[node_id]] |= 1 << bit
+
+        scale = node_count / self.sample_size if self.sample_size else 0.0
+        upstream = [0] * component_count
+        component_dependents = [0] * component_count
+        for component_index in range(component_count - 1, -1, -1):
+            ancestors = upstream[component_index]
+            upstream[component_index] = 0
+            component_dependents[component_index] = round(ancestors.bit_count() * scale)
+
+            outgoing = ancestors | probe_bits[component_index]
+            for successor in condensed.dag[component_index]:
+                upstream[successor] |= outgoing
+
+        self.dependents = [0] * node_count
+        for component_index, members in enumerate(condensed.component_members):
+            count = component_dependents[component_index]
+            if condensed.is_cyclic(component_index):
+                count += len(members) - 1
+            for node_id in members:
+                self.dependents[node_id] = count
+
+    def _propagate_scores(self) -> None:
+        condensed = self.condensed
+        adjacency = condensed.adjacency
+        node_component = condensed.node_component
+        damping = self.damping
+        decay = self.decay
+        component_count = len(condensed.components)
+
+        component_impact = [0.0] * component_count
+        pagerank = [0.0] * len(self.nodes)
+
+        for component_index in range(component_count - 1, -1, -1):
+            members = condensed.component_members[component_index]
+            impact_share = len(members) + decay * component_impact[component_index]
+            for successor in condensed.dag[component_index]:
+                component_impact[successor] += impact_share
+
+            if condensed.is_cyclic(component_index):
+                self._solve_cycle(members, pagerank)
+            else:
+                pagerank[members[0]] += 1.0
+
+            for node_id in members:
+                targets = adjacency[node_id]
+                if not targets:
+                    continue
+                rank_share = damping * pagerank[node_id] / len(targets)
+                for target in targets:
+                    if node_component[target] != component_index:
+                        pagerank[target] += rank_share
+
+        self.impact = [0.0] * len(self.nodes)
+        for component_index, members in enumerate(condensed.component_members):
+            value = component_impact[component_index]
+            if condensed.is_cyclic(component_index):
+                value += len(members) - 1
+            for node_id in members:
+                self.impact[node_id] = value
+
+        total = sum(pagerank)
+        self.pagerank = [rank / total for rank in pagerank] if total else pagerank
+
+    def _solve_cycle(self, members: List[int], pagerank: List[float]) -> None:
+        adjacency = self.condensed.adjacency
+        member_set = set(members)
+        base = {node_id: pagerank[node_id] + 1.0 for node_id in members}
+        current = dict(base)
+
+        for _ in range(CYCLE_ITERATIONS):
+            following = dict(base)
+            for node_id in members:
+                targets = adjacency[node_id]
+                rank_share = self.damping * current[node_id] / len(targets)
+                for target in targets:
+                    if target in member_set:
+                        following[target] += rank_share
+
+            change = max(abs(following[node_id] - current[node_id]) for node_id in members)
+            current = following
+            if change <= CYCLE_TOLERANCE * max(current.values()):
+                break
+
+        for node_id in members:
+            pagerank[node_id] = current[node_id]
+
+    def scores(self, package: str) -> Optional[Dict[str, Any]]:
+        if package not in self.condensed.component_of:
+            return None
+        return self._row(self._node_id(package))
+
+    def _node_id(self, package: str) -> int:
+        component_index = self.condensed.component_of[package]
+        for node_id in self.condensed.component_members[component_index]:
+            if self.nodes[node_id] == package:
+                return node_id
+        raise KeyError(package)
+
+    def _row(self, node_id: int) -> Dict[str, Any]:
+        return {
+            'package': self.nodes[node_id],
+            'dependents': self.dependents[node_id],
+            'impact': self.impact[node_id],
+            'pagerank': self.pagerank[node_id]
+        }
+
+    def top(self, count: int, metric: str = "impact") -> List[Dict[str, Any]]:
+        values = getattr(self, metric)
+        return [self._row(node_id) for node_id in heapq.nlargest(count, range(len(values)), key=values.__getitem__)]
+
+    def display_top(self, count: int, metric: str = "impact") -> None:
+        rows = self.top(count, metric)
+        estimate = "" if self.exact_dependents else f" (оценка по выборке из {self.sample_size} пакетов)"
+
+        print(f"\nНаиболее рискованные пакеты (топ-{count} по метрике {metric}):")
+        print(f"Зависимых - число пакетов, транзитивно зависящих от пакета{estimate}")
+        print("-" * 100)
+        print(f"{'#':>4}  {'Пакет':<56}{'Зависимых':>10}{'Влияние':>14}{'PageRank':>14}")
+        for position, row in enumerate(rows, 1):
+            print(f"{position:>4}  {row['package']:<56}{row['dependents']:>10}"
+                  f"{row['impact']:>14.2f}{row['pagerank']:>14.6f}")
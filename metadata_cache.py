@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from stage1 import ConfigError
+from dependency_record import Dependency
+from stage2 import DependencyCollector
+from profiler import PROFILER
+
+CACHE_FILENAME = "metadata.sqlite3"
+TOUCH_BATCH_SIZE = 256
+CACHE_SCHEMA_VERSION = 2
+CACHE_TABLES = {"dependencies": "accessed_at", "versions": "fetched_at"}
+
+
+class MetadataCache:
+    def __init__(self, cache_dir: str, ttl: float = 86400, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._touched: List[Tuple[float, str, str, str]] = []
+        self._lock = threading.RLock()
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.path = os.path.join(cache_dir, CACHE_FILENAME)
+            self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            if self.connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_SCHEMA_VERSION:
+                self.connection.execute("DROP TABLE IF EXISTS dependencies")
+                self.connection.execute("DROP TABLE IF EXISTS versions")
+                self.connection.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS dependencies ("
+                "source TEXT NOT NULL, package TEXT NOT NULL, version TEXT NOT NULL, "
+                "payload TEXT NOT NULL, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (source, package, version))"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS dependencies_accessed ON dependencies (accessed_at)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                "source TEXT NOT NULL, package TEXT NOT NULL, payload TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, PRIMARY KEY (source, package))"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS versions_fetched ON versions (fetched_at)")
+            self._rows = {table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                          for table in CACHE_TABLES}
+            self.connection.commit()
+        except (OSError, sqlite3.Error) as e:
+            raise ConfigError(f"Ошибка открытия кэша метаданных {cache_dir}: {e}")
+
+    def get(self, source: str, package: str, version: str) -> Optional[List[Dependency]]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT payload, fetched_at FROM dependencies WHERE source = ? AND package = ? AND version = ?",
+                (source, package, version)
+            ).fetchone()
+
+            now = time.time()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                self.misses += 1
+                PROFILER.count('metadata_cache.misses')
+                return None
+
+            self.hits += 1
+            PROFILER.count('metadata_cache.hits')
+            self._touched.append((now, source, package, version))
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                self.flush()
+        return [Dependency.from_mapping(dependency) for dependency in json.loads(row[0])]
+
+    def put_many(self, source: str, entries: List[Tuple[str, str, List[Dependency]]]) -> None:
+        if not entries:
+            return
+
+        now = time.time()
+        rows = [(source, package, version,
+                 json.dumps([dict(dependency) for dependency in dependencies], ensure_ascii=False), now, now)
+                for package, version, dependencies in entries]
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO dependencies "
+                "(source, package, version, payload, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._written("dependencies", len(entries))
+            self.flush()
+
+    def put(self, source: str, package: str, version: str, dependencies: List[Dependency]) -> None:
+        self.put_many(source, [(package, version, dependencies)])
+
+    def get_versions(self, source: str, package: str) -> Optional[List[str]]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT payload, fetched_at FROM versions WHERE source = ? AND package = ?",
+                (source, package.lower())
+            ).fetchone()
+
+            if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put_versions(self, source: str, package: str, versions: List[str]) -> None:
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO versions (source, package, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                (source, package.lower(), json.dumps(versions, ensure_ascii=False), time.time())
+            )
+            self._written("versions", 1)
+            self.connection.commit()
+
+    def _written(self, table: str, rows: int) -> None:
+        self._rows[table] += rows
+        if self.max_entries and self._rows[table] > self.max_entries:
+            self._evict(table)
+
+    def _evict(self, table: str) -> None:
+        if self.ttl:
+            self.connection.execute(f"DELETE FROM {table} WHERE fetched_at < ?", (time.time() - self.ttl,))
+
+        count = self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if count > self.max_entries:
+            PROFILER.count('metadata_cache.evictions', count - self.max_entries)
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY {CACHE_TABLES[table]} LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            count = self.max_entries
+        self._rows[table] = count
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._touched:
+                self.connection.executemany(
+                    "UPDATE dependencies SET accessed_at = ? WHERE source = ? AND package = ? AND version = ?",
+                    self._touched
+                )
+                self._touched = []
+            self.connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+
+class CachedDependencyCollector(DependencyCollector):
+    def __init__(self, collector: DependencyCollector, cache: MetadataCache, source: str):
+        self.config = collector.config
+        self.collector = collector
+        self.cache = cache
+        self.source = source
+        self.source_id = collector.source_id
+        self._resolved: Dict[Tuple[str, str], List[Dependency]] = {}
+
+    def _lookup(self, package: Tuple[str, str]) -> Optional[List[Dependency]]:
+        dependencies = self._resolved.get(package)
+        if dependencies is None:
+            dependencies = self.cache.get(self.source, package[0], package[1])
+            if dependencies is not None:
+                self._resolved[package] = dependencies
+        return dependencies
+
+    def prefetch(self, packages: List[Tuple[str, str]]) -> None:
+        missing = [package for package in dict.fromkeys(packages) if self._lookup(package) is None]
+        if not missing:
+            return
+
+        self.collector.prefetch(missing)
+        entries = []
+        for package_name, version in missing:
+            try:
+                dependencies = self.collector.get_package_dependencies(package_name, version)
+            except ConfigError:
+                continue
+            self._resolved[(package_name, version)] = dependencies
+            entries.append((package_name, version, dependencies))
+        self.cache.put_many(self.source, entries)
+
+    def get_package_versions(self, package_name: str) -> List[str]:
+        versions = self.cache.get_versions(self.source, package_name)
+        if versions is None:
+            versions = self.collector.get_package_versions(package_name)
+            self.cache.put_versions(self.source, package_name, versions)
+        return versions
+
+    def get_package_dependencies(self, package_name: str, version: str) -> List[Dependency]:
+        dependencies = self._lookup((package_name, version))
+        if dependencies is None:
+            self.prefetch([(package_name, version)])
+            dependencies = self._resolved.get((package_name, version))
+        if dependencies is None:
+            return self.collector.get_package_dependencies(package_name, version)
+        return dependencies
+
+    def close(self) -> None:
+        try:
+            self.cache.close()
+        finally:
+            self.collector.close()
@@ -0,0 +1,136 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+GRAM_SIZE = 3
+
+NamePattern = Tuple[str, str]
+
+
+def parse_pattern(pattern: str) -> NamePattern:
+    if pattern.endswith('*'):
+        return 'prefix', pattern[:-1]
+    return 'substring', pattern
+
+
+def pattern_matches(pattern: NamePattern, name: str) -> bool:
+    kind, text = pattern
+    return name.startswith(text) if kind == 'prefix' else text in name
+
+
+class NameIndex:
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._grams: Dict[str, array] = {}
+        self._sorted_names: List[str] = []
+        self._sorted_ids = array('i')
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> int:
+        name_id = self.ids.get(name)
+        if name_id is not None:
+            return name_id
+
+        name_id = len(self.names)
+        self.ids[name] = name_id
+        self.names.append(name)
+        for gram in {name[i:i + GRAM_SIZE] for i in range(len(name) - GRAM_SIZE + 1)}:
+            postings = self._grams.get(gram)
+            if postings is None:
+                postings = self._grams[gram] = array('i')
+            postings.append(name_id)
+        return name_id
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _sorted(self) -> Tuple[List[str], array]:
+        if len(self._sorted_ids) != len(self.names):
+            order = sorted(range(len(self.names)), key=self.names.__getitem__)
+            self._sorted_ids = array('i', order)
+            self._sorted_names = [self.names[name_id] for name_id in order]
+        return self._sorted_names, self._sorted_ids
+
+    def with_prefix(self, prefix: str) -> array:
+        sorted_names, sorted_ids = self._sorted()
+        if not prefix:
+            return sorted_ids
+        start = bisect_left(sorted_names, prefix)
+        end = bisect_left(sorted_names, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        return sorted_ids[start:end]
+
+    def containing(self, text: str) -> List[int]:
+        if len(text) < GRAM_SIZE:
+            return [name_id for name_id, name in enumerate(self.names) if text in name]
+
+        postings = []
+        for gram in {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}:
+            gram_postings = self._grams.get(gram)
+            if gram_postings is None:
+                return []
+            postings.append(gram_postings)
+
+        postings.sort(key=len)
+        candidates: Set[int] = set(postings[0])
+        for gram_postings in postings[1:]:
+            candidates.intersection_update(gram_postings)
+            if not candidates:
+                return []
+
+        names = self.names
+        return sorted(name_id for name_id in candidates if text in names[name_id])
+
+    def match(self, pattern: NamePattern) -> Iterable[int]:
+        kind, text = pattern
+        return self.with_prefix(text) if kind == 'prefix' else self.containing(text)
+
+
+class NameFilter:
+    def __init__(self, index: NameIndex, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 exclude_substring: str = ""):
+        self.index = index
+        self.include = [parse_pattern(pattern) for pattern in include]
+        self.exclude = [parse_pattern(pattern) for pattern in exclude]
+        if exclude_substring:
+            self.exclude.append(('substring', exclude_substring))
+        self._allowed = bytearray()
+        self._refresh()
+
+    @property
+    def active(self) -> bool:
+        return bool(self.include or self.exclude)
+
+    def _refresh(self) -> None:
+        count = len(self.index)
+        allowed = bytearray([0 if self.include else 1]) * count
+        for pattern in self.include:
+            for name_id in self.index.match(pattern):
+                allowed[name_id] = 1
+        for pattern in self.exclude:
+            for name_id in self.index.match(pattern):
+                allowed[name_id] = 0
+        self._allowed = allowed
+
+    def _decide(self, name: str) -> bool:
+        if any(pattern_matches(pattern, name) for pattern in self.exclude):
+            return False
+        return not self.include or any(pattern_matches(pattern, name) for pattern in self.include)
+
+    def allows(self, name: str) -> bool:
+        name_id = self.index.ids.get(name)
+        if name_id is None:
+            name_id = self.index.add(name)
+        allowed = self._allowed
+        while len(allowed) <= name_id:
+            allowed.append(self._decide(self.index.names[len(allowed)]))
+        return bool(allowed[name_id])
+
+    def select(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        if names is None:
+            names = self.index.names
+        return [name for name in names if self.allows(name)]
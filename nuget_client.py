@@ -0,0 +1,316 @@
+import asyncio
+import gzip
+import json
+import ssl
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from stage1 import ConfigError
+from dependency_record import Dependency
+from stage2 import DependencyCollector
+from nuget_versions import normalize_version
+from profiler import PROFILER
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+REGISTRATION_TYPES = (
+    "RegistrationsBaseUrl/3.6.0",
+    "RegistrationsBaseUrl/3.4.0",
+    "RegistrationsBaseUrl",
+)
+
+
+class HttpConnectionPool:
+    def __init__(self, max_connections: int = 16, timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.requests = 0
+        self.connections_opened = 0
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    async def get(self, url: str) -> Tuple[int, bytes]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+
+        for _ in range(MAX_REDIRECTS + 1):
+            async with self._semaphore:
+                status, headers, body = await self._request(url)
+            PROFILER.count('nuget.http_requests')
+            PROFILER.count('nuget.http_bytes', len(body))
+            if status in REDIRECT_STATUSES and 'location' in headers:
+                url = urljoin(url, headers['location'])
+                continue
+            return status, body
+
+        raise ConfigError(f"Слишком много перенаправлений: {url}")
+
+    async def _request(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        secure = parts.scheme == 'https'
+        key = (parts.scheme, parts.hostname or '', parts.port or (443 if secure else 80))
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        request = (
+            f"GET {target} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            "User-Agent: nuget-dependency-visualizer\r\n"
+            "Accept: application/json\r\n"
+            "Accept-Encoding: gzip\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode('ascii')
+
+        for attempt in range(2):
+            reader, writer, reused = await self._acquire(key, secure)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, headers, body, keep_alive = await asyncio.wait_for(
+                    self._read_response(reader), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            self.requests += 1
+            if keep_alive:
+                self._idle.setdefault(key, []).append((reader, writer))
+            else:
+                writer.close()
+
+            if headers.get('content-encoding', '').lower() == 'gzip':
+                body = gzip.decompress(body)
+            return status, headers, body
+
+        raise ConfigError(f"Не удалось выполнить запрос: {url}")
+
+    async def _acquire(self, key: Tuple[str, str, int],
+                       secure: bool) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+
+        if secure and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(key[1], key[2], ssl=self._ssl_context if secure else None),
+            self.timeout)
+        self.connections_opened += 1
+        return reader, writer, False
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _, writer in connections:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except (OSError, ssl.SSLError):
+                    pass
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes, bool]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Соединение закрыто сервером")
+
+        http_version, status = status_line.split(None, 2)[:2]
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = http_version == b'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip(), 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        return int(status), headers, body, keep_alive
+
+
+class NuGetClient:
+    def __init__(self, service_index_url: str, max_concurrency: int = 16, timeout: float = 30.0):
+        self.service_index_url = service_index_url
+        self.pool = HttpConnectionPool(max_concurrency, timeout)
+        self._registration_base: Optional[str] = None
+        self._packages: Dict[str, Dict[str, List[Dependency]]] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def get_json(self, url: str) -> Optional[Any]:
+        status, body = await self.pool.get(url)
+        if status == 404:
+            return None
+        if status >= 400:
+            raise ConfigError(f"Ошибка HTTP {status} при запросе {url}")
+        return json.loads(body.decode('utf-8-sig'))
+
+    async def registration_base(self) -> str:
+        if self._registration_base is None:
+            service_index = await self.get_json(self.service_index_url)
+            resources = (service_index or {}).get('resources', [])
+            for resource_type in REGISTRATION_TYPES:
+                for resource in resources:
+                    types = resource.get('@type')
+                    if resource_type == types or (isinstance(types, list) and resource_type in types):
+                        self._registration_base = resource['@id'].rstrip('/') + '/'
+                        return self._registration_base
+            raise ConfigError(f"Ресурс регистрации пакетов не найден в {self.service_index_url}")
+        return self._registration_base
+
+    async def load_package(self, package_name: str) -> Dict[str, List[Dependency]]:
+        package_id = package_name.lower()
+        if package_id in self._packages:
+            return self._packages[package_id]
+
+        pending = self._loading.get(package_id)
+        if pending is None:
+            pending = self._loading[package_id] = asyncio.ensure_future(self._load_registration(package_id))
+        try:
+            return await asyncio.shield(pending)
+        finally:
+            if pending.done():
+                self._loading.pop(package_id, None)
+
+    async def _load_registration(self, package_id: str) -> Dict[str, List[Dependency]]:
+        base = await self.registration_base()
+        registration = await self.get_json(f"{base}{package_id}/index.json")
+        versions: Dict[str, List[Dependency]] = {}
+
+        if registration is not None:
+            pages = registration.get('items', [])
+            missing = [page['@id'] for page in pages if 'items' not in page]
+            fetched = await asyncio.gather(*(self.get_json(url) for url in missing))
+            pages = [page for page in pages if 'items' in page] + [page for page in fetched if page]
+
+            leaves = [leaf for page in pages for leaf in page.get('items', [])]
+            entries = await asyncio.gather(*(self._catalog_entry(leaf) for leaf in leaves))
+            for entry in entries:
+                if entry and 'version' in entry:
+                    versions[normalize_version(entry['version'])] = self._entry_dependencies(entry)
+
+        self._packages[package_id] = versions
+        return versions
+
+    async def _catalog_entry(self, leaf: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        entry = leaf.get('catalogEntry')
+        if isinstance(entry, str):
+            return await self.get_json(entry)
+        return entry
+
+    @staticmethod
+    def _entry_dependencies(entry: Dict[str, Any]) -> List[Dependency]:
+        dependencies = []
+        for group in entry.get('dependencyGroups') or []:
+            target_framework = group.get('targetFramework', '')
+            for dep in group.get('dependencies') or []:
+                dependencies.append(Dependency(dep['id'], dep.get('range') or '', target_framework))
+        return dependencies
+
+    async def get_package_versions(self, package_name: str) -> List[str]:
+        return list(await self.load_package(package_name))
+
+    async def get_package_dependencies(self, package_name: str, version: str) -> Optional[List[Dependency]]:
+        versions = await self.load_package(package_name)
+        return versions.get(normalize_version(version))
+
+    async def fetch_frontier(self, packages: List[Tuple[str, str]]) -> List[Any]:
+        await self.registration_base()
+        results = list(await asyncio.gather(
+            *(self.get_package_dependencies(name, version) for name, version in packages),
+            return_exceptions=True))
+
+        dependency_ids = {dep.name.lower() for dependencies in results if isinstance(dependencies, list)
+                          for dep in dependencies}
+        await asyncio.gather(*(self.load_package(package_id) for package_id in dependency_ids
+                               if package_id not in self._packages), return_exceptions=True)
+        return results
+
+
+class NuGetDependencyCollector(DependencyCollector):
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.dynamic_packages = {}
+        self.repository = None
+        self.source_id = f"nuget:{config['repository_url']}"
+        self.client = NuGetClient(config['repository_url'], config['max_concurrency'])
+        self._loop = asyncio.new_event_loop()
+        self._resolved: Dict[Tuple[str, str], List[Dependency]] = {}
+        self.failures: Dict[Tuple[str, str], str] = {}
+
+    def prefetch(self, packages: List[Tuple[str, str]]) -> None:
+        missing = list(dict.fromkeys(package for package in packages if package not in self._resolved))
+        if not missing:
+            return
+
+        try:
+            results = self._loop.run_until_complete(self.client.fetch_frontier(missing))
+        except ConfigError:
+            raise
+        except Exception as e:
+            raise ConfigError(f"Ошибка загрузки зависимостей из {self.config['repository_url']}: {e}")
+
+        for package, dependencies in zip(missing, results):
+            if isinstance(dependencies, BaseException):
+                self.failures[package] = str(dependencies) or type(dependencies).__name__
+                PROFILER.count('nuget.failed_packages')
+            else:
+                self.failures.pop(package, None)
+                self._resolved[package] = dependencies or []
+
+    def get_package_versions(self, package_name: str) -> List[str]:
+        try:
+            return self._loop.run_until_complete(self.client.get_package_versions(package_name))
+        except ConfigError:
+            raise
+        except Exception as e:
+            raise ConfigError(f"Ошибка получения версий пакета {package_name}: {e}")
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self._loop.run_until_complete(self.client.close())
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        finally:
+            self._loop.close()
+
+    def get_package_dependencies(self, package_name: str, version: str) -> List[Dependency]:
+        try:
+            key = (package_name, version)
+            if key not in self._resolved:
+                self.prefetch([key])
+            if key not in self._resolved:
+                raise ConfigError(f"Ошибка получения зависимостей {package_name}@{version}: "
+                                  f"{self.failures.get(key, 'нет ответа')}")
+            return self._resolved[key]
+        except ConfigError:
+            raise
+        except Exception as e:
+            raise ConfigError(f"Ошибка получения зависимостей: {e}")
@@ -0,0 +1,228 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+VersionKey = Tuple
+
+
+class NuGetVersion:
+    __slots__ = ('original', 'numbers', 'labels', 'key')
+
+    def __init__(self, original: str, numbers: Tuple[int, int, int, int], labels: Tuple[str, ...]):
+        self.original = original
+        self.numbers = numbers
+        self.labels = labels
+        self.key = numbers + (0 if labels else 1, tuple(
+            (0, int(label), '') if label.isdigit() else (1, 0, label) for label in labels))
+
+    @property
+    def is_prerelease(self) -> bool:
+        return bool(self.labels)
+
+    def normalized(self) -> str:
+        numbers = self.numbers if self.numbers[3] else self.numbers[:3]
+        text = '.'.join(str(number) for number in numbers)
+        if self.labels:
+            text += '-' + '.'.join(self.labels)
+        return text
+
+
+@lru_cache(maxsize=65536)
+def parse_version(text: str) -> Optional[NuGetVersion]:
+    release, _, labels = text.strip().split('+', 1)[0].partition('-')
+    parts = release.split('.')
+    if not 1 <= len(parts) <= 4 or not all(part.isdigit() for part in parts):
+        return None
+
+    numbers = [int(part) for part in parts] + [0] * (4 - len(parts))
+    label_parts = tuple(label.lower() for label in labels.split('.')) if labels else ()
+    if any(not label for label in label_parts):
+        return None
+    return NuGetVersion(text.strip(), (numbers[0], numbers[1], numbers[2], numbers[3]), label_parts)
+
+
+def normalize_version(text: str) -> str:
+    version = parse_version(text)
+    return version.normalized() if version is not None else text.strip().lower()
+
+
+class VersionRange:
+    __slots__ = ('minimum', 'include_minimum', 'maximum', 'include_maximum',
+                 'float_prefix', 'float_prerelease', 'float_label')
+
+    def __init__(self):
+        self.minimum: Optional[NuGetVersion] = None
+        self.include_minimum = True
+        self.maximum: Optional[NuGetVersion] = None
+        self.include_maximum = False
+        self.float_prefix: Optional[Tuple[int, ...]] = None
+        self.float_prerelease = False
+        self.float_label = ''
+
+    @property
+    def is_floating(self) -> bool:
+        return self.float_prefix is not None
+
+    @property
+    def allows_prerelease(self) -> bool:
+        return (self.float_prerelease
+                or (self.minimum is not None and self.minimum.is_prerelease)
+                or (self.maximum is not None and self.maximum.is_prerelease))
+
+    def satisfies(self, version: NuGetVersion) -> bool:
+        if self.minimum is not None:
+            if version.key < self.minimum.key or (version.key == self.minimum.key and not self.include_minimum):
+                return False
+        if self.maximum is not None:
+            if version.key > self.maximum.key or (version.key == self.maximum.key and not self.include_maximum):
+                return False
+        if version.is_prerelease and not self.allows_prerelease:
+            return False
+        if self.float_prefix is not None:
+            if version.numbers[:len(self.float_prefix)] != self.float_prefix:
+                return False
+            if version.is_prerelease and not '.'.join(version.labels).startswith(self.float_label):
+                return False
+        return True
+
+    def preferred_literal(self) -> Optional[str]:
+        if self.minimum is not None:
+            if self.is_floating:
+                return NuGetVersion('', self.minimum.numbers, ()).normalized()
+            return self.minimum.original
+        if self.maximum is not None:
+            return self.maximum.original
+        return None
+
+
+def _parse_float(text: str, version_range: VersionRange) -> bool:
+    release, dash, label = text.partition('-')
+    if dash:
+        if not label.endswith('*'):
+            return False
+        version_range.float_prerelease = True
+        version_range.float_label = label[:-1].lower()
+
+    parts = release.split('.')
+    if parts[-1] == '*':
+        parts = parts[:-1]
+    elif not dash:
+        return False
+    if len(parts) > 4 or not all(part.isdigit() for part in parts):
+        return False
+
+    prefix = tuple(int(part) for part in parts)
+    version_range.float_prefix = prefix
+    version_range.minimum = NuGetVersion(text, (prefix + (0, 0, 0, 0))[:4], ('0',) if dash else ())
+    return True
+
+
+@lru_cache(maxsize=65536)
+def parse_range(text: str) -> Optional[VersionRange]:
+    text = text.strip()
+    version_range = VersionRange()
+    if not text:
+        return version_range
+
+    if text[0] not in '[(':
+        if '*' in text:
+            return version_range if _parse_float(text, version_range) else None
+        version_range.minimum = parse_version(text)
+        return version_range if version_range.minimum is not None else None
+
+    if len(text) < 3 or text[-1] not in '])':
+        return None
+
+    version_range.include_minimum = text[0] == '['
+    version_range.include_maximum = text[-1] == ']'
+    body = text[1:-1]
+
+    if ',' not in body:
+        exact = parse_version(body)
+        if exact is None or not (version_range.include_minimum and version_range.include_maximum):
+            return None
+        version_range.minimum = version_range.maximum = exact
+        return version_range
+
+    lower, upper = (part.strip() for part in body.split(',', 1))
+    if lower:
+        if '*' in lower:
+            if not _parse_float(lower, version_range):
+                return None
+        else:
+            version_range.minimum = parse_version(lower)
+            if version_range.minimum is None:
+                return None
+    if upper:
+        version_range.maximum = parse_version(upper)
+        if version_range.maximum is None:
+            return None
+    return version_range
+
+
+class VersionIndex:
+    def __init__(self):
+        self._versions: Dict[str, List[NuGetVersion]] = {}
+        self._keys: Dict[str, List[VersionKey]] = {}
+
+    def __contains__(self, package_name: str) -> bool:
+        return package_name.lower() in self._versions
+
+    def add(self, package_name: str, versions: Iterable[str]) -> None:
+        package_id = package_name.lower()
+        parsed = {version.key: version for version in self._versions.get(package_id, [])}
+        for text in versions:
+            version = parse_version(text)
+            if version is not None:
+                parsed.setdefault(version.key, version)
+
+        ordered = sorted(parsed.values(), key=lambda version: version.key)
+        self._versions[package_id] = ordered
+        self._keys[package_id] = [version.key for version in ordered]
+
+    def versions(self, package_name: str) -> List[str]:
+        return [version.original for version in self._versions.get(package_name.lower(), [])]
+
+    def find_best_match(self, package_name: str, range_text: str) -> Optional[str]:
+        version_range = parse_range(range_text)
+        if version_range is None:
+            return None
+
+        package_id = package_name.lower()
+        versions = self._versions.get(package_id, [])
+        keys = self._keys.get(package_id, [])
+
+        if version_range.is_floating:
+            prefix = version_range.float_prefix
+            start = 0
+            end = len(keys)
+            if prefix:
+                start = bisect_left(keys, prefix + (0,) * (4 - len(prefix)))
+                upper = prefix[:-1] + (prefix[-1] + 1,)
+                end = bisect_left(keys, upper + (0,) * (4 - len(upper)))
+            if version_range.maximum is not None:
+                end = min(end, bisect_right(keys, version_range.maximum.key))
+            for position in range(end - 1, start - 1, -1):
+                if version_range.satisfies(versions[position]):
+                    return versions[position].original
+            return None
+
+        position = 0
+        if version_range.minimum is not None:
+            position = bisect_left(keys, version_range.minimum.key)
+        for position in range(position, len(versions)):
+            version = versions[position]
+            if version_range.maximum is not None and version.key > version_range.maximum.key:
+                break
+            if version_range.satisfies(version):
+                return version.original
+        return None
+
+    def resolve(self, package_name: str, range_text: str) -> str:
+        best_match = self.find_best_match(package_name, range_text)
+        if best_match is not None:
+            return best_match
+
+        version_range = parse_range(range_text)
+        literal = version_range.preferred_literal() if version_range is not None else None
+        return literal if literal is not None else range_text.strip()
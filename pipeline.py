@@ -0,0 +1,78 @@
+import sys
+from typing import Any, Dict, List
+from stage1 import ConfigError, Stage1CLI
+
+PIPELINE_STAGES = (2, 3, 4, 5)
+
+
+def parse_stages(text: str) -> List[int]:
+    stages = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+
+        first, dash, last = part.partition('-')
+        try:
+            numbers = range(int(first), int(last) + 1) if dash else [int(first)]
+        except ValueError:
+            raise ConfigError(f"Некорректный список этапов: '{text}'")
+
+        for number in numbers:
+            if number not in PIPELINE_STAGES:
+                raise ConfigError(f"Неизвестный этап: {number} (доступны этапы 2-5)")
+            stages.add(number)
+
+    if not stages:
+        raise ConfigError("Не выбрано ни одного этапа")
+    return sorted(stages)
+
+
+def run_pipeline(config: Dict[str, Any], stages: List[int]) -> None:
+    graph_builder = None
+    if any(stage > 2 for stage in stages):
+        from stage3 import DependencyGraph
+        graph_builder = DependencyGraph(config)
+
+    from stage2 import Stage2CLI
+    stage2 = Stage2CLI(config, graph_builder.collector if graph_builder is not None else None)
+
+    try:
+        for stage in stages:
+            if stage == 2:
+                stage2.run_stage2()
+            elif stage == 3:
+                from stage3 import Stage3CLI
+                Stage3CLI(config, graph_builder).run_stage3()
+            elif stage == 4:
+                from stage4 import Stage4CLI
+                Stage4CLI(config, graph_builder).run_stage4()
+            elif stage == 5:
+                from stage5 import Stage5CLI
+                Stage5CLI(config, graph_builder).run_stage5()
+    finally:
+        stage2.collector.close()
+
+
+def main_pipeline():
+    cli = Stage1CLI()
+    cli.parser.description = 'Визуализатор графа зависимостей пакетов NuGet - этапы 2-5 в одном процессе'
+    cli.parser.add_argument(
+        '--stages',
+        type=str,
+        default='2-5',
+        help='Запускаемые этапы: номера и диапазоны через запятую, например 3,5 или 2-4 (по умолчанию: 2-5)'
+    )
+    config = cli.run_stage1()
+
+    try:
+        stages = parse_stages(cli.args.stages)
+    except ConfigError as e:
+        print(f"Ошибка конфигурации: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    run_pipeline(config, stages)
+
+
+if __name__ == "__main__":
+    main_pipeline()
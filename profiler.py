@@ -0,0 +1,147 @@
+import atexit
+import functools
+import json
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+HIT_SUFFIX = '.hits'
+MISS_SUFFIX = '.misses'
+
+
+def peak_rss_kb() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss_kb // 1024 if sys.platform == 'darwin' else rss_kb
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> "_Phase":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.add_time(self.name, time.perf_counter() - self.started)
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.output_file = ""
+        self.started = 0.0
+        self.phases: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, output_file: str = "") -> None:
+        if not self.enabled:
+            atexit.register(self.finish)
+        self.enabled = True
+        self.output_file = output_file
+        self.started = time.perf_counter()
+
+    def timed(self, name: str) -> Callable[[Callable], Callable]:
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Phase(self, name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def instrument(self, instance: Any, method_names: List[str], prefix: str) -> None:
+        if self.enabled:
+            for method_name in method_names:
+                method = getattr(instance, method_name)
+                setattr(instance, method_name, self.timed(f"{prefix}.{method_name}")(method))
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            totals = self.phases.get(name)
+            if totals is None:
+                totals = self.phases[name] = [0, 0.0]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def hit_rates(self) -> Dict[str, float]:
+        prefixes = {name[:-len(suffix)] for name in self.counters
+                    for suffix in (HIT_SUFFIX, MISS_SUFFIX) if name.endswith(suffix)}
+        rates = {}
+        for prefix in sorted(prefixes):
+            hits = self.counters.get(prefix + HIT_SUFFIX, 0)
+            total = hits + self.counters.get(prefix + MISS_SUFFIX, 0)
+            if total:
+                rates[prefix] = round(hits / total, 4)
+        return rates
+
+    def report(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {'wall_seconds': round(time.perf_counter() - self.started, 6)}
+        rss_kb = peak_rss_kb()
+        if rss_kb is not None:
+            report['peak_rss_kb'] = rss_kb
+        return {
+            **report,
+            'phases': {name: {'calls': int(calls), 'seconds': round(seconds, 6)}
+                       for name, (calls, seconds) in sorted(self.phases.items())},
+            'counters': dict(sorted(self.counters.items())),
+            'hit_rates': self.hit_rates()
+        }
+
+    def display_report(self, report: Dict[str, Any]) -> None:
+        print("\nПрофиль выполнения:")
+        print("-" * 60)
+        if 'peak_rss_kb' in report:
+            print(f"Общее время: {report['wall_seconds']:.3f} с, пиковый RSS: {report['peak_rss_kb'] / 1024:.1f} МБ")
+        else:
+            print(f"Общее время: {report['wall_seconds']:.3f} с")
+
+        if report['phases']:
+            print(f"\n{'Фаза':<36}{'Вызовов':>9}{'Всего, с':>11}{'Среднее, мс':>13}")
+            for name, phase in sorted(report['phases'].items(), key=lambda item: -item[1]['seconds']):
+                mean_ms = phase['seconds'] / phase['calls'] * 1000 if phase['calls'] else 0.0
+                print(f"{name:<36}{phase['calls']:>9}{phase['seconds']:>11.4f}{mean_ms:>13.3f}")
+
+        if report['counters']:
+            print("\nСчетчики:")
+            for name, value in report['counters'].items():
+                print(f"  {name}: {value}")
+
+        if report['hit_rates']:
+            print("\nДоля попаданий в кэш:")
+            for name, rate in report['hit_rates'].items():
+                print(f"  {name}: {rate:.1%}")
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        report = self.report()
+        self.display_report(report)
+        if self.output_file:
+            try:
+                with open(self.output_file, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+                print(f"Отчет профилирования сохранен в {self.output_file}")
+            except OSError as e:
+                print(f"Ошибка сохранения отчета профилирования: {e}", file=sys.stderr)
+        return report
+
+
+PROFILER = Profiler()
@@ -0,0 +1,128 @@
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional
+from stage1 import ConfigError, Stage1Config
+
+CLIENT_COMMANDS = ("build", "reverse", "dot", "ascii", "status", "invalidate")
+DEFAULT_TIMEOUT = 600
+
+
+def parse_settings(settings: List[str]) -> Dict[str, Any]:
+    overrides = {}
+    for setting in settings:
+        key, separator, value = setting.partition('=')
+        if not separator or not key:
+            raise ConfigError(f"Ожидается формат ключ=значение, получено '{setting}'")
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[key] = value
+    return overrides
+
+
+class QueryClient:
+    def __init__(self, host: str, port: int, timeout: float = DEFAULT_TIMEOUT):
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def request(self, command: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if command == "status":
+            request = urllib.request.Request(f"{self.base_url}/status")
+        else:
+            body = json.dumps(payload or {}, ensure_ascii=False).encode('utf-8')
+            request = urllib.request.Request(f"{self.base_url}/{command}", data=body,
+                                             headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error', e.reason)
+            except (ValueError, AttributeError):
+                message = e.reason
+            raise ConfigError(message)
+        except (urllib.error.URLError, OSError) as e:
+            raise ConfigError(f"Сервер запросов недоступен по адресу {self.base_url}: {e}")
+
+
+def build_payload(args: argparse.Namespace) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {'config': parse_settings(args.set)}
+    if args.package:
+        payload['package'] = args.package
+    if args.version:
+        payload['version'] = args.version
+    if args.framework:
+        payload['config']['framework'] = args.framework
+    if args.target:
+        payload['targets'] = args.target
+    if args.depth is not None:
+        payload['depth'] = args.depth
+    if args.aliases:
+        payload['aliases'] = True
+    if args.start:
+        payload['start'] = args.start
+    return payload
+
+
+def print_response(command: str, response: Dict[str, Any]) -> None:
+    if command == "dot":
+        print(response['dot'])
+    elif command == "ascii":
+        for line in response['lines']:
+            print(line)
+    elif command == "reverse":
+        for target, result in response['results'].items():
+            print(f"Обратные зависимости для пакета {target}:")
+            if not result['reverse_deps']:
+                print("  Обратные зависимости не найдены")
+            for dep in result['reverse_deps']:
+                print(f"{'  ' * dep['depth']}{'↳ ' if dep['depth'] > 0 else '• '}{dep['package']}")
+    else:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+
+    for package_key, error in response.get('failed_packages', {}).items():
+        print(f"Не удалось получить зависимости {package_key}: {error}", file=sys.stderr)
+    if 'cached' in response:
+        source = "из кэша сервера" if response['cached'] else "граф построен"
+        print(f"[{source}, {response['seconds'] * 1000:.1f} мс]", file=sys.stderr)
+
+
+def main_client():
+    parser = argparse.ArgumentParser(description='Клиент сервера запросов графа зависимостей пакетов NuGet')
+    parser.add_argument('command', choices=CLIENT_COMMANDS, help='Команда серверу запросов')
+    parser.add_argument('--config', type=str, default='config.json',
+                        help='Конфигурационный файл с адресом сервера (по умолчанию: config.json)')
+    parser.add_argument('--host', type=str, help='Адрес сервера запросов')
+    parser.add_argument('--port', type=int, help='Порт сервера запросов')
+    parser.add_argument('--package', type=str, help='Имя анализируемого пакета')
+    parser.add_argument('--version', type=str, help='Версия пакета')
+    parser.add_argument('--framework', type=str, metavar='TFM', help='Целевая платформа')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='Переопределить параметр конфигурации сервера для запроса (значение в JSON)')
+    parser.add_argument('--target', action='append', metavar='PACKAGE',
+                        help='reverse: пакет вида имя@версия (можно несколько, по умолчанию - корень)')
+    parser.add_argument('--depth', type=int, help='reverse: глубина поиска обратных зависимостей')
+    parser.add_argument('--aliases', action='store_true', help='dot: короткие идентификаторы узлов')
+    parser.add_argument('--start', type=str, help='ascii: начальный узел дерева (по умолчанию - корень)')
+    parser.add_argument('--json', action='store_true', help='Вывести ответ сервера в формате JSON')
+    args = parser.parse_args()
+
+    try:
+        config = Stage1Config(args.config).read_config()
+        client = QueryClient(args.host or config['server_host'], args.port or config['server_port'])
+        response = client.request(args.command, build_payload(args))
+    except ConfigError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    else:
+        print_response(args.command, response)
+
+
+if __name__ == "__main__":
+    main_client()
@@ -0,0 +1,348 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from stage1 import ConfigError, ValidationError, Stage1CLI, Stage1Config
+from stage2 import DependencyCollector, create_collector
+from stage3 import DependencyGraph
+from stage4 import ReverseDependencyAnalyzer
+from stage5 import GraphVisualizer
+
+QUERY_COMMANDS = ("build", "reverse", "dot", "ascii")
+MAX_REQUEST_BYTES = 1 << 20
+COLLECTOR_KEYS = ("test_mode", "test_repository_path", "repository_url", "online", "max_concurrency",
+                  "use_cache", "cache_dir", "cache_ttl", "cache_max_entries", "synthetic_nodes",
+                  "synthetic_seed", "synthetic_fanout", "synthetic_distribution", "synthetic_levels",
+                  "synthetic_diamond_rate", "synthetic_cycle_rate")
+OUTPUT_KEYS = ("ascii_tree", "dot_output", "dot_gzip", "dot_aliases", "print_dot", "image_format",
+               "layout_engine", "render_timeout", "render_cache_dir", "batch_file", "batch_output", "workers",
+               "profile", "profile_output", "save_snapshot", "impact_top", "impact_metric", "reachability_index",
+               "diff_version", "diff_snapshot", "diff_output", "server_host", "server_port", "server_max_graphs")
+
+
+class CachedGraph:
+    def __init__(self, builder: DependencyGraph):
+        self.builder = builder
+        self.graph = builder.current_view()
+        self.root_key = builder.root_key()
+        self.failed_packages = dict(builder.failed_packages)
+        self.analyzer = ReverseDependencyAnalyzer(self.graph)
+        self.visualizer = GraphVisualizer(builder.config, builder)
+        self.dot: Dict[bool, str] = {}
+        self._summary: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def summary(self) -> Dict[str, Any]:
+        if self._summary is None:
+            self._summary = self._summarize()
+        return self._summary
+
+    def _summarize(self) -> Dict[str, Any]:
+        graph = self.graph
+        return {
+            'root': self.root_key,
+            'nodes': len(graph),
+            'edges': graph.edge_count(),
+            'direct_dependencies': graph[self.root_key] if self.root_key in graph else [],
+            'cyclic_dependencies': sorted(self.builder.cyclic_dependencies),
+            'cycle_groups': self.builder.build_condensed_graph(graph).cycle_groups,
+            'frameworks': self.builder.frameworks()
+        }
+
+    def reverse(self, targets: List[str], max_depth: int) -> Dict[str, Any]:
+        with self._lock:
+            if not self.analyzer.reverse_graph:
+                self.analyzer.build_reverse_graph()
+        results = self.analyzer.find_reverse_dependencies_batch(targets, max_depth)
+        return {
+            target: {
+                'reverse_deps': sorted(result['reverse_deps'], key=lambda dep: (dep['depth'], dep['package'])),
+                'all_dependencies': sorted(result['all_dependencies'])
+            }
+            for target, result in results.items()
+        }
+
+    def dot_text(self, alias_nodes: bool) -> str:
+        text = self.dot.get(alias_nodes)
+        if text is None:
+            text = self.dot[alias_nodes] = self.visualizer.generate_graphviz_dot(self.graph, alias_nodes)
+        return text
+
+    def ascii_tree(self, start_node: str) -> List[str]:
+        if start_node not in self.graph:
+            raise ConfigError(f"Начальный узел {start_node} не найден в графе")
+        return self.visualizer.generate_ascii_tree(self.graph, start_node)
+
+
+class QueryService:
+    def __init__(self, config: Dict[str, Any], config_path: str):
+        self.config_path = config_path
+        file_config = Stage1Config(self.config_path).read_config()
+        self.overrides = {key: value for key, value in config.items() if file_config.get(key) != value}
+        self.config = config
+        self.config_mtime = self._config_mtime()
+        self.graphs: "OrderedDict[str, CachedGraph]" = OrderedDict()
+        self.collectors: Dict[str, DependencyCollector] = {}
+        self._retired: List[DependencyCollector] = []
+        self.started = time.time()
+        self.counters = {'requests': 0, 'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def _config_mtime(self) -> int:
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _validate(self, config: Dict[str, Any]) -> None:
+        manager = Stage1Config(self.config_path)
+        manager.config = config
+        manager._validate_config()
+
+    def refresh_config(self) -> None:
+        mtime = self._config_mtime()
+        if mtime == self.config_mtime:
+            return
+
+        config = Stage1Config(self.config_path).read_config()
+        config.update(self.overrides)
+        self._validate(config)
+        with self._lock:
+            self.config = config
+            self.config_mtime = mtime
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        self.graphs.clear()
+        self._retired.extend(self.collectors.values())
+        self.collectors.clear()
+        self.counters['invalidations'] += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._invalidate()
+
+    def _close_retired(self) -> None:
+        with self._lock:
+            retired, self._retired = self._retired, []
+        for collector in retired:
+            collector.close()
+
+    def close(self) -> None:
+        with self._build_lock:
+            with self._lock:
+                self._invalidate()
+            self._close_retired()
+
+    def resolve_config(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.refresh_config()
+        overrides = request.get('config', {})
+        if not isinstance(overrides, dict):
+            raise ConfigError("Поле config должно быть объектом")
+        unknown = sorted(set(overrides) - set(self.config))
+        if unknown:
+            raise ConfigError(f"Неизвестные параметры конфигурации: {', '.join(unknown)}")
+
+        config = {**self.config, **overrides}
+        if request.get('package'):
+            config['package_name'] = request['package']
+        if request.get('version'):
+            config['package_version'] = request['version']
+
+        self._validate(config)
+        return config
+
+    @staticmethod
+    def _graph_key(config: Dict[str, Any]) -> str:
+        return json.dumps({key: value for key, value in config.items() if key not in OUTPUT_KEYS},
+                          sort_keys=True, ensure_ascii=False)
+
+    @staticmethod
+    def _collector_key(config: Dict[str, Any]) -> str:
+        parameters = {key: config[key] for key in COLLECTOR_KEYS}
+        if not (config['test_mode'] or config['online']):
+            parameters['root'] = [config['package_name'], config['package_version']]
+        return json.dumps(parameters, sort_keys=True, ensure_ascii=False)
+
+    def graph_for(self, config: Dict[str, Any]) -> Tuple[CachedGraph, bool]:
+        key = self._graph_key(config)
+        with self._lock:
+            cached = self.graphs.get(key)
+            if cached is not None:
+                self.graphs.move_to_end(key)
+                self.counters['hits'] += 1
+                return cached, True
+
+        with self._build_lock:
+            self._close_retired()
+            with self._lock:
+                cached = self.graphs.get(key)
+                if cached is not None:
+                    self.counters['hits'] += 1
+                    return cached, True
+                collector_key = self._collector_key(config)
+                collector = self.collectors.get(collector_key)
+
+            if collector is None:
+                collector = create_collector(config)
+                with self._lock:
+                    self.collectors[collector_key] = collector
+            builder = DependencyGraph(config, collector)
+            if config['load_snapshot']:
+                builder.load_snapshot(config['load_snapshot'])
+            else:
+                builder.build_graph(config['package_name'], config['package_version'])
+            cached = CachedGraph(builder)
+
+            with self._lock:
+                self.counters['misses'] += 1
+                if cached.failed_packages:
+                    return cached, False
+                self.graphs[key] = cached
+                while len(self.graphs) > int(self.config['server_max_graphs']):
+                    self.graphs.popitem(last=False)
+        return cached, False
+
+    def handle(self, command: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.counters['requests'] += 1
+
+        config = self.resolve_config(request)
+        cached, hit = self.graph_for(config)
+        response: Dict[str, Any] = {'command': command, 'cached': hit}
+        if cached.failed_packages:
+            response['failed_packages'] = cached.failed_packages
+
+        if command == "build":
+            response.update(cached.summary())
+        elif command == "reverse":
+            targets = request.get('targets') or [cached.root_key]
+            if not isinstance(targets, list) or not all(isinstance(target, str) for target in targets):
+                raise ConfigError("Поле targets должно быть списком пакетов вида имя@версия")
+            response['results'] = cached.reverse(targets, int(request.get('depth', 3)))
+        elif command == "dot":
+            response['dot'] = cached.dot_text(bool(request.get('aliases', config['dot_aliases'])))
+        elif command == "ascii":
+            response['lines'] = cached.ascii_tree(request.get('start') or cached.root_key)
+        return response
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started, 3),
+                'config_path': self.config_path,
+                'graphs': [{'root': cached.root_key, 'max_depth': cached.builder.config['max_depth'],
+                            'framework': cached.builder.config['framework'], 'nodes': len(cached.graph)}
+                           for cached in self.graphs.values()],
+                'collectors': len(self.collectors),
+                **self.counters
+            }
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = "NuGetGraphQuery/1.0"
+
+    @property
+    def service(self) -> QueryService:
+        return self.server.service
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_request(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BYTES:
+            raise ConfigError("Слишком большой запрос")
+        if not length:
+            return {}
+        try:
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ConfigError(f"Некорректный JSON в запросе: {e}")
+        if not isinstance(request, dict):
+            raise ConfigError("Запрос должен быть JSON-объектом")
+        return request
+
+    def do_GET(self) -> None:
+        if self.path == "/status":
+            self._send_json(200, self.service.status())
+        else:
+            self._send_json(404, {'error': f"Неизвестный путь: {self.path}"})
+
+    def do_POST(self) -> None:
+        command = self.path.strip('/')
+        started = time.perf_counter()
+        try:
+            request = self._read_request()
+            if command == "invalidate":
+                self.service.invalidate()
+                response = {'command': command}
+            elif command in QUERY_COMMANDS:
+                response = self.service.handle(command, request)
+            else:
+                self._send_json(404, {'error': f"Неизвестная команда: {command}"})
+                return
+        except (ConfigError, ValidationError, ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"Внутренняя ошибка сервера: {e}"})
+            return
+
+        response['seconds'] = round(time.perf_counter() - started, 6)
+        self._send_json(200, response)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def create_server(config: Dict[str, Any], config_path: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((config['server_host'], int(config['server_port'])), QueryHandler)
+    server.daemon_threads = True
+    server.service = QueryService(config, config_path)
+    return server
+
+
+def main_server():
+    cli = Stage1CLI()
+    cli.parser.description = 'Визуализатор графа зависимостей пакетов NuGet - сервер запросов'
+    cli.parser.add_argument('--host', type=str, help='Адрес сервера запросов (по умолчанию: 127.0.0.1)')
+    cli.parser.add_argument('--port', type=int, help='Порт сервера запросов (по умолчанию: 8770)')
+    config = cli.run_stage1()
+    if cli.args.host:
+        config['server_host'] = cli.args.host
+    if cli.args.port:
+        config['server_port'] = cli.args.port
+
+    try:
+        manager = Stage1Config(cli.args.config)
+        manager.config = config
+        manager._validate_config()
+        server = create_server(config, cli.args.config)
+    except (ConfigError, ValidationError, OSError) as e:
+        print(f"Ошибка запуска сервера запросов: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    host, port = server.server_address[:2]
+    print(f"Сервер запросов запущен на http://{host}:{port} (команды: {', '.join(QUERY_COMMANDS)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nСервер запросов остановлен")
+    finally:
+        server.server_close()
+        server.service.close()
+
+
+if __name__ == "__main__":
+    main_server()
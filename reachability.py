@@ -0,0 +1,107 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from graph_algorithms import CondensedGraph
+from profiler import PROFILER
+
+
+@PROFILER.timed('reachability.traverse')
+def reachable_from(graph: Mapping[str, Iterable[str]], source: str) -> Set[str]:
+    reached: Set[str] = set()
+    stack = [source]
+    while stack:
+        package = stack.pop()
+        if package not in graph:
+            continue
+        for dep in graph[package]:
+            if dep not in reached:
+                reached.add(dep)
+                stack.append(dep)
+    return reached
+
+
+class ReachabilityIndex:
+    @PROFILER.timed('reachability.build')
+    def __init__(self, graph: Mapping[str, Iterable[str]], condensed: Optional[CondensedGraph] = None):
+        self.condensed = condensed if condensed is not None else CondensedGraph(graph)
+        components = self.condensed.components
+
+        self.nodes: List[str] = []
+        self.positions: Dict[str, int] = {}
+        for members in components:
+            for package in members:
+                self.positions[package] = len(self.nodes)
+                self.nodes.append(package)
+
+        self.closures: List[int] = []
+        self.offsets: List[int] = []
+        position = 0
+        for component_index, members in enumerate(components):
+            successors = self.condensed.dag[component_index]
+            offset = min([position] + [self.offsets[successor] for successor in successors])
+            closure = ((1 << len(members)) - 1) << (position - offset)
+            for successor in successors:
+                closure |= self.closures[successor] << (self.offsets[successor] - offset)
+            self.closures.append(closure)
+            self.offsets.append(offset)
+            position += len(members)
+
+    def _closure(self, package: str) -> Tuple[int, int]:
+        component_index = self.condensed.component_of.get(package)
+        if component_index is None:
+            return 0, 0
+        return self.closures[component_index], self.offsets[component_index]
+
+    def reaches(self, source: str, target: str) -> bool:
+        if source == target:
+            component_index = self.condensed.component_of.get(source)
+            return component_index is not None and self.condensed.is_cyclic(component_index)
+
+        closure, offset = self._closure(source)
+        position = self.positions.get(target)
+        if position is None or position < offset:
+            return False
+        return closure >> (position - offset) & 1 == 1
+
+    def reaches_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[bool]:
+        pairs = list(pairs)
+        results = [False] * len(pairs)
+        by_source: Dict[str, List[int]] = {}
+        for index, (source, _) in enumerate(pairs):
+            by_source.setdefault(source, []).append(index)
+
+        positions = self.positions
+        for source, indexes in by_source.items():
+            closure, offset = self._closure(source)
+            if not closure:
+                continue
+
+            packed = closure.to_bytes((closure.bit_length() + 7) // 8, 'little')
+            for index in indexes:
+                target = pairs[index][1]
+                if target == source:
+                    results[index] = self.reaches(source, target)
+                    continue
+                position = positions.get(target)
+                if position is None or position < offset:
+                    continue
+                position -= offset
+                if position >> 3 < len(packed):
+                    results[index] = packed[position >> 3] >> (position & 7) & 1 == 1
+        return results
+
+    def closure_size(self, package: str) -> int:
+        closure, _ = self._closure(package)
+        return max(closure.bit_count() - 1, 0)
+
+    def closure_sizes(self, packages: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        sizes = [closure.bit_count() - 1 for closure in self.closures]
+        component_of = self.condensed.component_of
+        if packages is None:
+            packages = self.nodes
+        return {package: sizes[component_of[package]] for package in packages if package in component_of}
+
+    def closure(self, package: str) -> List[str]:
+        closure, offset = self._closure(package)
+        nodes = self.nodes
+        packed = closure.to_bytes((closure.bit_length() + 7) // 8, 'little')
+        return [nodes[offset + (byte_index << 3) + bit] for byte_index, byte in enumerate(packed) if byte
+                for bit in range(8) if byte >> bit & 1 and nodes[offset + (byte_index << 3) + bit] != package]
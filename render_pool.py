@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from profiler import PROFILER
+
+LAYOUT_ENGINES = ("auto", "dot", "sfdp", "neato", "fdp", "circo", "twopi")
+LARGE_GRAPH_NODES = 500
+HASH_BLOCK_SIZE = 1 << 20
+
+
+class GraphRenderer:
+    def __init__(self, cache_dir: str = ".render_cache", max_workers: Optional[int] = None,
+                 timeout: float = 120, executable: str = "dot"):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.executable = executable
+        self.cache_hits = 0
+        self.renders = 0
+        self._pending: Dict[str, "Future[str]"] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+
+    @staticmethod
+    def choose_engine(engine: str, node_count: int) -> str:
+        if engine == "auto":
+            return "sfdp" if node_count > LARGE_GRAPH_NODES else "dot"
+        return engine
+
+    @staticmethod
+    def _open_dot(dot_filename: str):
+        return gzip.open(dot_filename, 'rb') if dot_filename.endswith('.gz') else open(dot_filename, 'rb')
+
+    def content_hash(self, dot_filename: str, output_format: str, engine: str) -> str:
+        digest = hashlib.sha256(f"{engine}\0{output_format}\0".encode('utf-8'))
+        with self._open_dot(dot_filename) as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def submit(self, dot_filename: str, output_filename: str, output_format: str = "png",
+               engine: str = "dot") -> "Future[str]":
+        key = self.content_hash(dot_filename, output_format, engine)
+        cached_filename = os.path.join(self.cache_dir, f"{key}.{output_format}")
+
+        future: "Future[str]" = Future()
+        with self._lock:
+            rendering = self._pending.get(key)
+            if rendering is None and not os.path.exists(cached_filename):
+                PROFILER.count('render_cache.misses')
+                rendering = self._pending[key] = self._executor.submit(
+                    self._render, key, dot_filename, cached_filename, output_format, engine)
+            elif rendering is None:
+                self.cache_hits += 1
+                PROFILER.count('render_cache.hits')
+
+        if rendering is None:
+            self._deliver(cached_filename, output_filename, future)
+        else:
+            rendering.add_done_callback(lambda done: self._deliver_rendered(done, output_filename, future))
+        return future
+
+    @staticmethod
+    def _deliver(cached_filename: str, output_filename: str, future: "Future[str]") -> None:
+        try:
+            shutil.copyfile(cached_filename, output_filename)
+            future.set_result(output_filename)
+        except OSError as e:
+            future.set_exception(e)
+
+    def _deliver_rendered(self, rendering: "Future[str]", output_filename: str, future: "Future[str]") -> None:
+        error = rendering.exception()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            self._deliver(rendering.result(), output_filename, future)
+
+    @PROFILER.timed('render.subprocess')
+    def _render(self, key: str, dot_filename: str, cached_filename: str, output_format: str, engine: str) -> str:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_filename = f"{cached_filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        command = [self.executable, f'-T{output_format}', f'-K{engine}', '-o', temp_filename]
+
+        try:
+            if dot_filename.endswith('.gz'):
+                with gzip.open(dot_filename, 'rb') as source:
+                    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+                    try:
+                        shutil.copyfileobj(source, process.stdin)
+                        process.stdin.close()
+                        process.wait(timeout=self.timeout)
+                    except BaseException:
+                        process.kill()
+                        process.wait()
+                        raise
+                if process.returncode:
+                    raise subprocess.CalledProcessError(process.returncode, command)
+            else:
+                subprocess.run(command + [dot_filename], check=True, timeout=self.timeout)
+
+            os.replace(temp_filename, cached_filename)
+            self.renders += 1
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            with self._lock:
+                self._pending.pop(key, None)
+        return cached_filename
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
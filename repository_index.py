@@ -0,0 +1,146 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterator, List, Optional, Tuple
+from stage1 import ConfigError
+from dependency_record import Dependency
+
+INDEX_MAGIC = b'NGIDX\x00\x00\x01'
+HEADER = struct.Struct('<8sQQQQ')
+SLOT = struct.Struct('<QII')
+
+
+class RepositoryIndex:
+    def __init__(self, repository_path: str, index_path: Optional[str] = None):
+        if not os.path.isfile(repository_path):
+            raise ConfigError(f"Файл тестового репозитория не найден: {repository_path}")
+
+        self.repository_path = repository_path
+        self.index_path = index_path or repository_path + '.idx'
+        self.record_count = 0
+        self._slot_count = 0
+        self._source_file = None
+        self._source: Optional[mmap.mmap] = None
+        self._index_file = None
+        self._index: Optional[mmap.mmap] = None
+
+        if not self._open_index():
+            self.build_index()
+            if not self._open_index():
+                raise ConfigError(f"Не удалось открыть индекс репозитория: {self.index_path}")
+
+    def _source_signature(self) -> Tuple[int, int]:
+        stat = os.stat(self.repository_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _iter_records(self) -> Iterator[Tuple[int, bytes]]:
+        offset = 0
+        with open(self.repository_path, 'rb') as f:
+            for line in f:
+                stripped = line.strip()
+                if stripped and not stripped.startswith(b'#'):
+                    yield offset, line
+                offset += len(line)
+
+    def build_index(self) -> None:
+        source_size, source_mtime = self._source_signature()
+        record_count = sum(1 for _ in self._iter_records())
+        slot_count = 8
+        while slot_count < record_count * 2:
+            slot_count *= 2
+        mask = slot_count - 1
+
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w+b') as index_file:
+            index_file.truncate(HEADER.size + slot_count * SLOT.size)
+            with mmap.mmap(index_file.fileno(), 0) as index, open(self.repository_path, 'rb') as source:
+                for offset, line in self._iter_records():
+                    key = self._line_key(line)
+                    key_hash = zlib.crc32(key)
+                    slot = key_hash & mask
+
+                    while True:
+                        position = HEADER.size + slot * SLOT.size
+                        stored_offset, stored_length, stored_hash = SLOT.unpack_from(index, position)
+                        if stored_offset == 0:
+                            SLOT.pack_into(index, position, offset + 1, len(line), key_hash)
+                            break
+                        if stored_hash == key_hash:
+                            source.seek(stored_offset - 1)
+                            if self._line_key(source.read(stored_length)) == key:
+                                break
+                        slot = (slot + 1) & mask
+
+                HEADER.pack_into(index, 0, INDEX_MAGIC, source_size, source_mtime, slot_count, record_count)
+                index.flush()
+
+        os.replace(temp_path, self.index_path)
+
+    def _open_index(self) -> bool:
+        if not os.path.isfile(self.index_path):
+            return False
+
+        with open(self.index_path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return False
+
+        magic, source_size, source_mtime, slot_count, record_count = HEADER.unpack(header)
+        if magic != INDEX_MAGIC or (source_size, source_mtime) != self._source_signature():
+            return False
+
+        self.close()
+        self._slot_count = slot_count
+        self.record_count = record_count
+        self._index_file = open(self.index_path, 'rb')
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if source_size:
+            self._source_file = open(self.repository_path, 'rb')
+            self._source = mmap.mmap(self._source_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return True
+
+    def close(self) -> None:
+        for handle in (self._source, self._source_file, self._index, self._index_file):
+            if handle is not None:
+                handle.close()
+        self._source = self._source_file = self._index = self._index_file = None
+
+    @staticmethod
+    def _line_key(line: bytes) -> bytes:
+        return line.split(b'\t', 1)[0].strip()
+
+    def _find_line(self, key: bytes) -> Optional[bytes]:
+        if self._source is None or self._index is None:
+            return None
+
+        key_hash = zlib.crc32(key)
+        mask = self._slot_count - 1
+        slot = key_hash & mask
+
+        while True:
+            stored_offset, stored_length, stored_hash = SLOT.unpack_from(
+                self._index, HEADER.size + slot * SLOT.size)
+            if stored_offset == 0:
+                return None
+            if stored_hash == key_hash:
+                line = self._source[stored_offset - 1:stored_offset - 1 + stored_length]
+                if self._line_key(line) == key:
+                    return line
+            slot = (slot + 1) & mask
+
+    def __contains__(self, package_key: str) -> bool:
+        return self._find_line(package_key.encode('utf-8')) is not None
+
+    def get_dependencies(self, package_name: str, version: str) -> Optional[List[Dependency]]:
+        line = self._find_line(f"{package_name}@{version}".encode('utf-8'))
+        if line is None:
+            return None
+
+        dependencies = []
+        for field in line.decode('utf-8').strip().split('\t')[1:]:
+            parts = field.strip().split('@')
+            if len(parts) < 2 or not parts[0]:
+                continue
+            dependencies.append(Dependency(parts[0], parts[1], parts[2] if len(parts) > 2 else ""))
+        return dependencies
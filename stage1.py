@@ -2,7 +2,11 @@ import json
 import os
 import argparse
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from profiler import PROFILER
+
+CORE_CONFIG_KEYS = ("package_name", "repository_url", "test_mode", "test_repository_path", "package_version",
+                    "ascii_tree", "max_depth", "filter_substring")
 
 class ConfigError(Exception): pass
 
@@ -19,7 +23,49 @@ class Stage1Config:
             "package_version": "13.0.1",
             "ascii_tree": False,
             "max_depth": 3,
-            "filter_substring": ""
+            "filter_substring": "",
+            "include_patterns": [],
+            "exclude_patterns": [],
+            "traversal": "dfs",
+            "online": False,
+            "max_concurrency": 16,
+            "use_cache": True,
+            "cache_dir": ".nuget_cache",
+            "cache_ttl": 86400,
+            "cache_max_entries": 100000,
+            "memo_max_edges": 1000000,
+            "batch_file": "",
+            "batch_output": "batch_summary.json",
+            "workers": 0,
+            "dot_output": "dependency_graph.dot",
+            "dot_gzip": False,
+            "dot_aliases": False,
+            "print_dot": False,
+            "image_format": "png",
+            "layout_engine": "auto",
+            "render_timeout": 120,
+            "render_cache_dir": ".render_cache",
+            "synthetic_nodes": 0,
+            "synthetic_seed": 1,
+            "synthetic_fanout": 2.0,
+            "synthetic_distribution": "poisson",
+            "synthetic_levels": 8,
+            "synthetic_diamond_rate": 0.2,
+            "synthetic_cycle_rate": 0.01,
+            "profile": False,
+            "profile_output": "",
+            "save_snapshot": "",
+            "load_snapshot": "",
+            "framework": "",
+            "impact_top": 0,
+            "impact_metric": "impact",
+            "reachability_index": False,
+            "diff_version": "",
+            "diff_snapshot": "",
+            "diff_output": "",
+            "server_host": "127.0.0.1",
+            "server_port": 8770,
+            "server_max_graphs": 16
         }
         self.config = self.default_config.copy()
 
@@ -44,6 +90,23 @@ class Stage1Config:
         except Exception as e:
             raise ConfigError(f"Ошибка загрузки конфигурации: {e}")
 
+    def read_config(self) -> Dict[str, Any]:
+        config = self.default_config.copy()
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                file_config = json.load(f)
+        except FileNotFoundError:
+            return config
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ConfigError(f"Ошибка загрузки конфигурации: {e}")
+
+        if not isinstance(file_config, dict):
+            raise ConfigError("Файл конфигурации должен содержать JSON-объект")
+        for key, value in file_config.items():
+            if key in config:
+                config[key] = value
+        return config
+
     def _create_default_config(self) -> None:
         try:
             with open(self.config_path, 'w', encoding='utf-8') as f:
@@ -75,14 +138,85 @@ class Stage1Config:
         except (ValueError, TypeError):
             errors.append("Максимальная глубина должна быть целым числом")
 
+        for key in ("include_patterns", "exclude_patterns"):
+            patterns = self.config[key]
+            if not isinstance(patterns, list) or not all(isinstance(p, str) and p.strip('*') for p in patterns):
+                errors.append(f"Параметр {key} должен быть списком непустых шаблонов имен пакетов")
+
+        if self.config["traversal"] not in ("dfs", "bfs"):
+            errors.append("Режим обхода должен быть 'dfs' или 'bfs'")
+
+        try:
+            if int(self.config["max_concurrency"]) < 1:
+                errors.append("Число одновременных запросов должно быть положительным")
+        except (ValueError, TypeError):
+            errors.append("Число одновременных запросов должно быть целым числом")
+
+        if not self.config["dot_output"]:
+            errors.append("Имя DOT-файла не может быть пустым")
+
+        if self.config["image_format"] not in ("png", "svg"):
+            errors.append("Формат изображения должен быть 'png' или 'svg'")
+
+        if self.config["layout_engine"] not in ("auto", "dot", "sfdp", "neato", "fdp", "circo", "twopi"):
+            errors.append(f"Неизвестный движок раскладки Graphviz: {self.config['layout_engine']}")
+
+        if not self.config["render_cache_dir"]:
+            errors.append("Не указан каталог кэша изображений")
+
+        if self.config["use_cache"] and not self.config["cache_dir"]:
+            errors.append("Не указан каталог кэша метаданных")
+
+        if self.config["impact_metric"] not in ("dependents", "impact", "pagerank"):
+            errors.append("Метрика ранжирования должна быть 'dependents', 'impact' или 'pagerank'")
+
+        if self.config["diff_version"] and self.config["diff_snapshot"]:
+            errors.append("Для сравнения графов укажите либо версию, либо снимок графа, но не оба параметра")
+
+        if self.config["synthetic_distribution"] not in ("uniform", "poisson", "powerlaw"):
+            errors.append("Распределение числа зависимостей должно быть 'uniform', 'poisson' или 'powerlaw'")
+
+        try:
+            if int(self.config["synthetic_levels"]) < 1:
+                errors.append("Число уровней синтетического графа должно быть положительным")
+            if float(self.config["synthetic_fanout"]) < 0:
+                errors.append("Среднее число дополнительных зависимостей не может быть отрицательным")
+            diamond_rate = float(self.config["synthetic_diamond_rate"])
+            cycle_rate = float(self.config["synthetic_cycle_rate"])
+            if not (0 <= diamond_rate <= 1 and 0 <= cycle_rate <= 1 and diamond_rate + cycle_rate <= 1):
+                errors.append("Доли ромбовидных и циклических зависимостей должны быть в диапазоне [0, 1] "
+                              "и в сумме не превышать 1")
+        except (ValueError, TypeError):
+            errors.append("Параметры синтетического графа должны быть числами")
+
+        if not self.config["server_host"]:
+            errors.append("Адрес сервера запросов не может быть пустым")
+
+        try:
+            if not 0 < int(self.config["server_port"]) < 65536:
+                errors.append("Порт сервера запросов должен быть в диапазоне 1-65535")
+            if int(self.config["server_max_graphs"]) < 1:
+                errors.append("Число графов в кэше сервера запросов должно быть положительным")
+        except (ValueError, TypeError):
+            errors.append("Параметры сервера запросов должны быть целыми числами")
+
+        for key in ("cache_ttl", "cache_max_entries", "memo_max_edges", "workers", "render_timeout",
+                    "synthetic_nodes", "synthetic_seed", "impact_top"):
+            try:
+                if int(self.config[key]) < 0:
+                    errors.append(f"Параметр {key} не может быть отрицательным")
+            except (ValueError, TypeError):
+                errors.append(f"Параметр {key} должен быть целым числом")
+
         if errors:
             raise ValidationError("; ".join(errors))
 
-    def display_config(self) -> None:
+    def display_config(self, verbose: bool = False) -> None:
         print("Текущая конфигурация:")
         print("-" * 40)
         for key, value in self.config.items():
-            print(f"{key}: {value}")
+            if verbose or key in CORE_CONFIG_KEYS or value != self.default_config.get(key):
+                print(f"{key}: {value}")
         print("-" * 40)
 
 class Stage1CLI:
@@ -90,6 +224,7 @@ class Stage1CLI:
         self.parser = argparse.ArgumentParser(
             description='Визуализатор графа зависимостей пакетов NuGet - Этап 1'
         )
+        self.args: Optional[argparse.Namespace] = None
         self._setup_parser()
 
     def _setup_parser(self) -> None:
@@ -148,9 +283,209 @@ class Stage1CLI:
             help='Подстрока для фильтрации пакетов'
         )
 
+        self.parser.add_argument(
+            '--include',
+            action='append',
+            metavar='PATTERN',
+            help='Оставить только пакеты, имя которых содержит подстроку или начинается с префикса '
+                 '(шаблон вида System.*); можно указать несколько раз'
+        )
+
+        self.parser.add_argument(
+            '--exclude',
+            action='append',
+            metavar='PATTERN',
+            help='Исключить пакеты, имя которых содержит подстроку или начинается с префикса '
+                 '(шаблон вида System.*); можно указать несколько раз'
+        )
+
+        self.parser.add_argument(
+            '--traversal',
+            choices=['dfs', 'bfs'],
+            help='Режим обхода графа при построении (dfs или bfs)'
+        )
+
+        self.parser.add_argument(
+            '--online',
+            action='store_true',
+            help='Загружать зависимости из репозитория NuGet по repository_url'
+        )
+
+        self.parser.add_argument(
+            '--max-concurrency',
+            type=int,
+            help='Максимальное число одновременных запросов к репозиторию'
+        )
+
+        self.parser.add_argument(
+            '--cache-dir',
+            type=str,
+            help='Каталог постоянного кэша метаданных зависимостей'
+        )
+
+        self.parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Не использовать кэш метаданных зависимостей'
+        )
+
+        self.parser.add_argument(
+            '--batch',
+            type=str,
+            help='Файл со списком корневых пакетов (пакет@версия) для пакетного анализа'
+        )
+
+        self.parser.add_argument(
+            '--batch-output',
+            type=str,
+            help='Файл JSON для сводки пакетного анализа'
+        )
+
+        self.parser.add_argument(
+            '--workers',
+            type=int,
+            help='Число процессов пакетного анализа (по умолчанию - число ядер)'
+        )
+
+        self.parser.add_argument(
+            '--dot-output',
+            type=str,
+            help='Имя DOT-файла (по умолчанию: dependency_graph.dot)'
+        )
+
+        self.parser.add_argument(
+            '--dot-gzip',
+            action='store_true',
+            help='Сжимать DOT-файл в формате gzip'
+        )
+
+        self.parser.add_argument(
+            '--dot-aliases',
+            action='store_true',
+            help='Использовать короткие идентификаторы узлов в DOT-файле'
+        )
+
+        self.parser.add_argument(
+            '--print-dot',
+            action='store_true',
+            help='Вывести DOT-описание графа на экран'
+        )
+
+        self.parser.add_argument(
+            '--image-format',
+            choices=['png', 'svg'],
+            help='Формат изображения графа'
+        )
+
+        self.parser.add_argument(
+            '--layout-engine',
+            choices=['auto', 'dot', 'sfdp', 'neato', 'fdp', 'circo', 'twopi'],
+            help='Движок раскладки Graphviz (auto - sfdp для больших графов)'
+        )
+
+        self.parser.add_argument(
+            '--render-timeout',
+            type=int,
+            help='Ограничение времени генерации изображения в секундах'
+        )
+
+        self.parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Вывести все параметры конфигурации, а не только основные и измененные'
+        )
+
+        self.parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Собрать профиль выполнения (время фаз, счетчики, попадания в кэш, пиковый RSS) и вывести сводку'
+        )
+
+        self.parser.add_argument(
+            '--profile-output',
+            type=str,
+            help='Сохранить профиль выполнения в JSON-файл (включает --profile)'
+        )
+
+        self.parser.add_argument(
+            '--save-snapshot',
+            type=str,
+            metavar='FILE',
+            help='Сохранить построенный граф в бинарный снимок после этапа 3'
+        )
+
+        self.parser.add_argument(
+            '--load-snapshot',
+            type=str,
+            metavar='FILE',
+            help='Загрузить граф из бинарного снимка вместо построения (этапы 3-5)'
+        )
+
+        self.parser.add_argument(
+            '--framework',
+            type=str,
+            metavar='TFM',
+            help='Целевая платформа для этапов 4 и 5, например net6.0 или netstandard2.0'
+        )
+
+        self.parser.add_argument(
+            '--impact',
+            type=int,
+            metavar='N',
+            help='Этап 4: вывести N наиболее рискованных пакетов по всему графу вместо анализа отдельных пакетов'
+        )
+
+        self.parser.add_argument(
+            '--impact-metric',
+            choices=['dependents', 'impact', 'pagerank'],
+            help='Метрика ранжирования: число транзитивно зависимых пакетов, влияние с затуханием по глубине '
+                 'или PageRank (по умолчанию: impact)'
+        )
+
+        self.parser.add_argument(
+            '--reachability-index',
+            action='store_true',
+            help='Этап 4: построить битовый индекс достижимости для всего графа вместо обхода от корня '
+                 '(выгодно при большом числе запросов)'
+        )
+
+        self.parser.add_argument(
+            '--diff-version',
+            type=str,
+            metavar='VERSION',
+            help='Этап 3: сравнить граф с графом другой версии того же пакета'
+        )
+
+        self.parser.add_argument(
+            '--diff-snapshot',
+            type=str,
+            metavar='FILE',
+            help='Этап 3: сравнить граф с графом из бинарного снимка'
+        )
+
+        self.parser.add_argument(
+            '--diff-output',
+            type=str,
+            metavar='FILE',
+            help='Сохранить результат сравнения графов в JSON-файл'
+        )
+
+        self.parser.add_argument(
+            '--synthetic-nodes',
+            type=int,
+            help='Использовать синтетический репозиторий из указанного числа пакетов'
+        )
+
+        self.parser.add_argument(
+            '--synthetic-seed',
+            type=int,
+            help='Начальное значение генератора синтетического репозитория'
+        )
+
     def run_stage1(self) -> Dict[str, Any]:
         try:
             args = self.parser.parse_args()
+            self.args = args
 
             config_manager = Stage1Config(args.config)
             config = config_manager.load_config()
@@ -171,9 +506,73 @@ class Stage1CLI:
                 config['max_depth'] = args.max_depth
             if args.filter:
                 config['filter_substring'] = args.filter
+            if args.include:
+                config['include_patterns'] = args.include
+            if args.exclude:
+                config['exclude_patterns'] = args.exclude
+            if args.traversal:
+                config['traversal'] = args.traversal
+            if args.online:
+                config['online'] = True
+            if args.max_concurrency:
+                config['max_concurrency'] = args.max_concurrency
+            if args.cache_dir:
+                config['cache_dir'] = args.cache_dir
+            if args.no_cache:
+                config['use_cache'] = False
+            if args.batch:
+                config['batch_file'] = args.batch
+            if args.batch_output:
+                config['batch_output'] = args.batch_output
+            if args.workers:
+                config['workers'] = args.workers
+            if args.dot_output:
+                config['dot_output'] = args.dot_output
+            if args.dot_gzip:
+                config['dot_gzip'] = True
+            if args.dot_aliases:
+                config['dot_aliases'] = True
+            if args.print_dot:
+                config['print_dot'] = True
+            if args.image_format:
+                config['image_format'] = args.image_format
+            if args.layout_engine:
+                config['layout_engine'] = args.layout_engine
+            if args.render_timeout:
+                config['render_timeout'] = args.render_timeout
+            if args.profile:
+                config['profile'] = True
+            if args.profile_output:
+                config['profile'] = True
+                config['profile_output'] = args.profile_output
+            if args.save_snapshot:
+                config['save_snapshot'] = args.save_snapshot
+            if args.load_snapshot:
+                config['load_snapshot'] = args.load_snapshot
+            if args.impact is not None:
+                config['impact_top'] = args.impact
+            if args.impact_metric:
+                config['impact_metric'] = args.impact_metric
+            if args.reachability_index:
+                config['reachability_index'] = True
+            if args.framework:
+                config['framework'] = args.framework
+            if args.diff_version:
+                config['diff_version'] = args.diff_version
+            if args.diff_snapshot:
+                config['diff_snapshot'] = args.diff_snapshot
+            if args.diff_output:
+                config['diff_output'] = args.diff_output
+            if args.synthetic_nodes:
+                config['synthetic_nodes'] = args.synthetic_nodes
+            if args.synthetic_seed is not None:
+                config['synthetic_seed'] = args.synthetic_seed
 
             config_manager._validate_config()
-            config_manager.display_config()
+            config_manager.display_config(args.verbose)
+
+            if config['profile']:
+                PROFILER.enable(config['profile_output'])
 
             return config
 
@@ -1,84 +1,102 @@
 import json
-from typing import Dict, List, Any
+import os
+from typing import Dict, List, Any, Optional, Tuple
 from stage1 import ConfigError
+from dependency_record import Dependency
+from repository_index import RepositoryIndex
+
+
+COMMON_DEPENDENCIES = (
+    Dependency("Microsoft.NETFramework.ReferenceAssemblies", "4.6.2", ".NETFramework4.6.2"),
+    Dependency("System.Runtime", "4.3.0", ".NETStandard2.0")
+)
+MICROSOFT_DEPENDENCIES = (Dependency("System.Collections", "4.3.0", ".NETStandard2.0"),)
+DEFAULT_NESTED_DEPENDENCIES = (COMMON_DEPENDENCIES[0],)
 
 
 class DependencyCollector:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.dynamic_packages = {}
-        self._create_dynamic_dependencies()
+        self.repository = None
+
+        if config['test_mode'] and config['test_repository_path']:
+            self.repository = RepositoryIndex(config['test_repository_path'])
+            self.source_id = f"file:{os.path.abspath(config['test_repository_path'])}"
+        else:
+            self.source_id = f"demo:{config['package_name']}@{config['package_version']}"
+
+    def _dynamic_dependencies(self) -> Dict[str, Dict[str, List[Dependency]]]:
+        if not self.dynamic_packages:
+            self._create_dynamic_dependencies()
+        return self.dynamic_packages
 
     def _create_dynamic_dependencies(self):
         package_name = self.config['package_name']
         version = self.config['package_version']
 
-        common_dependencies = [
-            {"name": "Microsoft.NETFramework.ReferenceAssemblies", "version": "4.6.2",
-             "target_framework": ".NETFramework4.6.2"},
-            {"name": "System.Runtime", "version": "4.3.0", "target_framework": ".NETStandard2.0"}
-        ]
-
-        specific_deps = self._get_specific_dependencies(package_name, version)
-
-        self.dynamic_packages[package_name] = {
-            version: common_dependencies + specific_deps
-        }
+        dependencies = [*COMMON_DEPENDENCIES, *self._get_specific_dependencies(package_name, version)]
+        self.dynamic_packages[package_name] = {version: dependencies}
 
-        for dep in common_dependencies + specific_deps:
-            dep_name = dep['name']
-            dep_version = dep['version']
-            if dep_name not in self.dynamic_packages:
-                self.dynamic_packages[dep_name] = {
-                    dep_version: self._create_nested_dependencies(dep_name, dep_version)
+        for dep in dependencies:
+            if dep.name not in self.dynamic_packages:
+                self.dynamic_packages[dep.name] = {
+                    dep.version: self._create_nested_dependencies(dep.name, dep.version)
                 }
 
-    def _get_specific_dependencies(self, package_name: str, version: str) -> List[Dict[str, str]]:
-        specific_deps = []
-
+    def _get_specific_dependencies(self, package_name: str, version: str) -> List[Dependency]:
         if "avalonia" in package_name.lower():
-            specific_deps = [
-                {"name": "Avalonia.Base", "version": "11.3.7", "target_framework": "net6.0"},
-                {"name": "Avalonia.Controls", "version": "11.3.7", "target_framework": "net6.0"}
+            return [
+                Dependency("Avalonia.Base", "11.3.7", "net6.0"),
+                Dependency("Avalonia.Controls", "11.3.7", "net6.0")
             ]
         elif "entityframework" in package_name.lower():
-            specific_deps = [
-                {"name": "Microsoft.EntityFrameworkCore", "version": "7.0.0", "target_framework": "net6.0"},
-                {"name": "Microsoft.EntityFrameworkCore.Relational", "version": "7.0.0", "target_framework": "net6.0"}
+            return [
+                Dependency("Microsoft.EntityFrameworkCore", "7.0.0", "net6.0"),
+                Dependency("Microsoft.EntityFrameworkCore.Relational", "7.0.0", "net6.0")
             ]
         else:
-            specific_deps = [
-                {"name": f"{package_name}.Core", "version": version, "target_framework": "net6.0"},
-                {"name": f"{package_name}.Abstractions", "version": version, "target_framework": "net6.0"}
+            return [
+                Dependency(f"{package_name}.Core", version, "net6.0"),
+                Dependency(f"{package_name}.Abstractions", version, "net6.0")
             ]
 
-        return specific_deps
-
-    def _create_nested_dependencies(self, package_name: str, version: str) -> List[Dict[str, str]]:
+    def _create_nested_dependencies(self, package_name: str, version: str) -> List[Dependency]:
         if "microsoft" in package_name.lower():
-            return [
-                {"name": "System.Collections", "version": "4.3.0", "target_framework": ".NETStandard2.0"}
-            ]
+            return list(MICROSOFT_DEPENDENCIES)
         elif "system" in package_name.lower():
             return []
         else:
-            return [
-                {"name": "Microsoft.NETFramework.ReferenceAssemblies", "version": "4.6.2",
-                 "target_framework": ".NETFramework4.6.2"}
-            ]
+            return list(DEFAULT_NESTED_DEPENDENCIES)
 
-    def get_package_dependencies(self, package_name: str, version: str) -> List[Dict[str, str]]:
+    def prefetch(self, packages: List[Tuple[str, str]]) -> None:
+        pass
+
+    def get_package_versions(self, package_name: str) -> List[str]:
+        if self.repository is not None:
+            return []
+        return list(self._dynamic_dependencies().get(package_name, {}))
+
+    def get_package_dependencies(self, package_name: str, version: str) -> List[Dependency]:
         try:
-            if package_name in self.dynamic_packages and version in self.dynamic_packages[package_name]:
-                return self.dynamic_packages[package_name][version]
+            if self.repository is not None:
+                return self.repository.get_dependencies(package_name, version) or []
+
+            dependencies = self._dynamic_dependencies().get(package_name, {}).get(version)
+            if dependencies is not None:
+                return dependencies
             else:
                 return [
-                    {"name": f"{package_name}.Dependency1", "version": "1.0.0", "target_framework": "net6.0"},
-                    {"name": f"{package_name}.Dependency2", "version": "1.0.0", "target_framework": "net6.0"}
+                    Dependency(f"{package_name}.Dependency1", "1.0.0", "net6.0"),
+                    Dependency(f"{package_name}.Dependency2", "1.0.0", "net6.0")
                 ]
         except Exception as e:
             raise ConfigError(f"Ошибка получения зависимостей: {e}")
 
+    def close(self) -> None:
+        if self.repository is not None:
+            self.repository.close()
+
     def display_direct_dependencies(self) -> None:
         package_name = self.config['package_name']
         version = self.config['package_version']
@@ -94,16 +112,34 @@ class DependencyCollector:
                 return
 
             for dep in dependencies:
-                print(f"• {dep['name']} {dep['version']} [{dep['target_framework']}]")
+                print(f"• {dep.name} {dep.version} [{dep.target_framework}]")
 
         except Exception as e:
             print(f"Ошибка при получении зависимостей: {e}")
 
 
+def create_collector(config: Dict[str, Any]) -> DependencyCollector:
+    if config.get('synthetic_nodes'):
+        from synthetic_repository import SyntheticDependencyCollector
+        return SyntheticDependencyCollector(config)
+
+    if config.get('online') and not config['test_mode']:
+        from nuget_client import NuGetDependencyCollector
+        collector = NuGetDependencyCollector(config)
+
+        if config.get('use_cache'):
+            from metadata_cache import MetadataCache, CachedDependencyCollector
+            cache = MetadataCache(config['cache_dir'], config['cache_ttl'], config['cache_max_entries'])
+            collector = CachedDependencyCollector(collector, cache, config['repository_url'])
+        return collector
+
+    return DependencyCollector(config)
+
+
 class Stage2CLI:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], collector: Optional[DependencyCollector] = None):
         self.config = config
-        self.collector = DependencyCollector(config)
+        self.collector = collector if collector is not None else create_collector(config)
 
     def run_stage2(self) -> None:
         print("\nЭТАП 2: Сбор данных о зависимостях")
@@ -118,7 +154,10 @@ def main_stage2():
     from stage1 import main_stage1
     config = main_stage1()
     cli = Stage2CLI(config)
-    cli.run_stage2()
+    try:
+        cli.run_stage2()
+    finally:
+        cli.collector.close()
 
 
 if __name__ == "__main__":
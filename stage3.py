@@ -1,58 +1,414 @@
-import json
-from typing import Dict, List, Set, Any
-from stage2 import DependencyCollector
+from typing import Dict, List, Set, Any, Iterator, Mapping, Optional, Tuple
+from stage1 import ConfigError
+from stage2 import DependencyCollector, create_collector
+from graph_algorithms import CondensedGraph, strongly_connected_components
+from graph_store import CompactGraph
+from framework_masks import FRAMEWORKS
+from subtree_memo import SubtreeMemo, SUBTREE_MEMO
+from nuget_versions import VersionIndex
+from name_index import NameFilter, NameIndex
+from profiler import PROFILER
 
 
 class DependencyGraph:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], collector: Optional[DependencyCollector] = None):
         self.config = config
-        self.collector = DependencyCollector(config)
-        self.graph: Dict[str, List[str]] = {}
+        if collector is None:
+            collector = create_collector(config)
+            PROFILER.instrument(collector, ['prefetch', 'get_package_dependencies', 'get_package_versions'],
+                                'collector')
+        self.collector = collector
+        self.graph = CompactGraph()
+        self.full_graph = CompactGraph()
+        self.root: Optional[Tuple[str, str]] = None
+        self.depths: Dict[str, int] = {}
         self.visited: Set[str] = set()
         self.cyclic_dependencies: Set[str] = set()
+        self.failed_packages: Dict[str, str] = {}
+        self.memo: Optional[SubtreeMemo] = None
+        self.versions = VersionIndex()
+        self.names = NameIndex()
+        self.name_filter = self._create_name_filter()
 
-    def dfs_build_graph(self, package_name: str, version: str, depth: int = 0, path: List[str] = None) -> None:
-        if path is None:
-            path = []
+        if config.get('memo_max_edges'):
+            self.memo = SUBTREE_MEMO
+            self.memo.max_edges = config['memo_max_edges']
 
-        if depth >= self.config['max_depth']:
-            return
+    @PROFILER.timed('graph.build')
+    def build_graph(self, package_name: str, version: str) -> None:
+        self.root = (package_name, version)
+        self.name_filter = self._create_name_filter()
+        if self.config.get('traversal', 'dfs') == 'bfs':
+            self.bfs_build_graph(package_name, version)
+        else:
+            self.dfs_build_graph(package_name, version)
+
+        if self.memo is not None:
+            self._remember_subtrees(f"{package_name}@{version}")
+
+        if PROFILER.enabled:
+            PROFILER.count('graph.nodes', len(self.graph))
+            PROFILER.count('graph.edges', self.graph.edge_count())
+
+    def ensure_built(self, package_name: str, version: str) -> None:
+        if self.root != (package_name, version):
+            self.build_graph(package_name, version)
+
+    def close(self) -> None:
+        self.collector.close()
+
+    def rebuild(self, max_depth: Optional[int] = None, filter_substring: Optional[str] = None,
+                include_patterns: Optional[List[str]] = None,
+                exclude_patterns: Optional[List[str]] = None) -> None:
+        overrides = {'max_depth': max_depth, 'filter_substring': filter_substring,
+                     'include_patterns': include_patterns, 'exclude_patterns': exclude_patterns}
+        self.config = dict(self.config, **{key: value for key, value in overrides.items() if value is not None})
+
+        self.graph = CompactGraph()
+        self.depths = {}
+        self.visited = set()
+        self.cyclic_dependencies = set()
+        self.failed_packages = {}
+
+        if self.root is not None:
+            self.build_graph(*self.root)
+
+    def dfs_build_graph(self, package_name: str, version: str) -> None:
+        max_depth = self.config['max_depth']
+        path: List[str] = []
+        on_path: Set[str] = set()
+        stack: List[Iterator[Tuple[str, str]]] = []
+
+        def enter(name: str, ver: str) -> None:
+            depth = len(path)
+            if depth >= max_depth:
+                return
 
-        package_key = f"{package_name}@{version}"
+            package_key = f"{name}@{ver}"
 
-        if package_key in path:
-            cycle_path = " -> ".join(path + [package_key])
-            self.cyclic_dependencies.add(cycle_path)
+            if package_key in on_path:
+                cycle_path = " -> ".join(path + [package_key])
+                self.cyclic_dependencies.add(cycle_path)
+                return
+
+            if not self._claim(package_key, depth):
+                return
+
+            dependencies = self._expand_package(name, ver, package_key)
+
+            path.append(package_key)
+            on_path.add(package_key)
+            stack.append(iter(dependencies))
+
+        enter(package_name, version)
+
+        while stack:
+            dependency = next(stack[-1], None)
+            if dependency is None:
+                stack.pop()
+                on_path.discard(path.pop())
+            else:
+                enter(*dependency)
+
+    def bfs_build_graph(self, package_name: str, version: str) -> None:
+        max_depth = self.config['max_depth']
+        if max_depth <= 0:
             return
 
-        if package_key in self.visited:
+        root_key = f"{package_name}@{version}"
+        if not self._claim(root_key, 0):
             return
 
+        parents: Dict[str, Optional[str]] = {root_key: None}
+        frontier = [(package_name, version, root_key)]
+        depth = 0
+
+        while frontier:
+            try:
+                self.collector.prefetch([(name, ver) for name, ver, package_key in frontier
+                                         if package_key not in self.full_graph])
+            except ConfigError as e:
+                print(f"Ошибка предварительной загрузки зависимостей: {e}")
+            next_frontier = []
+
+            for name, ver, package_key in frontier:
+                for dep_name, dep_version in self._expand_package(name, ver, package_key):
+                    if depth + 1 >= max_depth:
+                        break
+
+                    dep_key = f"{dep_name}@{dep_version}"
+
+                    if dep_key in parents:
+                        if self.depths[dep_key] <= depth:
+                            chain = self._parent_chain(parents, package_key)
+                            if dep_key in chain:
+                                cycle_path = " -> ".join(chain + [dep_key])
+                                self.cyclic_dependencies.add(cycle_path)
+                        continue
+
+                    if not self._claim(dep_key, depth + 1):
+                        continue
+
+                    parents[dep_key] = package_key
+                    next_frontier.append((dep_name, dep_version, dep_key))
+
+            frontier = next_frontier
+            depth += 1
+
+    def _claim(self, package_key: str, depth: int) -> bool:
+        known_depth = self.depths.get(package_key)
+        if known_depth is not None and known_depth <= depth:
+            return False
+
+        if self.memo is not None and self._splice_subtree(package_key, depth):
+            return False
+
+        self.depths[package_key] = depth
         self.visited.add(package_key)
-        current_path = path + [package_key]
+        return True
 
-        try:
-            dependencies_data = self.collector.get_package_dependencies(package_name, version)
-            dependencies = [(dep['name'], self._extract_version(dep['version'])) for dep in dependencies_data]
+    def _create_name_filter(self) -> NameFilter:
+        return NameFilter(self.names, self.config.get('include_patterns', []),
+                          self.config.get('exclude_patterns', []), self.config['filter_substring'])
+
+    def _memo_key(self, package_key: str) -> Tuple[str, str, str, Tuple[str, ...], Tuple[str, ...]]:
+        return (self.collector.source_id, package_key, self.config['filter_substring'],
+                tuple(self.config.get('include_patterns', [])), tuple(self.config.get('exclude_patterns', [])))
+
+    def _splice_subtree(self, package_key: str, depth: int) -> bool:
+        entries = self.memo.lookup(self._memo_key(package_key), self.config['max_depth'] - depth)
+        if entries is None:
+            return False
+
+        for node_key, distance, dependencies, masks in entries:
+            node_depth = depth + distance
+            known_depth = self.depths.get(node_key)
+            if known_depth is not None and known_depth <= node_depth:
+                continue
+
+            self.depths[node_key] = node_depth
+            self.visited.add(node_key)
+            if node_key not in self.graph:
+                self.graph.set_dependencies(node_key, dependencies, masks)
+        return True
+
+    def _remember_subtrees(self, root_key: str) -> None:
+        if root_key not in self.graph:
+            return
+
+        max_depth = self.config['max_depth']
+        self._remember_subtree(root_key, max_depth)
+        for dep_key in self.graph[root_key]:
+            self._remember_subtree(dep_key, max_depth - 1)
+
+    def _remember_subtree(self, package_key: str, depth_budget: int) -> None:
+        if depth_budget <= 0:
+            return
+
+        distances = {package_key: 0}
+        entries = []
+        index = 0
+        queue = [package_key]
+
+        while index < len(queue):
+            node_key = queue[index]
+            index += 1
+            if node_key not in self.graph:
+                return
 
-            if self.config['filter_substring']:
-                dependencies = [(name, ver) for name, ver in dependencies
-                                if self.config['filter_substring'] not in name]
+            dependencies = self.graph[node_key]
+            distance = distances[node_key]
+            entries.append((node_key, distance, dependencies, self.graph.edge_masks(self.graph.node_id(node_key))))
 
-            self.graph[package_key] = []
+            if distance + 1 < depth_budget:
+                for dep_key in dependencies:
+                    if dep_key not in distances:
+                        distances[dep_key] = distance + 1
+                        queue.append(dep_key)
 
-            for dep_name, dep_version in dependencies:
-                dep_key = f"{dep_name}@{dep_version}"
-                self.graph[package_key].append(dep_key)
-                self.dfs_build_graph(dep_name, dep_version, depth + 1, current_path)
+        if self._contains_cycle(entries):
+            if PROFILER.enabled:
+                PROFILER.count('subtree_memo.cyclic_skipped')
+            return
+        self.memo.store(self._memo_key(package_key), depth_budget, entries)
+
+    @staticmethod
+    def _contains_cycle(entries: List[Tuple[str, int, List[str], List[int]]]) -> bool:
+        node_ids = {entry[0]: node_id for node_id, entry in enumerate(entries)}
+        adjacency = [[node_ids[dep_key] for dep_key in dependencies if dep_key in node_ids]
+                     for _, _, dependencies, _ in entries]
+        if any(node_id in targets for node_id, targets in enumerate(adjacency)):
+            return True
+        return any(len(component) > 1 for component in strongly_connected_components(adjacency))
+
+    def _parent_chain(self, parents: Dict[str, Optional[str]], package_key: str) -> List[str]:
+        chain = []
+        current: Optional[str] = package_key
+        while current is not None:
+            chain.append(current)
+            current = parents[current]
+        chain.reverse()
+        return chain
+
+    def _expand_package(self, package_name: str, version: str, package_key: str) -> List[Tuple[str, str]]:
+        if package_key in self.graph:
+            return [tuple(dep_key.rsplit('@', 1)) for dep_key in self.graph[package_key]]
+
+        if package_key in self.full_graph:
+            if PROFILER.enabled:
+                PROFILER.count('full_graph.hits')
+            dependency_keys = self.full_graph[package_key]
+            masks = self.full_graph.edge_masks(self.full_graph.node_id(package_key))
+            dependencies = [tuple(dep_key.rsplit('@', 1)) for dep_key in dependency_keys]
+        else:
+            if PROFILER.enabled:
+                PROFILER.count('full_graph.misses')
+            try:
+                dependencies, dependency_keys, masks = self._collect_dependencies(package_name, version)
+            except Exception as e:
+                print(f"Ошибка при обработке пакета {package_name}: {e}")
+                self.failed_packages[package_key] = str(e)
+                return []
+
+            self.full_graph.set_dependencies(package_key, dependency_keys, masks)
+            for name, _ in dependencies:
+                self.names.add(name)
+
+        if self.name_filter.active:
+            allows = self.name_filter.allows
+            selected = [index for index, (name, _) in enumerate(dependencies) if allows(name)]
+            dependencies = [dependencies[index] for index in selected]
+            dependency_keys = [dependency_keys[index] for index in selected]
+            masks = [masks[index] for index in selected]
+
+        self.graph.set_dependencies(package_key, dependency_keys, masks)
+        return dependencies
+
+    def _collect_dependencies(self, package_name: str,
+                              version: str) -> Tuple[List[Tuple[str, str]], List[str], List[int]]:
+        resolve_version = self._resolve_version
+        framework_bit = FRAMEWORKS.bit
+        dependencies = []
+        masks: Dict[str, int] = {}
+
+        for dep in self.collector.get_package_dependencies(package_name, version):
+            dep_version = resolve_version(dep.name, dep.version)
+            dep_key = f"{dep.name}@{dep_version}"
+            mask = masks.get(dep_key)
+            if mask is None:
+                dependencies.append((dep.name, dep_version))
+                masks[dep_key] = framework_bit(dep.target_framework)
+            else:
+                masks[dep_key] = mask | framework_bit(dep.target_framework)
+
+        return dependencies, list(masks), list(masks.values())
+
+    def save_snapshot(self, filename: str) -> int:
+        from graph_snapshot import SNAPSHOT_VERSION, write_snapshot
+        package_name, version = self.root if self.root is not None else (
+            self.config['package_name'], self.config['package_version'])
+        parameters = {
+            'format_version': SNAPSHOT_VERSION,
+            'package_name': package_name,
+            'package_version': version,
+            'source_id': self.collector.source_id,
+            'max_depth': self.config['max_depth'],
+            'filter_substring': self.config['filter_substring'],
+            'include_patterns': self.config.get('include_patterns', []),
+            'exclude_patterns': self.config.get('exclude_patterns', []),
+            'traversal': self.config.get('traversal', 'dfs'),
+            'cyclic_dependencies': sorted(self.cyclic_dependencies)
+        }
+        return write_snapshot(self.graph, filename, parameters)
+
+    def load_snapshot(self, filename: str) -> None:
+        from graph_snapshot import GraphSnapshot
+        if isinstance(self.graph, GraphSnapshot) and self.graph.filename == filename:
+            return
+
+        snapshot = GraphSnapshot(filename)
+        for key in ('package_name', 'package_version', 'max_depth', 'filter_substring',
+                    'include_patterns', 'exclude_patterns'):
+            self.config[key] = snapshot.parameters[key]
+
+        self.graph = snapshot
+        self.root = snapshot.root
+        self.depths = {}
+        self.visited = set()
+        self.cyclic_dependencies = set(snapshot.parameters['cyclic_dependencies'])
+
+    def root_key(self) -> str:
+        package_name, version = self.root if self.root is not None else (
+            self.config['package_name'], self.config['package_version'])
+        return f"{package_name}@{version}"
+
+    def diff(self, other: "DependencyGraph") -> "GraphDiff":
+        from graph_diff import GraphDiff
+        diff = GraphDiff(self.graph, self.root_key(), other.graph, other.root_key())
+        diff.compare()
+        return diff
+
+    def frameworks(self) -> List[str]:
+        return FRAMEWORKS.labels_of(self.graph.framework_mask())
 
-        except Exception as e:
-            print(f"Ошибка при обработке пакета {package_name}: {e}")
+    def framework_view(self, framework: str) -> CompactGraph:
+        graph = self.graph
+        selector = FRAMEWORKS.selector(framework)
+        if selector is None or not selector & graph.framework_mask():
+            available = ', '.join(self.frameworks()) or 'нет'
+            raise ConfigError(f"Целевая платформа {framework} не встречается в графе (доступны: {available})")
 
-    def _extract_version(self, version_range: str) -> str:
-        if version_range.startswith('[') and version_range.endswith(']'):
-            return version_range[1:-1]
-        return version_range
+        package_name, version = self.root if self.root is not None else (
+            self.config['package_name'], self.config['package_version'])
+        view = CompactGraph()
+        root_id = graph.node_id(f"{package_name}@{version}")
+        if root_id is None or not graph.is_expanded(root_id):
+            return view
+
+        max_depth = self.config['max_depth']
+        depths = {root_id: 0}
+        queue = [root_id]
+        for node_id in queue:
+            next_depth = depths[node_id] + 1
+            if next_depth >= max_depth:
+                continue
+            for target, mask in zip(graph.neighbours(node_id), graph.edge_masks(node_id)):
+                if (not mask or mask & selector) and target not in depths and graph.is_expanded(target):
+                    depths[target] = next_depth
+                    queue.append(target)
+
+        key = graph.key
+        for node_id in graph.expanded_ids():
+            if node_id in depths:
+                selected = [(key(target), mask) for target, mask
+                            in zip(graph.neighbours(node_id), graph.edge_masks(node_id))
+                            if not mask or mask & selector]
+                view.set_dependencies(key(node_id), [dep_key for dep_key, _ in selected],
+                                      [mask for _, mask in selected])
+        return view
+
+    def current_view(self) -> CompactGraph:
+        framework = self.config.get('framework')
+        return self.framework_view(framework) if framework else self.graph
+
+    def build_condensed_graph(self, graph: Optional[Mapping[str, List[str]]] = None) -> CondensedGraph:
+        return CondensedGraph(self.graph if graph is None else graph)
+
+    def find_cycle_groups(self) -> List[List[str]]:
+        return self.build_condensed_graph().cycle_groups
+
+    def _resolve_version(self, package_name: str, version_range: str) -> str:
+        if package_name not in self.versions:
+            try:
+                versions = self.collector.get_package_versions(package_name)
+            except Exception as e:
+                self.versions.add(package_name, [])
+                version = self.versions.resolve(package_name, version_range)
+                print(f"Ошибка при обработке пакета {package_name}: {e}")
+                self.failed_packages[f"{package_name}@{version}"] = str(e)
+                return version
+            self.versions.add(package_name, versions)
+        return self.versions.resolve(package_name, version_range)
 
     def display_graph(self) -> None:
         print(f"\nГраф зависимостей (максимальная глубина: {self.config['max_depth']}):")
@@ -75,28 +431,80 @@ class DependencyGraph:
             for cycle in self.cyclic_dependencies:
                 print(f"  ⚠️  {cycle}")
 
+        frameworks = self.frameworks()
+        if frameworks:
+            print(f"\nЦелевые платформы: {', '.join(frameworks)}")
+
+        cycle_groups = self.find_cycle_groups()
+        if cycle_groups:
+            print(f"\nЦиклические группы (сильно связные компоненты): {len(cycle_groups)}")
+            for group in cycle_groups:
+                print(f"  ⚠️  {{{', '.join(group)}}}")
+
 
 class Stage3CLI:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], graph_builder: Optional[DependencyGraph] = None):
         self.config = config
-        self.graph_builder = DependencyGraph(config)
+        self.graph_builder = graph_builder if graph_builder is not None else DependencyGraph(config)
 
     def run_stage3(self) -> None:
         print("\nЭТАП 3: Основные операции с графом зависимостей")
 
-        package_name = self.config['package_name']
-        version = self.config['package_version']
+        try:
+            if self.config['load_snapshot']:
+                self.graph_builder.load_snapshot(self.config['load_snapshot'])
+                print(f"Граф {self.config['package_name']}@{self.config['package_version']} "
+                      f"загружен из снимка {self.config['load_snapshot']}")
+            else:
+                package_name = self.config['package_name']
+                version = self.config['package_version']
+
+                print(f"Анализ пакета {package_name} версии {version}")
+                self.graph_builder.ensure_built(package_name, version)
+
+            if self.config['save_snapshot']:
+                size = self.graph_builder.save_snapshot(self.config['save_snapshot'])
+                print(f"Снимок графа сохранен в {self.config['save_snapshot']} ({size} байт)")
+        except ConfigError as e:
+            print(f"Ошибка на этапе 3: {e}")
+            return
+
+        if self.config['diff_version'] or self.config['diff_snapshot']:
+            self.run_diff()
+            return
 
-        print(f"Анализ пакета {package_name} версии {version}")
-        self.graph_builder.dfs_build_graph(package_name, version)
         self.graph_builder.display_graph()
 
+    def run_diff(self) -> None:
+        other = DependencyGraph({**self.config, 'load_snapshot': '', 'save_snapshot': ''})
+        try:
+            if self.config['diff_snapshot']:
+                other.load_snapshot(self.config['diff_snapshot'])
+                print(f"Граф {other.root_key()} для сравнения загружен из снимка {self.config['diff_snapshot']}")
+            else:
+                package_name, _ = self.graph_builder.root
+                print(f"Анализ пакета {package_name} версии {self.config['diff_version']} для сравнения")
+                other.build_graph(package_name, self.config['diff_version'])
+
+            diff = self.graph_builder.diff(other)
+            diff.display()
+            if self.config['diff_output']:
+                diff.save(self.config['diff_output'])
+                print(f"Результат сравнения сохранен в {self.config['diff_output']}")
+        except ConfigError as e:
+            print(f"Ошибка сравнения графов: {e}")
+        finally:
+            other.close()
+
 
 def main_stage3():
     from stage1 import main_stage1
     config = main_stage1()
     cli = Stage3CLI(config)
-    cli.run_stage3()
+    try:
+        cli.run_stage3()
+    finally:
+        cli.graph_builder.close()
 
 
 if __name__ == "__main__":
@@ -1,60 +1,78 @@
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Mapping, Optional, Set, Any
+from stage1 import ConfigError
 from stage3 import DependencyGraph
+from reachability import ReachabilityIndex, reachable_from
+from impact import ImpactAnalyzer
+from profiler import PROFILER
 
 
 class ReverseDependencyAnalyzer:
-    def __init__(self, graph: Dict[str, List[str]]):
+    def __init__(self, graph: Mapping[str, List[str]]):
         self.graph = graph
-        self.reverse_graph: Dict[str, List[str]] = {}
+        self.reverse_graph: Dict[str, Set[str]] = {}
 
+    @PROFILER.timed('reverse.build_index')
     def build_reverse_graph(self) -> None:
-        self.reverse_graph = {}
+        reverse_graph: Dict[str, Set[str]] = {}
 
         for package, dependencies in self.graph.items():
+            if package not in reverse_graph:
+                reverse_graph[package] = set()
             for dep in dependencies:
-                if dep not in self.reverse_graph:
-                    self.reverse_graph[dep] = []
-                if package not in self.reverse_graph[dep]:
-                    self.reverse_graph[dep].append(package)
+                dependents = reverse_graph.get(dep)
+                if dependents is None:
+                    dependents = reverse_graph[dep] = set()
+                dependents.add(package)
 
-            if package not in self.reverse_graph:
-                self.reverse_graph[package] = []
+        self.reverse_graph = reverse_graph
 
     def find_reverse_dependencies(self, target_package: str, max_depth: int = 3) -> Dict[str, Any]:
+        return self.find_reverse_dependencies_batch([target_package], max_depth)[target_package]
+
+    @PROFILER.timed('reverse.query')
+    def find_reverse_dependencies_batch(self, target_packages: List[str],
+                                        max_depth: int = 3) -> Dict[str, Dict[str, Any]]:
         if not self.reverse_graph:
             self.build_reverse_graph()
 
-        result = {
-            'target': target_package,
-            'reverse_deps': [],
-            'all_dependencies': set()
+        results = {
+            target: {'target': target, 'reverse_deps': [], 'all_dependencies': set()}
+            for target in target_packages
         }
-
-        self._dfs_reverse_deps(target_package, max_depth, 0, set(), result)
-        return result
-
-    def _dfs_reverse_deps(self, current_package: str, max_depth: int,
-                          current_depth: int, visited: Set[str], result: Dict[str, Any]) -> None:
-        if current_depth > max_depth or current_package in visited:
-            return
-
-        visited.add(current_package)
-
-        if current_package in self.reverse_graph:
-            for dependent in self.reverse_graph[current_package]:
-                if dependent not in result['all_dependencies']:
-                    result['reverse_deps'].append({
-                        'package': dependent,
-                        'depth': current_depth
-                    })
+        targets = list(results)
+
+        seen: Dict[str, int] = {}
+        frontier = {target: 1 << bit for bit, target in enumerate(targets)}
+        depth = 0
+
+        while frontier and depth <= max_depth:
+            next_frontier: Dict[str, int] = {}
+
+            for package, mask in frontier.items():
+                for dependent in self.reverse_graph.get(package, ()):
+                    new_bits = mask & ~seen.get(dependent, 0)
+                    if new_bits:
+                        seen[dependent] = seen.get(dependent, 0) | new_bits
+                        next_frontier[dependent] = next_frontier.get(dependent, 0) | new_bits
+
+            for dependent, mask in next_frontier.items():
+                while mask:
+                    lowest = mask & -mask
+                    mask ^= lowest
+                    result = results[targets[lowest.bit_length() - 1]]
+                    result['reverse_deps'].append({'package': dependent, 'depth': depth})
                     result['all_dependencies'].add(dependent)
 
-                self._dfs_reverse_deps(dependent, max_depth, current_depth + 1, visited, result)
+            frontier = next_frontier
+            depth += 1
+
+        return results
 
     def display_reverse_dependencies(self, target_package: str, max_depth: int = 3) -> None:
-        result = self.find_reverse_dependencies(target_package, max_depth)
+        self.display_reverse_result(self.find_reverse_dependencies(target_package, max_depth))
 
-        print(f"\nОбратные зависимости для пакета {target_package}:")
+    def display_reverse_result(self, result: Dict[str, Any]) -> None:
+        print(f"\nОбратные зависимости для пакета {result['target']}:")
         print("-" * 50)
 
         if not result['reverse_deps']:
@@ -70,38 +88,85 @@ class ReverseDependencyAnalyzer:
 
 
 class Stage4CLI:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], graph_builder: Optional[DependencyGraph] = None):
         self.config = config
-        self.graph_builder = DependencyGraph(config)
+        self.graph_builder = graph_builder if graph_builder is not None else DependencyGraph(config)
 
     def run_stage4(self) -> None:
         print("\nЭТАП 4: Обратные зависимости")
 
+        try:
+            if self.config['load_snapshot']:
+                self.graph_builder.load_snapshot(self.config['load_snapshot'])
+                print(f"Граф загружен из снимка {self.config['load_snapshot']}")
+        except ConfigError as e:
+            print(f"Ошибка на этапе 4: {e}")
+            return
+
         package_name = self.config['package_name']
         version = self.config['package_version']
 
-        print(f"Построение графа для {package_name}@{version}...")
-        self.graph_builder.dfs_build_graph(package_name, version)
+        if not self.config['load_snapshot']:
+            print(f"Построение графа для {package_name}@{version}...")
+            self.graph_builder.ensure_built(package_name, version)
+
+        try:
+            graph = self.graph_builder.current_view()
+        except ConfigError as e:
+            print(f"Ошибка на этапе 4: {e}")
+            return
+        if self.config['framework']:
+            print(f"Целевая платформа {self.config['framework']}: {len(graph)} узлов, {graph.edge_count()} рёбер")
+
+        condensed = self.graph_builder.build_condensed_graph(graph)
+        if self.config['impact_top']:
+            impact = ImpactAnalyzer(graph, condensed)
+            impact.analyze()
+            impact.display_top(self.config['impact_top'], self.config['impact_metric'])
+            return
 
-        analyzer = ReverseDependencyAnalyzer(self.graph_builder.graph)
+        analyzer = ReverseDependencyAnalyzer(graph)
 
+        root_key = f"{package_name}@{version}"
         test_packages = [
-            f"{package_name}@{version}",
+            root_key,
             'Microsoft.NETFramework.ReferenceAssemblies@4.6.2',
             'System.Runtime@4.3.0'
         ]
 
-        for test_package in test_packages:
+        results = analyzer.find_reverse_dependencies_batch(test_packages, max_depth=2)
+        if self.config['reachability_index']:
+            reachability = ReachabilityIndex(graph, condensed)
+            pulled_in = reachability.reaches_batch([(root_key, test_package) for test_package in test_packages])
+            closure_size = reachability.closure_size(root_key)
+        else:
+            reached = reachable_from(graph, root_key)
+            pulled_in = [test_package in reached for test_package in test_packages]
+            closure_size = len(reached - {root_key})
+
+        print(f"\nТранзитивных зависимостей у {root_key}: {closure_size}")
+
+        for index, test_package in enumerate(test_packages):
             print(f"\nАнализ пакета: {test_package}")
             print("-" * 40)
-            analyzer.display_reverse_dependencies(test_package, max_depth=2)
+            analyzer.display_reverse_result(results[test_package])
+
+            if test_package != root_key:
+                print(f"  Транзитивно подключается пакетом {root_key}: {'да' if pulled_in[index] else 'нет'}")
+
+            cycle_group = condensed.group_of(test_package)
+            if cycle_group:
+                print(f"  ⚠️  Пакет входит в циклическую группу: {', '.join(cycle_group)}")
 
 
 def main_stage4():
     from stage1 import main_stage1
     config = main_stage1()
     cli = Stage4CLI(config)
-    cli.run_stage4()
+    try:
+        cli.run_stage4()
+    finally:
+        cli.graph_builder.close()
 
 
 if __name__ == "__main__":
@@ -1,83 +1,180 @@
-import subprocess
 import os
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, Iterator, List, Mapping, Any, Optional, Set, Tuple
+from stage1 import ConfigError
 from stage3 import DependencyGraph
+from graph_algorithms import CondensedGraph
+from profiler import PROFILER
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from render_pool import GraphRenderer
+
+DOT_CHUNK_LINES = 4096
 
 class GraphVisualizer:
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], graph_builder: Optional[DependencyGraph] = None):
         self.config = config
-        self.graph_builder = DependencyGraph(config)
-
-    def generate_graphviz_dot(self, graph: Dict[str, List[str]]) -> str:
-        dot_lines = [
-            "digraph DependencyGraph {",
-            "    rankdir=TB;",
-            "    node [shape=box, style=filled, fillcolor=lightblue];",
-            "    edge [color=darkgreen];",
-            ""
-        ]
+        self.graph_builder = graph_builder if graph_builder is not None else DependencyGraph(config)
+        self.renderer: Optional["GraphRenderer"] = None
+
+    def iter_graphviz_dot(self, graph: Mapping[str, List[str]], alias_nodes: bool = False) -> Iterator[str]:
+        yield "digraph DependencyGraph {"
+        yield "    rankdir=TB;"
+        yield "    node [shape=box, style=filled, fillcolor=lightblue];"
+        yield "    edge [color=darkgreen];"
+        yield ""
+
+        root = f"{self.config['package_name']}@{self.config['package_version']}"
+        aliases: Dict[str, str] = {}
+
+        def node_ref(package: str) -> str:
+            if not alias_nodes:
+                return f'"{package}"'
+            return aliases[package]
+
+        def declare(package: str) -> str:
+            attributes = ' [fillcolor=orange]' if package == root else ''
+            if not alias_nodes:
+                return f'    "{package}"{attributes};'
+            aliases[package] = f"n{len(aliases)}"
+            attributes = ', fillcolor=orange' if package == root else ''
+            return f'    {aliases[package]} [label="{package}"{attributes}];'
 
         for package in graph.keys():
-            if package == f"{self.config['package_name']}@{self.config['package_version']}":
-                dot_lines.append(f'    "{package}" [fillcolor=orange];')
-            else:
-                dot_lines.append(f'    "{package}";')
+            yield declare(package)
+
+        yield ""
 
-        dot_lines.append("")
+        for i, group in enumerate(CondensedGraph(graph).cycle_groups):
+            yield f"    subgraph cluster_cycle_{i} {{"
+            yield f'        label="Цикл {i + 1}";'
+            yield "        color=red;"
+            for package in group:
+                if alias_nodes and package not in aliases:
+                    yield declare(package)
+                yield f"        {node_ref(package)};"
+            yield "    }"
+            yield ""
 
         for package, dependencies in graph.items():
+            source = node_ref(package)
             for dep in dependencies:
-                dot_lines.append(f'    "{package}" -> "{dep}";')
+                if alias_nodes and dep not in aliases:
+                    yield declare(dep)
+                yield f"    {source} -> {node_ref(dep)};"
+
+        yield "}"
+
+    @PROFILER.timed('dot.generate')
+    def generate_graphviz_dot(self, graph: Mapping[str, List[str]], alias_nodes: bool = False) -> str:
+        return "\n".join(self.iter_graphviz_dot(graph, alias_nodes))
+
+    @PROFILER.timed('dot.write')
+    def write_dot_file(self, graph: Mapping[str, List[str]], filename: str = "dependency_graph.dot",
+                       compress: bool = False, alias_nodes: bool = False, echo: bool = False) -> str:
+        if compress and not filename.endswith('.gz'):
+            filename += '.gz'
+
+        if compress:
+            import gzip
+            opener = gzip.open
+        else:
+            opener = open
+        with opener(filename, 'wt', encoding='utf-8') as f:
+            chunk: List[str] = []
+            separator = ""
+            for line in self.iter_graphviz_dot(graph, alias_nodes):
+                if echo:
+                    print(line)
+                chunk.append(line)
+                if len(chunk) >= DOT_CHUNK_LINES:
+                    f.write(separator + "\n".join(chunk))
+                    separator = "\n"
+                    chunk = []
+            if chunk:
+                f.write(separator + "\n".join(chunk))
+        return filename
 
-        dot_lines.append("}")
+    def iter_ascii_tree(self, graph: Mapping[str, List[str]], start_node: str) -> Iterator[str]:
+        expanded: Set[str] = set()
+        on_path: Set[str] = set()
+        stack: List[Tuple[str, str, List[str], int]] = []
+        failed = self.graph_builder.failed_packages
 
-        return "\n".join(dot_lines)
+        def open_node(node: str, prefix: str, is_last: bool) -> str:
+            line = prefix + ("└── " if is_last else "├── ") + node
 
-    def generate_ascii_tree(self, graph: Dict[str, List[str]], start_node: str) -> List[str]:
-        result = []
+            if node in on_path:
+                return line + " (цикл)"
+            if node not in graph:
+                return line + (" (ошибка загрузки)" if node in failed else " (глубина ограничена)")
 
-        def build_ascii_tree(node: str, prefix: str = "", is_last: bool = True) -> None:
-            connector = "└── " if is_last else "├── "
-            result.append(prefix + connector + node)
+            dependencies = graph[node]
+            if dependencies and node in expanded:
+                return line + " (см. выше)"
 
-            if node in graph:
-                dependencies = graph[node]
-                new_prefix = prefix + ("    " if is_last else "│   ")
+            expanded.add(node)
+            if dependencies:
+                on_path.add(node)
+                stack.append((node, prefix + ("    " if is_last else "│   "), dependencies, 0))
+            return line
 
-                for i, dep in enumerate(dependencies):
-                    is_last_dep = i == len(dependencies) - 1
-                    build_ascii_tree(dep, new_prefix, is_last_dep)
+        yield open_node(start_node, "", True)
 
-        build_ascii_tree(start_node)
-        return result
+        while stack:
+            node, prefix, dependencies, index = stack[-1]
+            if index == len(dependencies):
+                stack.pop()
+                on_path.discard(node)
+                continue
 
-    def display_ascii_tree(self, graph: Dict[str, List[str]], start_node: str) -> None:
+            stack[-1] = (node, prefix, dependencies, index + 1)
+            yield open_node(dependencies[index], prefix, index == len(dependencies) - 1)
+
+    @PROFILER.timed('ascii.generate')
+    def generate_ascii_tree(self, graph: Mapping[str, List[str]], start_node: str) -> List[str]:
+        return list(self.iter_ascii_tree(graph, start_node))
+
+    @PROFILER.timed('ascii.display')
+    def display_ascii_tree(self, graph: Mapping[str, List[str]], start_node: str) -> None:
         print(f"\nASCII-дерево зависимостей для {start_node}:")
         print("=" * 60)
 
-        tree_lines = self.generate_ascii_tree(graph, start_node)
-        for line in tree_lines:
+        for line in self.iter_ascii_tree(graph, start_node):
             print(line)
 
-    def save_dot_file(self, dot_content: str, filename: str = "dependency_graph.dot") -> str:
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(dot_content)
-        return filename
-
-    def generate_image(self, dot_filename: str, output_format: str = "png") -> str:
-        output_filename = dot_filename.replace('.dot', f'.{output_format}')
-
+    def _get_renderer(self) -> "GraphRenderer":
+        if self.renderer is None:
+            from render_pool import GraphRenderer
+            self.renderer = GraphRenderer(self.config['render_cache_dir'], timeout=self.config['render_timeout'])
+        return self.renderer
+
+    def submit_image(self, dot_filename: str, output_format: str = "png", node_count: int = 0) -> "Future[str]":
+        base_filename = dot_filename[:-3] if dot_filename.endswith('.gz') else dot_filename
+        output_filename = base_filename.replace('.dot', f'.{output_format}')
+        renderer = self._get_renderer()
+        engine = renderer.choose_engine(self.config['layout_engine'], node_count)
+        return renderer.submit(dot_filename, output_filename, output_format, engine)
+
+    @PROFILER.timed('render.wait')
+    def wait_image(self, image_future: "Future[str]") -> str:
+        import subprocess
         try:
-            subprocess.run([
-                'dot', f'-T{output_format}',
-                dot_filename, '-o', output_filename
-            ], check=True)
-            return output_filename
-        except subprocess.CalledProcessError as e:
+            return image_future.result()
+        except FileNotFoundError:
+            print("Для генерации изображений установите Graphviz")
+            return ""
+        except subprocess.TimeoutExpired:
+            print(f"Превышено время генерации изображения ({self.config['render_timeout']} с)")
+            return ""
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"Ошибка генерации изображения: {e}")
             return ""
 
+    def generate_image(self, dot_filename: str, output_format: str = "png") -> str:
+        return self.wait_image(self.submit_image(dot_filename, output_format))
+
     def display_graph_info(self, graph: Dict[str, Any]) -> None:
         total_nodes = len(graph)
         total_edges = sum(len(dependencies) for dependencies in graph.values())
@@ -87,23 +184,52 @@ class GraphVisualizer:
         print(f"   Всего рёбер (зависимостей): {total_edges}")
         print(f"   Максимальная глубина: {self.config['max_depth']}")
 
+        condensed = CondensedGraph(graph)
+        print(f"   Компонент сильной связности: {len(condensed.components)}")
+        print(f"   Циклических групп: {len(condensed.cycle_groups)}")
+
+        if self.config.get('framework'):
+            print(f"   Целевая платформа: {self.config['framework']}")
         if self.config['filter_substring']:
             print(f"   Фильтр: '{self.config['filter_substring']}'")
+        if self.config.get('include_patterns'):
+            print(f"   Включить: {', '.join(self.config['include_patterns'])}")
+        if self.config.get('exclude_patterns'):
+            print(f"   Исключить: {', '.join(self.config['exclude_patterns'])}")
 
 class Stage5CLI:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], graph_builder: Optional[DependencyGraph] = None):
         self.config = config
-        self.visualizer = GraphVisualizer(config)
+        self.visualizer = GraphVisualizer(config, graph_builder)
 
     def run_stage5(self) -> None:
         print("\nЭТАП 5: Визуализация графа зависимостей")
 
+        if self.config['batch_file']:
+            from batch import BatchAnalyzer
+            BatchAnalyzer(self.config).run_batch(self.config['batch_file'], self.config['batch_output'])
+            return
+
+        try:
+            if self.config['load_snapshot']:
+                self.visualizer.graph_builder.load_snapshot(self.config['load_snapshot'])
+                print(f"Граф загружен из снимка {self.config['load_snapshot']}")
+        except ConfigError as e:
+            print(f"Ошибка на этапе 5: {e}")
+            return
+
         package_name = self.config['package_name']
         version = self.config['package_version']
 
-        print(f"Построение графа для {package_name}@{version}...")
-        self.visualizer.graph_builder.dfs_build_graph(package_name, version)
-        graph = self.visualizer.graph_builder.graph
+        if not self.config['load_snapshot']:
+            print(f"Построение графа для {package_name}@{version}...")
+            self.visualizer.graph_builder.ensure_built(package_name, version)
+
+        try:
+            graph = self.visualizer.graph_builder.current_view()
+        except ConfigError as e:
+            print(f"Ошибка на этапе 5: {e}")
+            return
 
         if not graph:
             print("Граф пуст")
@@ -115,20 +241,15 @@ class Stage5CLI:
 
         print("\n1. Текстовое представление графа на языке Graphviz DOT:")
 
-        dot_content = self.visualizer.generate_graphviz_dot(graph)
-        print(dot_content)
-
-        dot_filename = self.visualizer.save_dot_file(dot_content)
+        dot_filename = self.visualizer.write_dot_file(graph, self.config['dot_output'], self.config['dot_gzip'],
+                                                      self.config['dot_aliases'], self.config['print_dot'])
         print(f"DOT-файл сохранен как: {dot_filename}")
 
         print("\n2. Генерация изображения графа:")
 
-        image_filename = self.visualizer.generate_image(dot_filename)
-        if image_filename:
-            print(f"Изображение графа сохранено как: {image_filename}")
-            print("Для просмотра откройте файл в браузере или графическом просмотрщике.")
-        else:
-            print("Для генерации изображений установите Graphviz")
+        image_future = self.visualizer.submit_image(dot_filename, self.config['image_format'], len(graph))
+        if not image_future.done():
+            print("Изображение генерируется в фоновом режиме")
 
         print("\n3. ASCII-дерево зависимостей:")
         if start_node in graph:
@@ -140,6 +261,13 @@ class Stage5CLI:
 
         self._demonstrate_multiple_packages()
 
+        print("\n5. Результат генерации изображения:")
+        image_filename = self.visualizer.wait_image(image_future)
+        self.visualizer.renderer.shutdown()
+        if image_filename:
+            print(f"Изображение графа сохранено как: {image_filename}")
+            print("Для просмотра откройте файл в браузере или графическом просмотрщике.")
+
     def _demonstrate_multiple_packages(self) -> None:
         if self.config['test_mode']:
             demo_packages = [
@@ -161,7 +289,10 @@ class Stage5CLI:
 
             temp_config = {**self.config, 'package_name': pkg['name'], 'package_version': pkg['version']}
             temp_visualizer = GraphVisualizer(temp_config)
-            temp_visualizer.graph_builder.dfs_build_graph(pkg['name'], pkg['version'])
+            try:
+                temp_visualizer.graph_builder.build_graph(pkg['name'], pkg['version'])
+            finally:
+                temp_visualizer.graph_builder.close()
             temp_graph = temp_visualizer.graph_builder.graph
 
             if temp_graph:
@@ -178,13 +309,21 @@ class Stage5CLI:
                 print("Граф пуст")
             print("Демонстрация завершена\n")
 
+        memo = self.visualizer.graph_builder.memo
+        if memo is not None:
+            print(f"Кэш поддеревьев: попаданий {memo.hits}, промахов {memo.misses}, "
+                  f"записей {len(memo)}, рёбер {memo.size}")
+
 def main_stage5():
     from stage1 import main_stage1
 
     config = main_stage1()
 
     cli = Stage5CLI(config)
-    cli.run_stage5()
+    try:
+        cli.run_stage5()
+    finally:
+        cli.visualizer.graph_builder.close()
 
 if __name__ == "__main__":
     main_stage5()
\ No newline at end of file
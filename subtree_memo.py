@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+from profiler import PROFILER
+
+SubtreeEntries = List[Tuple[str, int, List[str], List[int]]]
+
+
+class SubtreeMemo:
+    def __init__(self, max_edges: int = 1000000):
+        self.max_edges = max_edges
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, int, SubtreeEntries]]" = OrderedDict()
+
+    def lookup(self, key: Hashable, remaining_depth: int) -> Optional[SubtreeEntries]:
+        stored = self._entries.get(key)
+        if stored is None or stored[0] < remaining_depth:
+            self.misses += 1
+            if PROFILER.enabled:
+                PROFILER.count('subtree_memo.misses')
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if PROFILER.enabled:
+            PROFILER.count('subtree_memo.hits')
+        entries = stored[2]
+        if stored[0] == remaining_depth:
+            return entries
+
+        for position, entry in enumerate(entries):
+            if entry[1] >= remaining_depth:
+                return entries[:position]
+        return entries
+
+    def store(self, key: Hashable, depth_budget: int, entries: SubtreeEntries) -> None:
+        stored = self._entries.get(key)
+        if stored is not None:
+            if stored[0] >= depth_budget:
+                return
+            self.size -= stored[1]
+            del self._entries[key]
+
+        size = sum(len(dependencies) + 1 for _, _, dependencies, _ in entries)
+        if size > self.max_edges:
+            return
+
+        self._entries[key] = (depth_budget, size, entries)
+        self.size += size
+
+        while self.size > self.max_edges:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+SUBTREE_MEMO = SubtreeMemo()
@@ -0,0 +1,144 @@
+import random
+from bisect import bisect_right
+from typing import Any, Dict, List
+from dependency_record import Dependency
+from stage2 import DependencyCollector
+
+NAMESPACES = ("System", "Microsoft.Extensions", "Newtonsoft", "Contoso.Core", "Fabrikam.Data", "Northwind.Web")
+FANOUT_DISTRIBUTIONS = ("uniform", "poisson", "powerlaw")
+SYNTHETIC_VERSION = "1.0.0"
+MAX_EXTRA_DEPENDENCIES = 1000
+
+
+class SyntheticRepository:
+    def __init__(self, nodes: int, seed: int = 1, fanout: float = 2.0, distribution: str = "poisson",
+                 levels: int = 8, diamond_rate: float = 0.2, cycle_rate: float = 0.01,
+                 root_name: str = ""):
+        self.nodes = max(1, nodes)
+        self.seed = seed
+        self.fanout = fanout
+        self.distribution = distribution
+        self.levels = max(1, min(levels, self.nodes))
+        self.diamond_rate = diamond_rate
+        self.cycle_rate = cycle_rate
+        self.root_name = root_name
+        self.level_starts = self._level_starts()
+
+    def _level_starts(self) -> List[int]:
+        if self.levels == 1:
+            return [0, self.nodes]
+
+        low, high = 1.0, float(self.nodes)
+        for _ in range(100):
+            ratio = (low + high) / 2
+            if sum(ratio ** level for level in range(self.levels)) < self.nodes:
+                low = ratio
+            else:
+                high = ratio
+
+        starts = [0]
+        total = 0.0
+        for level in range(1, self.levels):
+            total += low ** (level - 1)
+            remaining_levels = self.levels - level
+            starts.append(min(max(starts[-1] + 1, round(total)), self.nodes - remaining_levels))
+        starts.append(self.nodes)
+        return starts
+
+    def level_of(self, node: int) -> int:
+        return bisect_right(self.level_starts, node) - 1
+
+    def name(self, node: int) -> str:
+        if node == 0 and self.root_name:
+            return self.root_name
+        return f"{NAMESPACES[node % len(NAMESPACES)]}.Package{node}"
+
+    def node_of(self, package_name: str) -> int:
+        _, separator, number = package_name.rpartition('.Package')
+        if not separator or not number.isdigit() or int(number) >= self.nodes:
+            return -1
+        return int(number)
+
+    def _parent(self, node: int, level: int) -> int:
+        starts = self.level_starts
+        level_size = starts[level + 1] - starts[level]
+        parent_size = starts[level] - starts[level - 1]
+        return starts[level - 1] + (node - starts[level]) * parent_size // level_size
+
+    def _extra_count(self, rng: random.Random) -> int:
+        if self.distribution == "uniform":
+            count = rng.randint(0, round(2 * self.fanout))
+        elif self.distribution == "powerlaw":
+            count = int(rng.paretovariate(2.0) * self.fanout / 2)
+        else:
+            threshold = 2.718281828459045 ** -self.fanout
+            count = -1
+            product = 1.0
+            while product > threshold:
+                count += 1
+                product *= rng.random()
+        return min(count, MAX_EXTRA_DEPENDENCIES)
+
+    def dependencies(self, node: int) -> List[int]:
+        level = self.level_of(node)
+        if level >= self.levels - 1:
+            return []
+
+        starts = self.level_starts
+        start, end = starts[level], starts[level + 1]
+        next_start, next_end = end, starts[level + 2]
+        level_size, next_size = end - start, next_end - next_start
+
+        offset = node - start
+        first_child = next_start - (-offset * next_size // level_size)
+        last_child = next_start - (-(offset + 1) * next_size // level_size)
+        targets = list(range(first_child, last_child))
+
+        rng = random.Random(self.seed * 1000003 + node)
+        for _ in range(self._extra_count(rng)):
+            roll = rng.random()
+            if roll < self.cycle_rate and level > 0:
+                target = node
+                for target_level in range(level, level - rng.randint(1, level), -1):
+                    target = self._parent(target, target_level)
+            elif roll < self.cycle_rate + self.diamond_rate:
+                target = rng.randrange(next_start, self.nodes)
+            else:
+                target = rng.randrange(next_start, next_end)
+            targets.append(target)
+
+        return [target for target in dict.fromkeys(targets) if target != node]
+
+
+class SyntheticDependencyCollector(DependencyCollector):
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.dynamic_packages = {}
+        self.repository = None
+        self.generator = SyntheticRepository(
+            config['synthetic_nodes'], config['synthetic_seed'], config['synthetic_fanout'],
+            config['synthetic_distribution'], config['synthetic_levels'],
+            config['synthetic_diamond_rate'], config['synthetic_cycle_rate'], config['package_name']
+        )
+        generator = self.generator
+        self.source_id = (f"synthetic:{generator.nodes}:{generator.seed}:{generator.fanout}:"
+                          f"{generator.distribution}:{generator.levels}:{generator.diamond_rate}:"
+                          f"{generator.cycle_rate}:{config['package_name']}")
+
+    def get_package_versions(self, package_name: str) -> List[str]:
+        if package_name == self.config['package_name']:
+            return [self.config['package_version']]
+        return [SYNTHETIC_VERSION]
+
+    def get_package_dependencies(self, package_name: str, version: str) -> List[Dependency]:
+        if package_name == self.config['package_name'] and version == self.config['package_version']:
+            node = 0
+        else:
+            node = self.generator.node_of(package_name)
+            if node < 0:
+                return []
+
+        name = self.generator.name
+        root_version = self.config['package_version']
+        return [Dependency(name(target), root_version if target == 0 else SYNTHETIC_VERSION, "net8.0")
+                for target in self.generator.dependencies(node)]
@@ -0,0 +1,60 @@
+import json
+import pytest
+from stage1 import ConfigError
+from batch import BatchAnalyzer, load_roots
+from synthetic_repository import SyntheticRepository, SYNTHETIC_VERSION
+
+
+def make_config(config, **overrides):
+    return {**config, 'synthetic_nodes': 300, 'synthetic_seed': 3, 'package_name': 'Synthetic.Root',
+            'memo_max_edges': 0, 'max_depth': 4, 'workers': 1, **overrides}
+
+
+def test_load_roots_skips_comments_and_blank_lines(tmp_path):
+    batch_file = tmp_path / "roots.txt"
+    batch_file.write_text("# roots\nA@1.0.0\n\n  Scoped@Name@2.0.0  \n", encoding="utf-8")
+
+    assert load_roots(str(batch_file)) == [('A', '1.0.0'), ('Scoped@Name', '2.0.0')]
+
+
+@pytest.mark.parametrize("content", ["A\n", "@1.0.0\n", "A@\n"])
+def test_load_roots_rejects_malformed_lines(tmp_path, content):
+    batch_file = tmp_path / "roots.txt"
+    batch_file.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ConfigError, match="Строка 1"):
+        load_roots(str(batch_file))
+
+
+def test_load_roots_missing_file(tmp_path):
+    with pytest.raises(ConfigError):
+        load_roots(str(tmp_path / "missing.txt"))
+
+
+def test_pool_matches_sequential_run(config):
+    generator = SyntheticRepository(300, seed=3)
+    roots = [('Synthetic.Root', '1.0.0'), (generator.name(7), SYNTHETIC_VERSION),
+             (generator.name(42), SYNTHETIC_VERSION)]
+    sequential = BatchAnalyzer(make_config(config)).run(roots)
+    pooled = BatchAnalyzer(make_config(config, workers=2)).run(roots)
+
+    for result in sequential + pooled:
+        result.pop('seconds')
+    assert sequential == pooled
+    assert all('error' not in result for result in sequential)
+    assert sequential[0]['nodes'] > 1
+
+
+def test_run_batch_writes_summary(config, tmp_path):
+    batch_file = tmp_path / "roots.txt"
+    batch_file.write_text(f"Synthetic.Root@1.0.0\n{SyntheticRepository(300, seed=3).name(7)}@{SYNTHETIC_VERSION}\n",
+                          encoding="utf-8")
+    output_file = tmp_path / "summary.json"
+
+    results = BatchAnalyzer(make_config(config)).run_batch(str(batch_file), str(output_file))
+    summary = json.loads(output_file.read_text(encoding="utf-8"))
+
+    assert summary['roots'] == 2
+    assert summary['failed'] == 0
+    assert summary['total_nodes'] == sum(result['nodes'] for result in results)
+    assert summary['total_edges'] == sum(result['edges'] for result in results)
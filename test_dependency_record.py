@@ -0,0 +1,41 @@
+import json
+import pytest
+from dependency_record import Dependency
+
+
+def test_record_behaves_like_a_mapping():
+    dep = Dependency("Newtonsoft.Json", "13.0.1", "net6.0")
+
+    assert dict(dep) == {"name": "Newtonsoft.Json", "version": "13.0.1", "target_framework": "net6.0"}
+    assert dep["version"] == "13.0.1"
+    assert dep.get("missing", "default") == "default"
+    assert "target_framework" in dep and "missing" not in dep
+    assert len(dep) == 3
+    with pytest.raises(KeyError):
+        dep["missing"]
+
+
+def test_record_equality_and_hashing():
+    dep = Dependency("NLog", "5.0.0", "net6.0")
+
+    assert dep == Dependency("NLog", "5.0.0", "net6.0")
+    assert dep == {"name": "NLog", "version": "5.0.0", "target_framework": "net6.0"}
+    assert dep != Dependency("NLog", "5.0.0", "net8.0")
+    assert len({dep, Dependency("NLog", "5.0.0", "net6.0")}) == 1
+
+
+def test_record_is_slotted_and_interned():
+    dep = Dependency("".join(["Sys", "tem.Memory"]), "4.5.5")
+
+    assert not hasattr(dep, "__dict__")
+    with pytest.raises(AttributeError):
+        dep.extra = 1
+    assert dep.name is Dependency("System.Memory", "4.5.5").name
+
+
+def test_json_round_trip():
+    deps = [Dependency("A", "1.0.0", "net6.0"), Dependency.from_mapping({"name": "B", "version": None})]
+    loaded = [Dependency.from_mapping(item) for item in json.loads(json.dumps([dict(dep) for dep in deps]))]
+
+    assert loaded == deps
+    assert loaded[1].version == "" and loaded[1].target_framework == ""
@@ -0,0 +1,75 @@
+import pytest
+from stage1 import ConfigError
+from stage3 import DependencyGraph
+from framework_masks import ANY_FRAMEWORK, FrameworkTable, normalize_framework
+
+
+def test_normalize_framework_aliases():
+    assert normalize_framework(".NETFramework4.7.2") == "net472"
+    assert normalize_framework(".NETStandard2.0") == "netstandard2.0"
+    assert normalize_framework(" .NETCoreApp3.1 ") == "netcoreapp3.1"
+    assert normalize_framework("net6.0") == "net6.0"
+
+
+def test_aliases_share_one_bit():
+    table = FrameworkTable()
+    standard = table.bit("netstandard2.0")
+
+    assert table.bit(".NETStandard2.0") == standard
+    assert table.bit("net6.0") == standard << 1
+    assert table.labels == ["netstandard2.0", "net6.0"]
+    assert table.find("NET6.0") == standard << 1
+    assert table.find("net8.0") is None
+
+
+def test_selector_includes_framework_independent_edges():
+    table = FrameworkTable()
+    net6 = table.bit("net6.0")
+
+    assert table.selector("net6.0") == net6 | table.bit(ANY_FRAMEWORK)
+    assert table.selector("net8.0") is None
+    assert table.labels_of(table.selector("net6.0")) == ["net6.0"]
+
+
+def test_remap_between_tables():
+    source = FrameworkTable()
+    mask = source.bit("net6.0") | source.bit("netstandard2.0")
+    target = FrameworkTable()
+    target.bit("netstandard2.0")
+    target.bit("net48")
+
+    remapped = target.remap(mask, source.labels)
+
+    assert sorted(target.labels_of(remapped)) == ["net6.0", "netstandard2.0"]
+
+
+def make_builder(config, tmp_path, **overrides) -> DependencyGraph:
+    repository = tmp_path / "repository.txt"
+    repository.write_text("A@1.0.0\tB@1.0.0@net6.0\tC@1.0.0@netstandard2.0\tD@1.0.0\n"
+                          "B@1.0.0\tE@1.0.0@net6.0\n"
+                          "C@1.0.0\tF@1.0.0@.NETStandard2.0\n", encoding="utf-8")
+    config.update(test_mode=True, test_repository_path=str(repository), package_name="A",
+                  package_version="1.0.0", memo_max_edges=0, max_depth=5)
+    config.update(overrides)
+    builder = DependencyGraph(config)
+    builder.build_graph("A", "1.0.0")
+    return builder
+
+
+def test_framework_view_keeps_matching_and_independent_edges(config, tmp_path):
+    builder = make_builder(config, tmp_path)
+
+    assert sorted(normalize_framework(label) for label in builder.frameworks()) == ["net6.0", "netstandard2.0"]
+    net6 = builder.framework_view("net6.0")
+    assert dict(net6.items()) == {"A@1.0.0": ["B@1.0.0", "D@1.0.0"], "B@1.0.0": ["E@1.0.0"],
+                                  "D@1.0.0": [], "E@1.0.0": []}
+    standard = builder.framework_view(".NETStandard2.0")
+    assert dict(standard.items()) == {"A@1.0.0": ["C@1.0.0", "D@1.0.0"], "C@1.0.0": ["F@1.0.0"],
+                                      "D@1.0.0": [], "F@1.0.0": []}
+
+
+def test_framework_view_rejects_unknown_framework(config, tmp_path):
+    builder = make_builder(config, tmp_path)
+
+    with pytest.raises(ConfigError, match="net472"):
+        builder.framework_view("net472")
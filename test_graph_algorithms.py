@@ -0,0 +1,70 @@
+import random
+from graph_algorithms import CondensedGraph, strongly_connected_components
+from graph_store import CompactGraph
+
+
+def as_sets(components):
+    return sorted(sorted(component) for component in components)
+
+
+def test_scc_self_loop_and_disconnected_nodes():
+    adjacency = [[0], [2], [], []]
+
+    assert as_sets(strongly_connected_components(adjacency)) == [[0], [1], [2], [3]]
+
+
+def test_scc_nested_cycles():
+    adjacency = [[1], [2, 0], [3, 1], [4], [3], []]
+
+    assert as_sets(strongly_connected_components(adjacency)) == [[0, 1, 2], [3, 4], [5]]
+
+
+def test_scc_deep_chain_without_recursion():
+    length = 20000
+    adjacency = [[index + 1] for index in range(length - 1)] + [[0]]
+
+    assert [len(component) for component in strongly_connected_components(adjacency)] == [length]
+
+
+def test_condensed_cycle_groups():
+    graph = {
+        "A@1": ["B@1", "E@1"],
+        "B@1": ["C@1"],
+        "C@1": ["A@1", "D@1"],
+        "D@1": ["D@1"],
+        "E@1": [],
+        "F@1": []
+    }
+    condensed = CondensedGraph(graph)
+
+    assert as_sets(condensed.cycle_groups) == [["A@1", "B@1", "C@1"], ["D@1"]]
+    assert sorted(condensed.group_of("B@1")) == ["A@1", "B@1", "C@1"]
+    assert condensed.group_of("D@1") == ["D@1"]
+    assert condensed.group_of("E@1") == []
+    assert condensed.group_of("F@1") == []
+    assert condensed.group_of("Missing@1") == []
+    assert not condensed.is_cyclic(condensed.component_of["F@1"])
+
+
+def test_topological_order_respects_condensed_dag():
+    generator = random.Random(7)
+    for _ in range(30):
+        nodes = [f"P{index}@1" for index in range(30)]
+        graph = {node: generator.sample(nodes, generator.randint(0, 3)) for node in nodes}
+        condensed = CondensedGraph(graph)
+        position = {component: index for index, component in enumerate(condensed.topological_order())}
+
+        assert sorted(position) == list(range(len(condensed.components)))
+        for source, targets in enumerate(condensed.dag):
+            assert source not in targets
+            for target in targets:
+                assert position[source] < position[target]
+
+
+def test_compact_graph_condenses_like_mapping():
+    graph = {"A@1": ["B@1"], "B@1": ["A@1", "C@1"], "C@1": []}
+    compact = CompactGraph()
+    for package, dependencies in graph.items():
+        compact.set_dependencies(package, dependencies)
+
+    assert as_sets(CondensedGraph(compact).cycle_groups) == as_sets(CondensedGraph(graph).cycle_groups)
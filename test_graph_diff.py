@@ -0,0 +1,88 @@
+import json
+import pytest
+from stage1 import ConfigError
+from graph_diff import GraphDiff, SubtreeFingerprints
+
+OLD = {
+    "A@1.0.0": ["B@1.0.0", "C@1.0.0"],
+    "B@1.0.0": ["D@1.0.0"],
+    "C@1.0.0": ["E@1.0.0"],
+    "D@1.0.0": [],
+    "E@1.0.0": []
+}
+
+
+def compare(old, new, old_root="A@1.0.0", new_root="A@1.0.0") -> GraphDiff:
+    diff = GraphDiff(old, old_root, new, new_root)
+    diff.compare()
+    return diff
+
+
+def fingerprints(graph):
+    prints = SubtreeFingerprints(graph)
+    return {package: prints.fingerprints[prints.node_id(package)] for package in graph}
+
+
+def test_identical_graphs_have_empty_diff():
+    diff = compare(OLD, {key: list(value) for key, value in OLD.items()})
+
+    assert diff.is_empty()
+    assert diff.skipped_subtrees == 1
+    assert diff.compared_packages == 0
+
+
+def test_changed_edge_is_reported_with_its_ancestors():
+    new = dict(OLD, **{"B@1.0.0": ["D@2.0.0"], "D@2.0.0": []})
+    del new["D@1.0.0"]
+    diff = compare(OLD, new)
+
+    old_prints, new_prints = fingerprints(OLD), fingerprints(new)
+    assert [package for package in ("A@1.0.0", "B@1.0.0", "C@1.0.0")
+            if old_prints[package] != new_prints[package]] == ["A@1.0.0", "B@1.0.0"]
+    assert diff.skipped_subtrees == 1
+    assert diff.compared_packages == 6
+    assert diff.reversioned_packages == [{'name': 'D', 'old_versions': ['1.0.0'], 'new_versions': ['2.0.0']}]
+    assert diff.changed_edges == [{'source': 'B@1.0.0', 'dependency': 'D',
+                                   'old_version': '1.0.0', 'new_version': '2.0.0'}]
+    assert not (diff.added_packages or diff.removed_packages or diff.added_edges or diff.removed_edges)
+
+
+def test_added_and_removed_edges():
+    new = dict(OLD, **{"B@1.0.0": ["F@1.0.0"], "F@1.0.0": []})
+    del new["D@1.0.0"]
+    diff = compare(OLD, new)
+
+    assert diff.removed_packages == ["D@1.0.0"]
+    assert diff.added_packages == ["F@1.0.0"]
+    assert diff.removed_edges == [{'source': 'B@1.0.0', 'target': 'D@1.0.0'}]
+    assert diff.added_edges == [{'source': 'B@1.0.0', 'target': 'F@1.0.0'}]
+
+
+def test_change_inside_cycle_changes_whole_group():
+    old = {"R@1": ["X@1", "S@1"], "X@1": ["Y@1"], "Y@1": ["Z@1"], "Z@1": ["X@1"], "S@1": []}
+    new = dict(old, **{"Y@1": ["Z@1", "X@1"]})
+    old_prints, new_prints = fingerprints(old), fingerprints(new)
+
+    assert all(old_prints[package] != new_prints[package] for package in ("R@1", "X@1", "Y@1", "Z@1"))
+    assert old_prints["S@1"] == new_prints["S@1"]
+    assert len({old_prints[package] for package in ("X@1", "Y@1", "Z@1")}) == 3
+
+    diff = compare(old, new, "R@1", "R@1")
+    assert diff.added_edges == [{'source': 'Y@1', 'target': 'X@1'}]
+    assert diff.skipped_subtrees == 1
+
+
+def test_save_writes_json(tmp_path):
+    new = dict(OLD, **{"C@1.0.0": []})
+    del new["E@1.0.0"]
+    diff = compare(OLD, new)
+    filename = tmp_path / "diff.json"
+    diff.save(str(filename))
+
+    saved = json.loads(filename.read_text(encoding="utf-8"))
+    assert saved == diff.as_dict()
+    assert saved['removed_packages'] == ["E@1.0.0"]
+    assert saved['removed_edges'] == [{'source': 'C@1.0.0', 'target': 'E@1.0.0'}]
+
+    with pytest.raises(ConfigError):
+        diff.save(str(tmp_path / "missing" / "diff.json"))
@@ -0,0 +1,48 @@
+from framework_masks import FRAMEWORKS
+from graph_snapshot import GraphSnapshot, write_snapshot
+from graph_store import CompactGraph
+
+
+def make_graph() -> CompactGraph:
+    graph = CompactGraph()
+    net6 = FRAMEWORKS.bit("net6.0")
+    graph.set_dependencies("A@1.0.0", ["B@1.0.0", "C@1.0.0"], [net6, 0])
+    graph.set_dependencies("B@1.0.0", ["C@1.0.0"])
+    graph.set_dependencies("C@1.0.0", [])
+    return graph
+
+
+def snapshot_of(tmp_path, graph: CompactGraph) -> GraphSnapshot:
+    filename = str(tmp_path / "graph.snapshot")
+    write_snapshot(graph, filename, {'package_name': "A", 'package_version': "1.0.0"})
+    return GraphSnapshot(filename)
+
+
+def test_snapshot_matches_graph(tmp_path):
+    graph = make_graph()
+    snapshot = snapshot_of(tmp_path, graph)
+
+    assert dict(snapshot.items()) == dict(graph.items())
+    for key in graph:
+        assert snapshot.edge_masks(snapshot.node_id(key)) == graph.edge_masks(graph.node_id(key))
+
+
+def test_set_dependencies_accepts_masks_like_live_graph(tmp_path):
+    graph = make_graph()
+    snapshot = snapshot_of(tmp_path, graph)
+    net6 = FRAMEWORKS.bit("net6.0")
+
+    for target in (graph, snapshot):
+        target.set_dependencies("C@1.0.0", ["D@1.0.0"], [net6])
+        target.set_dependencies("D@1.0.0", ["E@1.0.0"])
+
+    assert snapshot.writable
+    assert dict(snapshot.items()) == dict(graph.items())
+    assert snapshot.edge_count() == graph.edge_count()
+    for key in graph:
+        assert snapshot.edge_masks(snapshot.node_id(key)) == graph.edge_masks(graph.node_id(key))
+    assert snapshot.edge_masks(snapshot.node_id("D@1.0.0")) == [0]
+
+    reloaded = GraphSnapshot(snapshot.filename)
+    assert "D@1.0.0" not in reloaded
+    assert reloaded["C@1.0.0"] == []
@@ -0,0 +1,88 @@
+import pytest
+from impact import DEFAULT_SAMPLE_SIZE, ImpactAnalyzer
+
+DIAMOND = {"A": ["B", "C"], "B": ["D"], "C": ["D"], "D": []}
+CYCLE = {"R": ["X"], "X": ["Y"], "Y": ["X"]}
+
+
+def analyze(graph, **options) -> ImpactAnalyzer:
+    analyzer = ImpactAnalyzer(graph, **options)
+    analyzer.analyze()
+    return analyzer
+
+
+def chain(length: int):
+    return {f"P{index}": [f"P{index + 1}"] if index + 1 < length else [] for index in range(length)}
+
+
+def test_diamond_scores():
+    analyzer = analyze(DIAMOND)
+    scores = {package: analyzer.scores(package) for package in DIAMOND}
+
+    assert analyzer.exact_dependents
+    assert {package: row['dependents'] for package, row in scores.items()} == {"A": 0, "B": 1, "C": 1, "D": 3}
+    assert {package: row['impact'] for package, row in scores.items()} == {"A": 0.0, "B": 1.0, "C": 1.0, "D": 3.0}
+
+    raw = {"A": 1.0, "B": 1.425, "C": 1.425, "D": 3.4225}
+    total = sum(raw.values())
+    for package, rank in raw.items():
+        assert scores[package]['pagerank'] == pytest.approx(rank / total)
+    assert [row['package'] for row in analyzer.top(2, "impact")] == ["D", "B"]
+
+
+def test_impact_decay_weights_distant_dependents():
+    analyzer = analyze({"A": ["B"], "B": ["C"], "C": []}, decay=0.5)
+
+    assert analyzer.scores("C")['impact'] == pytest.approx(1 + 0.5 * 1)
+    assert analyze({"A": ["B"], "B": ["C"], "C": []}, decay=0.0).scores("C")['impact'] == 1.0
+
+
+def test_pagerank_is_solved_inside_cycles():
+    analyzer = analyze(CYCLE)
+
+    x = 2.7 / (1 - 0.85 ** 2)
+    y = 1 + 0.85 * x
+    total = 1 + x + y
+    assert analyzer.scores("R")['pagerank'] == pytest.approx(1 / total)
+    assert analyzer.scores("X")['pagerank'] == pytest.approx(x / total)
+    assert analyzer.scores("Y")['pagerank'] == pytest.approx(y / total)
+    assert sum(analyzer.pagerank) == pytest.approx(1.0)
+    for package in ("X", "Y"):
+        assert analyzer.scores(package)['dependents'] == 2
+        assert analyzer.scores(package)['impact'] == 2.0
+
+
+def test_unknown_package_has_no_scores():
+    assert analyze(DIAMOND).scores("Z") is None
+
+
+def test_dependents_are_exact_up_to_sample_size():
+    length = DEFAULT_SAMPLE_SIZE
+    analyzer = analyze(chain(length))
+
+    assert analyzer.exact_dependents
+    assert analyzer.scores(f"P{length - 1}")['dependents'] == length - 1
+    assert analyzer.scores("P1234")['dependents'] == 1234
+
+
+def test_dependents_are_sampled_above_sample_size():
+    length = DEFAULT_SAMPLE_SIZE + 1
+    analyzer = analyze(chain(length))
+
+    assert not analyzer.exact_dependents
+    assert analyzer.sample_size == DEFAULT_SAMPLE_SIZE
+    for index in (0, 1, 1234, length - 1):
+        assert abs(analyzer.scores(f"P{index}")['dependents'] - index) <= 1
+    assert analyzer.scores(f"P{length - 1}")['impact'] == pytest.approx(2.0, rel=1e-9)
+
+
+def test_sampled_dependents_are_deterministic():
+    graph = {"Root": [f"L{index}" for index in range(99)], **{f"L{index}": ["Leaf"] for index in range(99)},
+             "Leaf": []}
+    first = analyze(graph, sample_size=10)
+    second = analyze(graph, sample_size=10)
+
+    assert not first.exact_dependents
+    assert first.dependents == second.dependents
+    assert first.scores("Root")['dependents'] == 0
+    assert first.scores("Leaf")['impact'] == pytest.approx(99 + 0.5 * 99)
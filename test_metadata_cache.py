@@ -0,0 +1,53 @@
+import sqlite3
+from dependency_record import Dependency
+from metadata_cache import MetadataCache, CACHE_FILENAME
+
+
+def test_both_tables_respect_max_entries(tmp_path):
+    cache = MetadataCache(str(tmp_path), ttl=0, max_entries=3)
+    for index in range(5):
+        cache.put("feed", f"P{index}", "1.0.0", [Dependency("Q", "1.0.0", "net6.0")])
+        cache.put_versions("feed", f"P{index}", ["1.0.0"])
+
+    assert cache.get("feed", "P0", "1.0.0") is None
+    assert cache.get_versions("feed", "P0") is None
+    assert [dep.name for dep in cache.get("feed", "P4", "1.0.0")] == ["Q"]
+    assert cache.get_versions("feed", "P4") == ["1.0.0"]
+    for table in ("dependencies", "versions"):
+        assert cache.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 3
+
+
+def test_replacing_entries_does_not_trigger_eviction(tmp_path):
+    cache = MetadataCache(str(tmp_path), ttl=0, max_entries=2)
+    cache.put("feed", "A", "1.0.0", [])
+    cache.put("feed", "B", "1.0.0", [])
+    for _ in range(3):
+        cache.put("feed", "B", "1.0.0", [Dependency("C", "2.0.0", "net6.0")])
+
+    assert cache.get("feed", "A", "1.0.0") == []
+    assert cache.get("feed", "B", "1.0.0")[0].version == "2.0.0"
+
+
+def test_outdated_schema_is_recreated(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / CACHE_FILENAME))
+    connection.execute("CREATE TABLE dependencies (source TEXT, package TEXT, version TEXT, "
+                       "target_framework TEXT, payload TEXT, fetched_at REAL, accessed_at REAL)")
+    connection.commit()
+    connection.close()
+
+    cache = MetadataCache(str(tmp_path))
+    cache.put("feed", "A", "1.0.0", [])
+    assert cache.get("feed", "A", "1.0.0") == []
+
+
+def test_close_flushes_access_times(tmp_path):
+    cache = MetadataCache(str(tmp_path), ttl=0)
+    cache.put("feed", "A", "1.0.0", [])
+    cache.connection.execute("UPDATE dependencies SET accessed_at = 0")
+    cache.connection.commit()
+    cache.get("feed", "A", "1.0.0")
+    cache.close()
+
+    connection = sqlite3.connect(str(tmp_path / CACHE_FILENAME))
+    assert connection.execute("SELECT accessed_at FROM dependencies").fetchone()[0] > 0
+    connection.close()
@@ -0,0 +1,65 @@
+from name_index import NameFilter, NameIndex, parse_pattern
+
+NAMES = ["Newtonsoft.Json", "System.Text.Json", "System.Memory", "NLog", "Serilog", "Serilog.Sinks.File"]
+
+
+def names_of(index: NameIndex, name_ids) -> list:
+    return sorted(index.names[name_id] for name_id in name_ids)
+
+
+def test_short_substrings_scan_all_names():
+    index = NameIndex(NAMES)
+
+    assert names_of(index, index.containing("Lo")) == ["NLog"]
+    assert names_of(index, index.containing("e")) == sorted(name for name in NAMES if "e" in name)
+    assert names_of(index, index.containing("")) == sorted(NAMES)
+
+
+def test_long_substrings_use_trigram_postings():
+    index = NameIndex(NAMES)
+
+    assert names_of(index, index.containing("Json")) == ["Newtonsoft.Json", "System.Text.Json"]
+    assert names_of(index, index.containing("log.Si")) == ["Serilog.Sinks.File"]
+    assert index.containing("JsonX") == []
+    assert index.containing("nJs") == []
+
+
+def test_prefix_lookup():
+    index = NameIndex(NAMES)
+
+    assert names_of(index, index.with_prefix("System.")) == ["System.Memory", "System.Text.Json"]
+    assert names_of(index, index.with_prefix("Serilog")) == ["Serilog", "Serilog.Sinks.File"]
+    assert list(index.with_prefix("Zzz")) == []
+    assert len(index.with_prefix("")) == len(NAMES)
+
+
+def test_exclude_takes_precedence_over_include():
+    name_filter = NameFilter(NameIndex(NAMES), include=["System*", "Json"], exclude=["Text"])
+
+    assert name_filter.select() == ["Newtonsoft.Json", "System.Memory"]
+    assert parse_pattern("System*") == ("prefix", "System")
+
+
+def test_filter_substring_is_an_exclusion():
+    name_filter = NameFilter(NameIndex(NAMES), exclude_substring="Serilog")
+
+    assert name_filter.active
+    assert name_filter.select() == ["Newtonsoft.Json", "System.Text.Json", "System.Memory", "NLog"]
+
+
+def test_names_added_after_build_are_indexed_and_filtered():
+    index = NameIndex(NAMES)
+    name_filter = NameFilter(index, include=["System*"], exclude=["Memory"])
+    assert names_of(index, index.with_prefix("System.")) == ["System.Memory", "System.Text.Json"]
+
+    assert name_filter.allows("System.Buffers")
+    assert not name_filter.allows("System.Memory.Data")
+    assert not name_filter.allows("Microsoft.Extensions.Logging")
+    index.add("Microsoft.Extensions.Logging.Abstractions")
+
+    assert names_of(index, index.with_prefix("System.")) == ["System.Buffers", "System.Memory",
+                                                             "System.Memory.Data", "System.Text.Json"]
+    assert names_of(index, index.containing("Logging")) == ["Microsoft.Extensions.Logging",
+                                                            "Microsoft.Extensions.Logging.Abstractions"]
+    assert not name_filter.allows("Microsoft.Extensions.Logging.Abstractions")
+    assert name_filter.select(["System.Buffers", "System.Memory.Data"]) == ["System.Buffers"]
@@ -0,0 +1,71 @@
+import socket
+import pytest
+from stage1 import ConfigError
+from stage3 import DependencyGraph
+from nuget_client import NuGetDependencyCollector
+
+
+def unused_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def make_config(config, url: str, **overrides):
+    return {**config, 'online': True, 'use_cache': False, 'repository_url': url, 'package_name': 'Root',
+            'package_version': '1.0.0', 'memo_max_edges': 0, 'max_depth': 5, **overrides}
+
+
+def test_failing_package_does_not_abort_frontier(config, feed_url):
+    collector = NuGetDependencyCollector(make_config(config, feed_url))
+    collector.prefetch([('Root', '1.0.0'), ('Broken', '1.0.0'), ('B', '1.0.0')])
+
+    assert [dep.name for dep in collector.get_package_dependencies('Root', '1.0.0')] == ['A', 'B']
+    assert [dep.name for dep in collector.get_package_dependencies('B', '1.0.0')] == ['C']
+    assert ('Broken', '1.0.0') in collector.failures
+    with pytest.raises(ConfigError):
+        collector.get_package_dependencies('Broken', '1.0.0')
+
+
+def test_bfs_and_dfs_skip_failing_package(config, feed_url):
+    graphs = []
+    for traversal in ('bfs', 'dfs'):
+        builder = DependencyGraph(make_config(config, feed_url, traversal=traversal))
+        builder.build_graph('Root', '1.0.0')
+        graphs.append(dict(builder.graph.items()))
+        assert list(builder.failed_packages) == ['Broken@1.0.0']
+
+    assert graphs[0] == graphs[1]
+    assert graphs[0]['Root@1.0.0'] == ['A@1.0.0', 'B@1.0.0']
+    assert graphs[0]['A@1.0.0'] == ['Broken@1.0.0']
+    assert 'Broken@1.0.0' not in graphs[0]
+    assert graphs[0]['B@1.0.0'] == ['C@1.0.0']
+    assert graphs[0]['C@1.0.0'] == []
+
+
+def test_unreachable_feed_raises_config_error(config):
+    url = f"http://127.0.0.1:{unused_port()}/v3/index.json"
+    collector = NuGetDependencyCollector(make_config(config, url))
+
+    with pytest.raises(ConfigError):
+        collector.prefetch([('Root', '1.0.0')])
+
+
+def test_unreachable_feed_bfs_build_completes(config):
+    url = f"http://127.0.0.1:{unused_port()}/v3/index.json"
+    builder = DependencyGraph(make_config(config, url, traversal='bfs'))
+    builder.build_graph('Root', '1.0.0')
+
+    assert len(builder.graph) == 0
+
+
+def test_close_releases_connections_and_loop(config, feed_url):
+    collector = NuGetDependencyCollector(make_config(config, feed_url))
+    collector.prefetch([('Root', '1.0.0')])
+    assert collector.client.pool._idle
+
+    collector.close()
+    collector.close()
+
+    assert not collector.client.pool._idle
+    assert collector._loop.is_closed()
@@ -0,0 +1,50 @@
+import pytest
+from nuget_versions import VersionIndex, normalize_version, parse_range, parse_version
+
+VERSIONS = ["1.0.0", "1.2.0", "1.10.0", "2.0.0-beta.2", "2.0.0-beta.10", "2.0.0", "2.1.0", "3.0.0-rc.1"]
+
+
+@pytest.fixture
+def index():
+    versions = VersionIndex()
+    versions.add("Newtonsoft.Json", VERSIONS)
+    return versions
+
+
+@pytest.mark.parametrize("range_text, expected", [
+    ("1.1.0", "1.2.0"),
+    ("[1.2.0]", "1.2.0"),
+    ("[1.0.0, 2.0.0)", "1.0.0"),
+    ("(1.0.0, 2.0.0)", "1.2.0"),
+    ("(1.10.0, )", "2.0.0"),
+    ("(, 1.5.0]", "1.0.0"),
+    ("[2.0.0-beta.2, )", "2.0.0-beta.2"),
+    ("(2.0.0-beta.2, 2.0.0)", "2.0.0-beta.10"),
+    ("1.*", "1.10.0"),
+    ("2.*", "2.1.0"),
+    ("*", "2.1.0"),
+    ("[1.*, 2.0.0)", "1.10.0"),
+    ("3.0.0-*", "3.0.0-rc.1")
+])
+def test_find_best_match(index, range_text, expected):
+    assert index.find_best_match("newtonsoft.json", range_text) == expected
+
+
+def test_unsatisfiable_range_falls_back_to_literal(index):
+    assert index.find_best_match("Newtonsoft.Json", "[4.0.0, )") is None
+    assert index.resolve("Newtonsoft.Json", "[4.0.0, )") == "4.0.0"
+    assert index.resolve("Newtonsoft.Json", "5.*") == "5.0.0"
+    assert index.resolve("Unknown", "[1.0.0, 2.0.0)") == "1.0.0"
+
+
+def test_versions_are_ordered_semantically(index):
+    index.add("Newtonsoft.Json", ["1.2", "1.9.0"])
+    assert index.versions("NEWTONSOFT.JSON") == VERSIONS[:2] + ["1.9.0"] + VERSIONS[2:]
+
+
+def test_parsing_and_normalization():
+    assert parse_version("1.2.3.4-Beta+meta").normalized() == "1.2.3.4-beta"
+    assert normalize_version("1.2") == "1.2.0"
+    assert parse_version("1.x") is None
+    assert parse_range("[1.0.0") is None
+    assert parse_range("(1.0.0)") is None
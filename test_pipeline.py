@@ -0,0 +1,45 @@
+import pytest
+from stage1 import ConfigError
+import pipeline
+from stage3 import DependencyGraph
+
+
+@pytest.mark.parametrize("text, stages", [
+    ("2-5", [2, 3, 4, 5]),
+    ("5,3", [3, 5]),
+    (" 3 , 3-4 ,", [3, 4]),
+    ("2", [2])
+])
+def test_parse_stages(text, stages):
+    assert pipeline.parse_stages(text) == stages
+
+
+@pytest.mark.parametrize("text, message", [
+    ("", "Не выбрано"),
+    (" , ", "Не выбрано"),
+    ("1-3", "Неизвестный этап: 1"),
+    ("6", "Неизвестный этап: 6"),
+    ("x", "Некорректный список"),
+    ("3-", "Некорректный список"),
+    ("2-x", "Некорректный список")
+])
+def test_parse_stages_rejects_invalid_input(text, message):
+    with pytest.raises(ConfigError, match=message):
+        pipeline.parse_stages(text)
+
+
+def test_graph_is_built_once_for_all_stages(config, tmp_path, monkeypatch, capsys):
+    repository = tmp_path / "repository.txt"
+    repository.write_text("A@1.0.0\tB@1.0.0@net6.0\nB@1.0.0\n", encoding="utf-8")
+    config.update(test_mode=True, test_repository_path=str(repository), package_name="A",
+                  package_version="1.0.0", memo_max_edges=0)
+    builds = []
+    build_graph = DependencyGraph.build_graph
+    monkeypatch.setattr(DependencyGraph, "build_graph",
+                        lambda self, *args: builds.append(args) or build_graph(self, *args))
+
+    pipeline.run_pipeline(config, [3, 4])
+
+    assert builds == [("A", "1.0.0")]
+    output = capsys.readouterr().out
+    assert "ЭТАП 3" in output and "ЭТАП 4" in output
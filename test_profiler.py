@@ -0,0 +1,20 @@
+import sys
+import pytest
+from profiler import Profiler, peak_rss_kb
+
+
+@pytest.mark.skipif(peak_rss_kb() is None, reason="модуль resource недоступен")
+def test_report_includes_peak_rss_when_available():
+    report = Profiler().report()
+    assert report['peak_rss_kb'] > 0
+
+
+def test_report_without_resource_module(monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    profiler = Profiler()
+    report = profiler.report()
+
+    assert peak_rss_kb() is None
+    assert 'peak_rss_kb' not in report
+    profiler.display_report(report)
+    assert "Общее время" in capsys.readouterr().out
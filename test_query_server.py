@@ -0,0 +1,44 @@
+import threading
+from query_server import QueryService
+
+
+def make_service(config, tmp_path, url: str) -> QueryService:
+    config.update(online=True, use_cache=True, cache_dir=str(tmp_path / "cache"), repository_url=url,
+                  package_name='B', package_version='1.0.0', memo_max_edges=0, max_depth=5, traversal='bfs')
+    return QueryService(config, str(tmp_path / "config.json"))
+
+
+def build_in_thread(service: QueryService, request):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(service.handle("build", request)))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+def test_collector_is_shared_across_handler_threads(config, tmp_path, feed_url):
+    service = make_service(config, tmp_path, feed_url)
+    first = build_in_thread(service, {'package': 'C'})
+    second = service.handle("build", {'package': 'B'})
+    third = build_in_thread(service, {'package': 'B'})
+
+    assert first['nodes'] == 1
+    assert second['nodes'] == 2 and second['direct_dependencies'] == ['C@1.0.0']
+    assert third['cached']
+    assert service.status()['collectors'] == 1
+
+
+def test_partial_graph_is_returned_but_not_cached(config, tmp_path, feed_url):
+    service = make_service(config, tmp_path, feed_url)
+    for _ in range(2):
+        response = service.handle("build", {'package': 'Root'})
+        assert not response['cached']
+        assert list(response['failed_packages']) == ['Broken@1.0.0']
+        assert response['direct_dependencies'] == ['A@1.0.0', 'B@1.0.0']
+        assert response['nodes'] == 4
+
+    lines = service.handle("ascii", {'package': 'Root'})['lines']
+    assert "    │   └── Broken@1.0.0 (ошибка загрузки)" in lines
+    assert service.status()['graphs'] == []
+    assert service.counters['misses'] == 3
+    assert 'failed_packages' not in service.handle("build", {'package': 'B'})
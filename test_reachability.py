@@ -0,0 +1,27 @@
+import random
+from reachability import ReachabilityIndex, reachable_from
+
+
+def random_graph(seed: int, size: int = 40):
+    generator = random.Random(seed)
+    nodes = [f"P{index}@1.0.0" for index in range(size)]
+    return {node: generator.sample(nodes, generator.randint(0, 3)) for node in nodes[:size - 5]}
+
+
+def test_traversal_matches_index():
+    for seed in range(50):
+        graph = random_graph(seed)
+        index = ReachabilityIndex(graph)
+        targets = list(graph) + ["P39@1.0.0", "Missing@1.0.0"]
+        for source in list(graph)[:10]:
+            reached = reachable_from(graph, source)
+            assert [target in reached for target in targets] == index.reaches_batch(
+                [(source, target) for target in targets])
+            assert len(reached - {source}) == index.closure_size(source)
+
+
+def test_source_reaches_itself_only_through_cycle():
+    graph = {"A@1.0.0": ["B@1.0.0"], "B@1.0.0": ["A@1.0.0", "C@1.0.0"], "C@1.0.0": []}
+    assert reachable_from(graph, "A@1.0.0") == {"A@1.0.0", "B@1.0.0", "C@1.0.0"}
+    assert reachable_from(graph, "C@1.0.0") == set()
+    assert reachable_from(graph, "Missing@1.0.0") == set()
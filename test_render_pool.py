@@ -0,0 +1,114 @@
+import gzip
+import os
+import stat
+import subprocess
+import sys
+import threading
+import pytest
+from render_pool import GraphRenderer
+
+STUB_DOT = """#!{python}
+import sys
+import time
+arguments = sys.argv[1:]
+output = arguments[arguments.index('-o') + 1]
+source = open(arguments[-1], 'rb').read() if len(arguments) > arguments.index('-o') + 2 else sys.stdin.buffer.read()
+with open({log!r}, 'a') as log:
+    log.write(output + '\\n')
+time.sleep(0.3)
+with open(output, 'wb') as f:
+    f.write(b'IMAGE:' + source)
+"""
+
+
+def make_renderer(tmp_path, max_workers: int = 4):
+    log = tmp_path / "renders.log"
+    executable = tmp_path / "dot"
+    executable.write_text(STUB_DOT.format(python=sys.executable, log=str(log)), encoding="utf-8")
+    executable.chmod(executable.stat().st_mode | stat.S_IXUSR)
+
+    dot_filename = tmp_path / "graph.dot"
+    dot_filename.write_text('digraph DependencyGraph {\n    "A@1.0.0";\n}', encoding="utf-8")
+    renderer = GraphRenderer(str(tmp_path / "cache"), max_workers=max_workers, executable=str(executable))
+    return renderer, str(dot_filename), log
+
+
+def render_count(log) -> int:
+    return len(log.read_text(encoding="utf-8").splitlines()) if log.exists() else 0
+
+
+def test_cache_hit_skips_rendering(tmp_path):
+    renderer, dot_filename, log = make_renderer(tmp_path)
+    first = renderer.submit(dot_filename, str(tmp_path / "first.png")).result()
+    second = renderer.submit(dot_filename, str(tmp_path / "second.png")).result()
+    renderer.shutdown()
+
+    assert render_count(log) == 1
+    assert (renderer.renders, renderer.cache_hits) == (1, 1)
+    with open(first, 'rb') as f, open(second, 'rb') as g:
+        assert f.read() == g.read() != b""
+
+
+def test_other_format_is_rendered_separately(tmp_path):
+    renderer, dot_filename, log = make_renderer(tmp_path)
+    renderer.submit(dot_filename, str(tmp_path / "graph.png"), "png").result()
+    renderer.submit(dot_filename, str(tmp_path / "graph.svg"), "svg").result()
+    renderer.shutdown()
+
+    assert render_count(log) == 2
+
+
+def test_concurrent_submits_share_one_render(tmp_path):
+    renderer, dot_filename, log = make_renderer(tmp_path)
+    barrier = threading.Barrier(6)
+    futures = {}
+
+    def submit(index: int) -> None:
+        barrier.wait()
+        futures[index] = renderer.submit(dot_filename, str(tmp_path / f"graph{index}.png"))
+
+    threads = [threading.Thread(target=submit, args=(index,)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    outputs = [futures[index].result() for index in range(6)]
+    renderer.shutdown()
+
+    assert render_count(log) == 1
+    assert renderer.renders == 1
+    assert all(os.path.getsize(output) > 0 for output in outputs)
+    assert not [name for name in os.listdir(tmp_path / "cache") if name.endswith('.tmp')]
+
+
+def test_gzip_input_shares_cache_with_plain_file(tmp_path):
+    renderer, dot_filename, log = make_renderer(tmp_path)
+    with open(dot_filename, 'rb') as source, gzip.open(dot_filename + ".gz", 'wb') as target:
+        target.write(source.read())
+
+    compressed = renderer.submit(dot_filename + ".gz", str(tmp_path / "compressed.png")).result()
+    plain = renderer.submit(dot_filename, str(tmp_path / "plain.png")).result()
+    renderer.shutdown()
+
+    assert render_count(log) == 1
+    with open(compressed, 'rb') as f, open(dot_filename, 'rb') as g:
+        assert f.read() == b'IMAGE:' + g.read()
+    with open(compressed, 'rb') as f, open(plain, 'rb') as g:
+        assert f.read() == g.read()
+
+
+def test_failed_render_is_reported_and_not_cached(tmp_path):
+    renderer, dot_filename, log = make_renderer(tmp_path)
+    failing = tmp_path / "failing-dot"
+    failing.write_text(f"#!{sys.executable}\nimport sys\nsys.exit(3)\n", encoding="utf-8")
+    failing.chmod(failing.stat().st_mode | stat.S_IXUSR)
+    executable, renderer.executable = renderer.executable, str(failing)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        renderer.submit(dot_filename, str(tmp_path / "graph.png")).result()
+    assert not os.listdir(tmp_path / "cache")
+
+    renderer.executable = executable
+    renderer.submit(dot_filename, str(tmp_path / "graph.png")).result()
+    renderer.shutdown()
+    assert (renderer.renders, render_count(log)) == (1, 1)
@@ -0,0 +1,49 @@
+import os
+from repository_index import RepositoryIndex
+
+
+def write_repository(path, lines, mtime_ns):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_lookup_and_dependency_parsing(tmp_path):
+    repository = tmp_path / "repository.txt"
+    write_repository(repository, ["# comment", "A@1.0.0\tB@1.0.0@net6.0\tC@[2.0.0, )", "B@1.0.0", "",
+                                  "A@1.0.0\tD@1.0.0"], 10 ** 18)
+    index = RepositoryIndex(str(repository))
+
+    assert index.record_count == 3
+    assert "B@1.0.0" in index and "C@2.0.0" not in index
+    assert [(dep.name, dep.version, dep.target_framework) for dep in index.get_dependencies("A", "1.0.0")] == \
+        [("B", "1.0.0", "net6.0"), ("C", "[2.0.0, )", "")]
+    assert index.get_dependencies("B", "1.0.0") == []
+    assert index.get_dependencies("Missing", "1.0.0") is None
+    index.close()
+
+
+def test_index_is_reused_until_source_changes(tmp_path):
+    repository = tmp_path / "repository.txt"
+    write_repository(repository, ["A@1.0.0\tB@1.0.0"], 10 ** 18)
+    RepositoryIndex(str(repository)).close()
+    index_path = str(repository) + ".idx"
+    os.utime(index_path, ns=(1, 1))
+
+    RepositoryIndex(str(repository)).close()
+    assert os.stat(index_path).st_mtime_ns == 1
+
+    write_repository(repository, ["A@1.0.0\tC@1.0.0"], 10 ** 18 + 10 ** 9)
+    index = RepositoryIndex(str(repository))
+    assert os.stat(index_path).st_mtime_ns != 1
+    assert [dep.name for dep in index.get_dependencies("A", "1.0.0")] == ["C"]
+    index.close()
+
+
+def test_many_records_with_colliding_slots(tmp_path):
+    repository = tmp_path / "repository.txt"
+    write_repository(repository, [f"P{number}@1.0.0\tP{number + 1}@1.0.0" for number in range(2000)], 10 ** 18)
+    index = RepositoryIndex(str(repository))
+
+    assert all(index.get_dependencies(f"P{number}", "1.0.0")[0].name == f"P{number + 1}"
+               for number in range(2000))
+    index.close()
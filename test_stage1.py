@@ -0,0 +1,20 @@
+from stage1 import CORE_CONFIG_KEYS, Stage1Config
+
+
+def printed_keys(output: str):
+    return [line.split(': ', 1)[0] for line in output.splitlines() if ': ' in line]
+
+
+def test_display_config_shows_core_and_changed_keys(tmp_path, capsys):
+    manager = Stage1Config(str(tmp_path / "config.json"))
+    manager.config['traversal'] = 'bfs'
+    manager.display_config()
+
+    assert printed_keys(capsys.readouterr().out) == list(CORE_CONFIG_KEYS) + ['traversal']
+
+
+def test_display_config_verbose_shows_every_key(tmp_path, capsys):
+    manager = Stage1Config(str(tmp_path / "config.json"))
+    manager.display_config(verbose=True)
+
+    assert printed_keys(capsys.readouterr().out) == list(manager.default_config)
@@ -0,0 +1,29 @@
+from stage2 import DependencyCollector
+
+
+def make_config(config, **overrides):
+    return {**config, 'package_name': "Newtonsoft.Json", 'package_version': "13.0.1", **overrides}
+
+
+def test_demo_packages_are_created_on_first_lookup(config):
+    collector = DependencyCollector(make_config(config))
+    assert collector.dynamic_packages == {}
+
+    dependencies = collector.get_package_dependencies("Newtonsoft.Json", "13.0.1")
+
+    assert dependencies
+    assert "Newtonsoft.Json" in collector.dynamic_packages
+    assert collector.get_package_versions("Newtonsoft.Json") == ["13.0.1"]
+
+
+def test_repository_collector_reads_lazily(config, tmp_path):
+    repository = tmp_path / "repository.txt"
+    repository.write_text("A@1.0.0\tB@1.0.0@net6.0\n", encoding="utf-8")
+    collector = DependencyCollector(make_config(config, test_mode=True, test_repository_path=str(repository)))
+
+    assert [dict(dep) for dep in collector.get_package_dependencies("A", "1.0.0")] == [
+        {"name": "B", "version": "1.0.0", "target_framework": "net6.0"}]
+    assert collector.get_package_dependencies("Missing", "1.0.0") == []
+    assert collector.get_package_versions("A") == []
+    assert collector.dynamic_packages == {}
+    collector.close()
@@ -0,0 +1,93 @@
+from typing import Any, Dict, List, Tuple
+from stage3 import DependencyGraph
+from subtree_memo import SUBTREE_MEMO
+
+
+def make_config(config: Dict[str, Any], tmp_path, packages: List[Tuple[str, List[str]]],
+                **overrides: Any) -> Dict[str, Any]:
+    lines = ["\t".join([package] + [f"{dep}@net6.0" for dep in deps]) for package, deps in packages]
+    repository = tmp_path / "repository.txt"
+    repository.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    return {**config, 'test_mode': True, 'test_repository_path': str(repository), 'memo_max_edges': 0,
+            'max_depth': 10, **overrides}
+
+
+def build(config: Dict[str, Any], package: str = "A", version: str = "1.0.0") -> DependencyGraph:
+    builder = DependencyGraph(config)
+    builder.build_graph(package, version)
+    return builder
+
+
+DIAMOND = [
+    ("A@1.0.0", ["B@1.0.0", "C@1.0.0"]),
+    ("B@1.0.0", ["D@1.0.0"]),
+    ("C@1.0.0", ["D@1.0.0", "E@1.0.0"]),
+    ("D@1.0.0", ["F@1.0.0"]),
+    ("E@1.0.0", []),
+    ("F@1.0.0", [])
+]
+
+
+def test_dfs_and_bfs_build_the_same_graph(config, tmp_path):
+    dfs = build(make_config(config, tmp_path, DIAMOND, traversal="dfs"))
+    bfs = build(make_config(config, tmp_path, DIAMOND, traversal="bfs"))
+
+    assert dict(dfs.graph.items()) == dict(bfs.graph.items())
+    assert dfs.depths == bfs.depths
+    assert dfs.depths["F@1.0.0"] == 3
+
+
+def test_max_depth_limits_expansion(config, tmp_path):
+    builder = build(make_config(config, tmp_path, DIAMOND, max_depth=2))
+
+    assert set(builder.graph) == {"A@1.0.0", "B@1.0.0", "C@1.0.0"}
+    assert "D@1.0.0" not in builder.graph
+
+
+def test_deep_chain_does_not_hit_recursion_limit(config, tmp_path):
+    length = 3000
+    chain = [(f"P{i}@1.0.0", [f"P{i + 1}@1.0.0"] if i + 1 < length else []) for i in range(length)]
+
+    for traversal in ("dfs", "bfs"):
+        builder = build(make_config(config, tmp_path, chain, traversal=traversal, max_depth=length + 1), "P0")
+        assert len(builder.graph) == length
+        assert builder.depths[f"P{length - 1}@1.0.0"] == length - 1
+
+
+def test_memo_preserves_cycles_and_graph(config, tmp_path):
+    packages = [
+        ("Y@1.0.0", ["X@1.0.0", "D@1.0.0"]),
+        ("X@1.0.0", ["B@1.0.0"]),
+        ("B@1.0.0", ["X@1.0.0", "C@1.0.0"]),
+        ("C@1.0.0", []),
+        ("D@1.0.0", ["E@1.0.0"]),
+        ("E@1.0.0", [])
+    ]
+    for traversal in ("dfs", "bfs"):
+        uncached = build(make_config(config, tmp_path, packages, traversal=traversal), "Y")
+
+        memo_config = make_config(config, tmp_path, packages, traversal=traversal, memo_max_edges=1000)
+        build(memo_config, "X")
+        build(memo_config, "D")
+        hits = SUBTREE_MEMO.hits
+        cached = build(memo_config, "Y")
+
+        assert SUBTREE_MEMO.hits > hits
+        assert cached.cyclic_dependencies == uncached.cyclic_dependencies == {"Y@1.0.0 -> X@1.0.0 -> B@1.0.0 -> X@1.0.0"}
+        assert dict(cached.graph.items()) == dict(uncached.graph.items())
+        assert cached.depths == uncached.depths
+
+
+def test_rebuild_does_not_mutate_shared_config(config, tmp_path):
+    shared_config = make_config(config, tmp_path, DIAMOND)
+    builder = build(shared_config)
+    builder.rebuild(max_depth=2, exclude_patterns=["E*"])
+
+    assert shared_config['max_depth'] == 10
+    assert shared_config['exclude_patterns'] == []
+    assert set(builder.graph) == {"A@1.0.0", "B@1.0.0", "C@1.0.0"}
+    assert builder.graph["C@1.0.0"] == ["D@1.0.0"]
+
+    fresh = build(shared_config)
+    assert set(fresh.graph) == {"A@1.0.0", "B@1.0.0", "C@1.0.0", "D@1.0.0", "E@1.0.0", "F@1.0.0"}
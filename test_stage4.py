@@ -0,0 +1,47 @@
+import random
+from stage4 import ReverseDependencyAnalyzer
+
+
+def naive_reverse(graph, target, max_depth):
+    found = {}
+    frontier = {target}
+    depth = 0
+    while frontier and depth <= max_depth:
+        frontier = {package for package, dependencies in graph.items()
+                    if package not in found and set(dependencies) & frontier}
+        for package in frontier:
+            found[package] = depth
+        depth += 1
+    return found
+
+
+def test_direct_and_transitive_dependents():
+    graph = {"A": ["B", "C"], "B": ["D"], "C": ["D"], "D": [], "E": ["A"]}
+    result = ReverseDependencyAnalyzer(graph).find_reverse_dependencies("D", max_depth=3)
+
+    assert sorted((dep['depth'], dep['package']) for dep in result['reverse_deps']) == \
+        [(0, "B"), (0, "C"), (1, "A"), (2, "E")]
+    assert result['all_dependencies'] == {"A", "B", "C", "E"}
+
+
+def test_depth_limit_and_cycles():
+    graph = {"A": ["B"], "B": ["C"], "C": ["A"], "D": ["C"]}
+    result = ReverseDependencyAnalyzer(graph).find_reverse_dependencies("C", max_depth=1)
+
+    assert sorted((dep['depth'], dep['package']) for dep in result['reverse_deps']) == \
+        [(0, "B"), (0, "D"), (1, "A")]
+
+
+def test_batch_matches_separate_queries():
+    generator = random.Random(3)
+    for _ in range(40):
+        nodes = [f"P{index}" for index in range(40)]
+        graph = {node: generator.sample(nodes, generator.randint(0, 3)) for node in nodes}
+        targets = generator.sample(nodes, 10)
+        analyzer = ReverseDependencyAnalyzer(graph)
+        batch = analyzer.find_reverse_dependencies_batch(targets, max_depth=3)
+
+        for target in targets:
+            depths = {dep['package']: dep['depth'] for dep in batch[target]['reverse_deps']}
+            assert len(depths) == len(batch[target]['reverse_deps'])
+            assert depths == naive_reverse(graph, target, 3)
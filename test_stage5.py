@@ -0,0 +1,63 @@
+import gzip
+import pytest
+from stage3 import DependencyGraph
+from stage5 import DOT_CHUNK_LINES, GraphVisualizer
+
+
+def make_visualizer(config, tmp_path) -> GraphVisualizer:
+    repository = tmp_path / "repository.txt"
+    repository.write_text("A@1.0.0\n", encoding="utf-8")
+    config.update(test_mode=True, test_repository_path=str(repository), package_name="A",
+                  package_version="1.0.0", memo_max_edges=0)
+    return GraphVisualizer(config, DependencyGraph(config))
+
+
+@pytest.mark.parametrize("lines", [DOT_CHUNK_LINES - 1, DOT_CHUNK_LINES, DOT_CHUNK_LINES + 1, 2 * DOT_CHUNK_LINES])
+@pytest.mark.parametrize("compress", [False, True])
+def test_chunked_dot_matches_single_write(config, tmp_path, lines, compress):
+    visualizer = make_visualizer(config, tmp_path)
+    graph = {"A@1.0.0": [f"L{index}@1.0.0" for index in range(lines - 8)]}
+    expected = visualizer.generate_graphviz_dot(graph)
+    assert len(expected.split("\n")) == lines
+
+    filename = visualizer.write_dot_file(graph, str(tmp_path / "graph.dot"), compress)
+    opener = gzip.open if compress else open
+    with opener(filename, 'rt', encoding='utf-8') as f:
+        assert f.read() == expected
+
+
+def test_echoed_dot_is_generated_once(config, tmp_path, capsys, monkeypatch):
+    visualizer = make_visualizer(config, tmp_path)
+    graph = {"A@1.0.0": ["B@1.0.0"], "B@1.0.0": []}
+    calls = []
+    iter_graphviz_dot = visualizer.iter_graphviz_dot
+    monkeypatch.setattr(visualizer, "iter_graphviz_dot",
+                        lambda *args: calls.append(args) or iter_graphviz_dot(*args))
+
+    filename = visualizer.write_dot_file(graph, str(tmp_path / "graph.dot"), echo=True)
+
+    assert len(calls) == 1
+    with open(filename, encoding='utf-8') as f:
+        assert capsys.readouterr().out == f.read() + "\n"
+
+
+def test_ascii_tree_markers(config, tmp_path):
+    visualizer = make_visualizer(config, tmp_path)
+    visualizer.graph_builder.failed_packages = {"F@1.0.0": "500"}
+    graph = {
+        "A@1.0.0": ["B@1.0.0", "C@1.0.0", "F@1.0.0"],
+        "B@1.0.0": ["D@1.0.0"],
+        "C@1.0.0": ["B@1.0.0", "A@1.0.0"],
+        "D@1.0.0": ["E@1.0.0"]
+    }
+
+    assert visualizer.generate_ascii_tree(graph, "A@1.0.0") == [
+        "└── A@1.0.0",
+        "    ├── B@1.0.0",
+        "    │   └── D@1.0.0",
+        "    │       └── E@1.0.0 (глубина ограничена)",
+        "    ├── C@1.0.0",
+        "    │   ├── B@1.0.0 (см. выше)",
+        "    │   └── A@1.0.0 (цикл)",
+        "    └── F@1.0.0 (ошибка загрузки)"
+    ]
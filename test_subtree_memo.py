@@ -0,0 +1,52 @@
+from subtree_memo import SubtreeMemo
+
+
+def entries(*nodes):
+    return [(node, depth, [f"{node}.{index}" for index in range(fanout)], []) for node, depth, fanout in nodes]
+
+
+def test_lru_eviction_respects_edge_budget():
+    memo = SubtreeMemo(max_edges=6)
+    memo.store("a", 3, entries(("A", 0, 2)))
+    memo.store("b", 3, entries(("B", 0, 2)))
+    assert memo.size == 6
+
+    assert memo.lookup("a", 3) is not None
+    memo.store("c", 3, entries(("C", 0, 1)))
+
+    assert memo.size == 5
+    assert memo.lookup("b", 3) is None
+    assert memo.lookup("a", 3) is not None
+    assert memo.lookup("c", 3) is not None
+
+
+def test_entry_larger_than_budget_is_not_stored():
+    memo = SubtreeMemo(max_edges=4)
+    memo.store("a", 3, entries(("A", 0, 2)))
+    memo.store("big", 3, entries(("B", 0, 3), ("C", 1, 1)))
+
+    assert len(memo) == 1
+    assert memo.size == 3
+    assert memo.lookup("big", 3) is None
+
+
+def test_lookup_returns_prefix_for_smaller_depth():
+    memo = SubtreeMemo()
+    stored = entries(("A", 0, 1), ("B", 1, 1), ("C", 2, 0))
+    memo.store("a", 3, stored)
+
+    assert memo.lookup("a", 3) == stored
+    assert memo.lookup("a", 2) == stored[:2]
+    assert memo.lookup("a", 4) is None
+    assert (memo.hits, memo.misses) == (2, 1)
+
+
+def test_deeper_entry_replaces_shallower_one():
+    memo = SubtreeMemo()
+    memo.store("a", 1, entries(("A", 0, 1)))
+    memo.store("a", 3, entries(("A", 0, 1), ("B", 1, 2)))
+    memo.store("a", 2, entries(("A", 0, 5)))
+
+    assert len(memo) == 1
+    assert memo.size == 5
+    assert memo.lookup("a", 3)[1][0] == "B"
@@ -0,0 +1,56 @@
+import pytest
+from synthetic_repository import SyntheticDependencyCollector, SyntheticRepository
+
+
+def adjacency(generator: SyntheticRepository):
+    return [generator.dependencies(node) for node in range(generator.nodes)]
+
+
+@pytest.mark.parametrize("distribution", ["poisson", "uniform", "powerlaw"])
+def test_same_seed_generates_same_graph(distribution):
+    first = SyntheticRepository(2000, seed=7, distribution=distribution, cycle_rate=0.05)
+    second = SyntheticRepository(2000, seed=7, distribution=distribution, cycle_rate=0.05)
+
+    assert first.level_starts == second.level_starts
+    assert adjacency(first) == adjacency(second)
+
+
+def test_different_seed_changes_extra_edges():
+    first = SyntheticRepository(2000, seed=1)
+    second = SyntheticRepository(2000, seed=2)
+
+    assert first.level_starts == second.level_starts
+    assert adjacency(first) != adjacency(second)
+
+
+def test_levels_partition_all_nodes():
+    generator = SyntheticRepository(1000, levels=6)
+    starts = generator.level_starts
+
+    assert starts[0] == 0 and starts[-1] == 1000
+    assert len(starts) == 7
+    assert all(low < high for low, high in zip(starts, starts[1:]))
+    assert generator.dependencies(999) == []
+
+
+def test_every_node_is_reachable_from_root():
+    generator = SyntheticRepository(3000, seed=5, cycle_rate=0)
+    seen = {0}
+    frontier = [0]
+    while frontier:
+        frontier = [target for node in frontier for target in generator.dependencies(node) if target not in seen]
+        seen.update(frontier)
+
+    assert len(seen) == generator.nodes
+
+
+def test_collector_names_round_trip(config):
+    config.update(synthetic_nodes=500, synthetic_seed=3, package_name="Synthetic.Root")
+    collector = SyntheticDependencyCollector(config)
+    generator = collector.generator
+
+    root_dependencies = collector.get_package_dependencies("Synthetic.Root", config['package_version'])
+    assert [generator.node_of(dep.name) for dep in root_dependencies] == generator.dependencies(0)
+    assert generator.node_of(generator.name(42)) == 42
+    assert generator.node_of("Unknown.Package") == -1
+    assert collector.get_package_dependencies("Unknown.Package", "1.0.0") == []